@@ -1,17 +1,16 @@
+import importlib
 import logging
 import sys
-from importlib.metadata import PackageNotFoundError
-from importlib.metadata import version as get_package_version
+from dataclasses import asdict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
+import click
 import typer
-from rich import print as rich_print
+from typer.core import TyperGroup
 
-from hw_cli.commands import devices, simulate
-from hw_cli.commands.cache import app as cache_app
-from hw_cli.commands.config_cmd import app as config_app
 from hw_cli.core.config import AppConfig, load_config
+from hw_cli.core.storage import configure_data
 
 logging.basicConfig(
     level=logging.ERROR,
@@ -19,17 +18,44 @@ logging.basicConfig(
     datefmt="%H:%M:%S",
 )
 
+# Subcommand -> (module, help). A command module, and with it httpx and the
+# rest of its dependencies, is only imported when that subcommand runs.
+SUBCOMMANDS: Dict[str, Tuple[str, str]] = {
+    "devices": ("hw_cli.commands.devices", "Device management"),
+    "simulate": ("hw_cli.commands.simulate", "Simulation commands"),
+    "cache": ("hw_cli.commands.cache", "Token cache management"),
+    "config": ("hw_cli.commands.config_cmd", "Configuration management"),
+    "agent": ("hw_cli.commands.agent", "Resident agent for repeated commands"),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Root group that builds each subcommand from SUBCOMMANDS on first use."""
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return list(dict.fromkeys([*SUBCOMMANDS, *super().list_commands(ctx)]))
+
+    def get_command(
+        self, ctx: click.Context, cmd_name: str
+    ) -> Optional[click.Command]:
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in SUBCOMMANDS:
+            module_name, help_text = SUBCOMMANDS[cmd_name]
+            module = importlib.import_module(module_name)
+            command = typer.main.get_group(module.app)
+            command.name = cmd_name
+            command.help = help_text
+            self.add_command(command)
+        return command
+
+
 app = typer.Typer(
     name="hw",
     help="Heavy Weather CLI - Weather station telemetry tool",
     no_args_is_help=True,
+    cls=LazyGroup,
 )
 
-app.add_typer(devices.app, name="devices", help="Device management")
-app.add_typer(simulate.app, name="simulate", help="Simulation commands")
-app.add_typer(cache_app, name="cache", help="Token cache management")
-app.add_typer(config_app, name="config", help="Configuration management")
-
 
 def _setup_logging(config: AppConfig):
     """Setup logging based on config object."""
@@ -50,6 +76,9 @@ def _setup_logging(config: AppConfig):
 
 
 def get_version() -> str:
+    from importlib.metadata import PackageNotFoundError
+    from importlib.metadata import version as get_package_version
+
     try:
         return get_package_version("heavyweather-cli")
     except PackageNotFoundError:
@@ -58,6 +87,8 @@ def get_version() -> str:
 
 def version_callback(value: bool):
     if value:
+        from rich import print as rich_print
+
         app_version = get_version()
         rich_print(f"[green]Heavy Weather CLI v{app_version}[/green]", file=sys.stderr)
         raise typer.Exit()
@@ -100,8 +131,10 @@ def main(
         config.verbose = True
 
     _setup_logging(config)
+    configure_data(**asdict(config.storage))
     ctx.obj = {
         "config": config,
+        "config_file": config_file,
         "verbose": config.verbose,
         "output": output,
         "quiet": quiet,
@@ -0,0 +1,124 @@
+import json
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import typer
+
+from hw_cli.utils.console import print_error, print_info, print_success
+
+app = typer.Typer(help="Resident agent commands", no_args_is_help=True)
+
+# How long `start --detach` and `stop` wait for the agent to come up or go.
+STARTUP_WAIT_SEC = 10.0
+POLL_SEC = 0.1
+
+
+def _ping() -> Optional[dict]:
+    from hw_cli.core.agent_client import AgentError, call_agent
+
+    try:
+        return call_agent({"op": "ping"}, timeout=5)
+    except AgentError:
+        return None
+
+
+@app.command("start")
+def start_agent(
+    ctx: typer.Context,
+    detach: bool = typer.Option(
+        False, "--detach", "-d", help="Run in the background and return"
+    ),
+    idle_timeout: Optional[float] = typer.Option(
+        None, "--idle-timeout", help="Exit after this many idle seconds", min=1
+    ),
+):
+    """Serve commands such as `simulate once` from one long-lived process."""
+    import asyncio
+
+    from hw_cli.core.agent import Agent
+    from hw_cli.core.agent_client import socket_path
+
+    quiet = ctx.obj["quiet"]
+    running = _ping()
+    if running:
+        print_error(f"Agent already running (pid {running['pid']})")
+        raise typer.Exit(1)
+    path = socket_path()
+    # Left behind by an agent that did not shut down cleanly.
+    path.unlink(missing_ok=True)
+
+    if detach:
+        args = [sys.executable, "-m", "hw_cli"]
+        if ctx.obj.get("config_file"):
+            args += ["--config", str(ctx.obj["config_file"])]
+        args += ["agent", "start"]
+        if idle_timeout is not None:
+            args += ["--idle-timeout", str(idle_timeout)]
+        subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        deadline = time.monotonic() + STARTUP_WAIT_SEC
+        while time.monotonic() < deadline:
+            running = _ping()
+            if running:
+                if not quiet:
+                    print_success(
+                        f"Agent started (pid {running['pid']}) on {path}",
+                        file=sys.stderr,
+                    )
+                return
+            time.sleep(POLL_SEC)
+        print_error("Agent did not start; run 'hw agent start' to see why")
+        raise typer.Exit(1)
+
+    if not quiet:
+        print_info(f"Agent listening on {path} (Ctrl-C to stop)", file=sys.stderr)
+    agent = Agent(ctx.obj["config"].api, idle_timeout=idle_timeout)
+    try:
+        asyncio.run(agent.serve(path))
+    except KeyboardInterrupt:
+        pass
+    if not quiet:
+        print_info(
+            f"Agent stopped after {agent.requests} requests", file=sys.stderr
+        )
+
+
+@app.command("status")
+def agent_status(ctx: typer.Context):
+    """Show whether the agent is running and what it has served."""
+    running = _ping()
+    if ctx.obj["output"] == "json":
+        running_info = {k: v for k, v in (running or {}).items() if k != "ok"}
+        print(json.dumps({"running": bool(running), **running_info}))
+    elif running:
+        print(f"Running: pid {running['pid']}, up {running['uptime']:.0f}s")
+        print(f"Requests: {running['requests']} ({running['errors']} failed)")
+        print(f"Clients: {running['clients']}")
+    else:
+        print("Not running")
+    if not running:
+        raise typer.Exit(1)
+
+
+@app.command("stop")
+def stop_agent(ctx: typer.Context):
+    """Stop the running agent."""
+    from hw_cli.core.agent_client import call_agent, socket_path
+
+    if not call_agent({"op": "stop"}, timeout=5):
+        print_error("Agent is not running")
+        raise typer.Exit(1)
+
+    deadline = time.monotonic() + STARTUP_WAIT_SEC
+    while socket_path().exists() and time.monotonic() < deadline:
+        time.sleep(POLL_SEC)
+    if not ctx.obj["quiet"]:
+        print_success("Agent stopped", file=sys.stderr)
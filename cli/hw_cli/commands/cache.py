@@ -2,13 +2,15 @@ import json
 import sys
 import time
 from datetime import datetime
+from typing import Optional
 
 import typer
 from rich.prompt import Confirm
 
+from hw_cli.core.device_manager import DeviceManager
 from hw_cli.core.storage import get_data
 from hw_cli.core.token_cache import get_token_cache
-from hw_cli.utils.console import print_info, print_success, print_warning
+from hw_cli.utils.console import print_error, print_info, print_success, print_warning
 
 app = typer.Typer(help="Token cache management commands", no_args_is_help=True)
 
@@ -128,7 +130,12 @@ def clean_cache(ctx: typer.Context):
 
 
 @app.command("stats")
-def cache_stats(ctx: typer.Context):
+def cache_stats(
+    ctx: typer.Context,
+    reset: bool = typer.Option(
+        False, "--reset", help="Zero the hit/miss counters after showing them"
+    ),
+):
     """Show cache statistics."""
     cache = get_token_cache()
     stats = cache.get_stats()
@@ -136,10 +143,79 @@ def cache_stats(ctx: typer.Context):
 
     if output == "json":
         print(json.dumps(stats, indent=2))
-        return
+    else:
+        print_info("Token Cache Statistics", file=sys.stderr)
+        print(f"  Total:   {stats['total']}")
+        print(f"  Valid:   {stats['valid']}")
+        print(f"  Expired: {stats['expired']}")
+        for tier, label in (("memory", "Memory"), ("db", "SQLite")):
+            counts = stats[tier]
+            print(
+                f"  {label + ':':<8} {counts['hits']} hits, {counts['misses']} misses "
+                f"({counts['hit_rate']:.1%} hit rate)"
+            )
+        print(f"  File:    {get_data().db_path}")
+
+    if reset:
+        cache.reset_stats()
+
+
+@app.command("warm")
+def warm_cache(
+    ctx: typer.Context,
+    match: Optional[str] = typer.Option(
+        None, "--match", "-p", help="Glob pattern on device name or device_id"
+    ),
+    count: Optional[int] = typer.Option(
+        None, "--count", "-c", help="Max number of devices to warm", min=1
+    ),
+    concurrency: int = typer.Option(
+        20, "--concurrency", help="Max token requests in flight", min=1
+    ),
+    force: bool = typer.Option(
+        False, "--force", "-f", help="Also replace tokens that are still valid"
+    ),
+):
+    """Fetch tokens for registered devices ahead of a run."""
+    # httpx is only loaded by the commands that talk to the API.
+    import asyncio
+
+    from hw_cli.core.fleet import select_devices
+    from hw_cli.core.token_warmer import warm_tokens
+
+    output = ctx.obj["output"]
+    quiet = ctx.obj["quiet"]
+    devices = select_devices(DeviceManager().get_devices(registered=True), match, count)
+
+    if not devices:
+        print_error("No registered devices match the filter")
+        raise typer.Exit(1)
+
+    try:
+        stats = asyncio.run(
+            warm_tokens(
+                devices,
+                concurrency=concurrency,
+                force=force,
+                api=ctx.obj["config"].api,
+            )
+        )
+    except KeyboardInterrupt:
+        print_warning("Interrupted", file=sys.stderr)
+        raise typer.Exit(130)
+
+    if output == "json":
+        print(json.dumps(stats.to_dict(), indent=2))
+    elif not quiet:
+        print_success(
+            f"Fetched {stats.fetched} tokens in {stats.elapsed:.2f}s "
+            f"({stats.skipped} already valid, {len(stats.failed)} failed)",
+            file=sys.stderr,
+        )
+        if stats.fetched:
+            print(stats.latency.format_summary(), file=sys.stderr)
+        for device_id, error in stats.failed.items():
+            print_warning(f"{device_id}: {error}", file=sys.stderr)
 
-    print_info("Token Cache Statistics", file=sys.stderr)
-    print(f"  Total:   {stats['total']}")
-    print(f"  Valid:   {stats['valid']}")
-    print(f"  Expired: {stats['expired']}")
-    print(f"  File:    {get_data().db_path}")
+    if stats.failed:
+        raise typer.Exit(1)
@@ -10,7 +10,7 @@ from rich import print as rich_print
 from rich.prompt import Confirm
 
 from hw_cli.core.config import ConfigManager
-from hw_cli.core.storage import get_app_dir, get_data
+from hw_cli.core.storage import DB_FILENAME, get_app_dir
 from hw_cli.utils.console import print_error, print_info, print_success
 
 app = typer.Typer(help="Configuration management commands", no_args_is_help=True)
@@ -83,14 +83,15 @@ def config_path(ctx: typer.Context):
 
     app_dir = get_app_dir()
     config_file = mgr.resolve_path()
-    data_file = get_data().db_path
+    # Not get_data(): opening the database would create it.
+    data_file = app_dir / DB_FILENAME
 
     print_info("Storage Locations:", file=sys.stderr)
 
     status_cfg = "(found)" if config_file.exists() else "(not found, using defaults)"
-    print(f"  Config:  {config_file:<60} {status_cfg}", file=sys.stderr)
+    print(f"  Config:  {str(config_file):<60} {status_cfg}", file=sys.stderr)
 
     status_data = "(found)" if data_file.exists() else "(empty)"
-    print(f"  Data:    {data_file:<60} {status_data}", file=sys.stderr)
+    print(f"  Data:    {str(data_file):<60} {status_data}", file=sys.stderr)
 
     print(f"  App Dir: {app_dir}", file=sys.stderr)
@@ -1,14 +1,15 @@
 import base64
+import contextlib
 import dataclasses
 import json
 import os
 import sys
-from typing import Optional
+import time
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
 
 import typer
 from rich.prompt import Confirm, Prompt
 
-from hw_cli.core.api.client import WeatherIoTClient
 from hw_cli.core.device_manager import DeviceManager
 from hw_cli.core.models import DeviceConfig
 from hw_cli.utils.console import (
@@ -23,18 +24,22 @@ from hw_cli.utils.console import (
 app = typer.Typer(help="Device management commands", no_args_is_help=True)
 
 
-def _extract_device_id_from_jwt(token: str) -> Optional[str]:
-    try:
-        parts = token.split(".")
-        if len(parts) != 3:
-            return None
+def _jwt_subject(token: str) -> Optional[str]:
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+
+    payload_b64 = parts[1]
+    padding = "=" * (4 - len(payload_b64) % 4)
+    payload_json = base64.urlsafe_b64decode(payload_b64 + padding)
+    payload = json.loads(payload_json)
 
-        payload_b64 = parts[1]
-        padding = "=" * (4 - len(payload_b64) % 4)
-        payload_json = base64.urlsafe_b64decode(payload_b64 + padding)
-        payload = json.loads(payload_json)
+    return payload.get("sub")
 
-        return payload.get("sub")
+
+def _extract_device_id_from_jwt(token: str) -> Optional[str]:
+    try:
+        return _jwt_subject(token)
     except Exception as e:
         print_error(f"Failed to parse JWT: {e}")
         return None
@@ -118,6 +123,201 @@ def add_device(
         print_success(f"Device '{device_name}' added", file=sys.stderr)
 
 
+def _read_device_entries(source: TextIO) -> Iterator[Tuple[str, Any]]:
+    """Yield (location, entry) from a JSON array or a JSON Lines stream.
+
+    JSON Lines is read one line at a time; an array is parsed whole.
+    """
+    first = True
+    for lineno, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        if first and line.lstrip().startswith("["):
+            for i, entry in enumerate(json.loads(line + source.read())):
+                yield f"entry {i}", entry
+            return
+        first = False
+        yield f"line {lineno}", json.loads(line)
+
+
+class _InvalidEntries(ValueError):
+    pass
+
+
+def _parse_devices(
+    source: TextIO, api_url: str, problems: List[str]
+) -> Iterator[DeviceConfig]:
+    """Yield the devices in `source`, collecting invalid entries in `problems`.
+
+    Raises _InvalidEntries at the end if there were any, so an import that
+    consumes this rolls back.
+    """
+    for where, entry in _read_device_entries(source):
+        try:
+            yield _device_from_entry(entry, api_url)
+        except ValueError as e:
+            problems.append(f"{where}: {e}")
+    if problems:
+        raise _InvalidEntries(f"{len(problems)} invalid entries")
+
+
+def _device_from_entry(entry: Any, api_url: str) -> DeviceConfig:
+    """Build a device from a `generate_devices.py` entry."""
+    if not isinstance(entry, dict):
+        raise ValueError("expected an object")
+    token = entry.get("provisioning_jwt") or entry.get("provisioning_token")
+    if not token:
+        raise ValueError("missing provisioning_jwt")
+    try:
+        device_id = entry.get("device_id") or _jwt_subject(token)
+    except Exception as e:
+        raise ValueError(f"invalid provisioning_jwt: {e}")
+    if not device_id:
+        raise ValueError("missing device_id")
+
+    metadata = {k: entry[k] for k in ("claim_words", "claim_url") if entry.get(k)}
+    return DeviceConfig(
+        device_id=device_id,
+        name=entry.get("name") or device_id,
+        api_base_url=entry.get("api_base_url") or api_url,
+        provisioning_token=token,
+        metadata=metadata,
+    )
+
+
+@app.command("import")
+def import_devices(
+    ctx: typer.Context,
+    path: str = typer.Argument(
+        ..., help="JSON array from generate_devices.py, or JSON Lines ('-' for stdin)"
+    ),
+    api_url: Optional[str] = typer.Option(
+        None, "--api-url", "-u", help="API base URL for entries without one"
+    ),
+    replace: bool = typer.Option(
+        False, "--replace", help="Overwrite devices that already exist"
+    ),
+):
+    """Import many devices at once in a single transaction."""
+    quiet = ctx.obj["quiet"]
+    api_url = api_url or ctx.obj["config"].api.base_url
+    started = time.perf_counter()
+
+    mgr = DeviceManager()
+    problems: List[str] = []
+    try:
+        with (
+            contextlib.nullcontext(sys.stdin) if path == "-" else open(path)
+        ) as source:
+            saved, skipped = mgr.import_devices(
+                _parse_devices(source, api_url, problems), replace=replace
+            )
+    except _InvalidEntries:
+        for problem in problems[:10]:
+            print_error(problem)
+        if len(problems) > 10:
+            print_error(f"... and {len(problems) - 10} more")
+        print_error("Nothing imported")
+        raise typer.Exit(1)
+    except (OSError, ValueError) as e:
+        print_error(f"Cannot read {path}: {e}")
+        raise typer.Exit(1)
+
+    if saved and not mgr.get_default_device_id():
+        mgr.set_default_device(saved[0])
+    elapsed = time.perf_counter() - started
+
+    if ctx.obj["output"] == "json":
+        print(
+            json.dumps(
+                {
+                    "imported": len(saved),
+                    "skipped": skipped,
+                    "elapsed": round(elapsed, 3),
+                }
+            )
+        )
+    elif not quiet:
+        print_success(
+            f"Imported {len(saved)} devices in {elapsed:.2f}s "
+            f"({skipped} skipped as duplicates)",
+            file=sys.stderr,
+        )
+
+
+def _register_all(
+    ctx: typer.Context,
+    match: Optional[str],
+    count: Optional[int],
+    concurrency: int,
+    claim_codes: bool,
+) -> None:
+    import asyncio
+
+    from hw_cli.core.fleet import select_devices
+    from hw_cli.core.registration import register_devices
+
+    quiet = ctx.obj["quiet"]
+    devices = select_devices(
+        DeviceManager().get_devices(registered=False), match, count, registered=False
+    )
+    if not devices:
+        if not quiet:
+            print_info("No unregistered devices match the filter", file=sys.stderr)
+        return
+
+    def on_registered(device: DeviceConfig, code: Optional[str]) -> None:
+        if claim_codes:
+            print(
+                json.dumps(
+                    {
+                        "device_id": device.device_id,
+                        "name": device.name,
+                        "claim_code": code,
+                    }
+                ),
+                flush=True,
+            )
+
+    if not quiet:
+        print_info(
+            f"Registering {len(devices)} devices "
+            f"({min(concurrency, len(devices))} at a time)...",
+            file=sys.stderr,
+        )
+
+    try:
+        stats = asyncio.run(
+            register_devices(
+                devices,
+                concurrency=concurrency,
+                claim_codes=claim_codes,
+                api=ctx.obj["config"].api,
+                on_registered=on_registered,
+            )
+        )
+    except KeyboardInterrupt:
+        print_warning("Interrupted, registered devices were saved", file=sys.stderr)
+        raise typer.Exit(130)
+
+    if ctx.obj["output"] == "json" and not claim_codes:
+        print(json.dumps(stats.to_dict()))
+    elif not quiet:
+        print_success(
+            f"Registered {stats.registered}/{stats.total} devices in "
+            f"{stats.elapsed:.1f}s ({stats.throughput:.1f}/s), "
+            f"{len(stats.failed)} failed",
+            file=sys.stderr,
+        )
+        if stats.registered:
+            print(stats.latency.format_summary(), file=sys.stderr)
+        for device_id, error in stats.failed.items():
+            print_warning(f"{device_id}: {error}", file=sys.stderr)
+
+    if stats.failed:
+        raise typer.Exit(1)
+
+
 @app.command("register")
 def register_device(
     ctx: typer.Context,
@@ -125,8 +325,43 @@ def register_device(
     raw: bool = typer.Option(
         False, "--raw", help="Output only claim code, suppress all status"
     ),
+    all_devices: bool = typer.Option(
+        False, "--all", help="Register every unregistered device"
+    ),
+    match: Optional[str] = typer.Option(
+        None,
+        "--match",
+        "-p",
+        help="Register unregistered devices whose name or device_id matches",
+    ),
+    count: Optional[int] = typer.Option(
+        None, "--count", "-c", help="Max number of devices to register", min=1
+    ),
+    concurrency: int = typer.Option(
+        20, "--concurrency", help="Max registrations in flight", min=1
+    ),
+    claim_codes: bool = typer.Option(
+        False,
+        "--claim-codes",
+        help="With --all/--match, print a claim code per device as JSON Lines",
+    ),
 ):
-    """Register device and get claim code."""
+    """Register device and get claim code.
+
+    With --all, --match or --count, every matching unregistered device is
+    registered concurrently.
+    """
+    if all_devices or match or count:
+        if device_ref:
+            print_error("Pass either a device or --all/--match/--count, not both")
+            raise typer.Exit(1)
+        _register_all(ctx, match, count, concurrency, claim_codes)
+        return
+
+    # httpx is only loaded by the commands that talk to the API.
+    import asyncio
+
+    from hw_cli.core.api.client import WeatherIoTClient
 
     async def run():
         mgr = DeviceManager()
@@ -139,7 +374,7 @@ def register_device(
             raise typer.Exit(1)
 
         try:
-            async with WeatherIoTClient(device) as client:
+            async with WeatherIoTClient(device, api=ctx.obj["config"].api) as client:
                 use_spinner = (output_format == "text") and (not quiet)
 
                 if use_spinner:
@@ -190,8 +425,6 @@ def register_device(
             print_error(f"Registration failed: {e}")
             raise typer.Exit(1)
 
-    import asyncio
-
     asyncio.run(run())
 
 
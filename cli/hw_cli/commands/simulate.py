@@ -1,30 +1,91 @@
-import asyncio
 import json
-import random
 import sys
 import time
 from contextlib import asynccontextmanager
-from dataclasses import asdict
 from datetime import datetime
-from typing import Any, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import httpx
-import rich
-import rich.console
 import typer
-from rich import print as rich_print
 
-from hw_cli.core.api.client import WeatherIoTClient
-from hw_cli.core.data_generator import DataGenerator
-from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.agent_client import AgentError, call_agent
+from hw_cli.core.api.compression import (
+    COMPRESSIONS,
+    DEFAULT_THRESHOLD_BYTES,
+    BodyCompressor,
+    CompressionStats,
+    zstd_available,
+)
+from hw_cli.core.api.encoding import ENCODINGS, EncodingStats
+from hw_cli.core.constants import DEFAULT_TARGET_LATENCY_SEC
+from hw_cli.core.models import TelemetryData
 from hw_cli.utils.console import print_error, print_info, print_success, print_warning
 
+# httpx, the API client and the runners are imported by the commands that use
+# them, so `simulate once` handed to an agent starts without them.
+if TYPE_CHECKING:
+    import httpx
+
+    from hw_cli.core.api.client import WeatherIoTClient
+    from hw_cli.core.backfill import BackfillStats
+    from hw_cli.core.corpus import ReplayStats
+    from hw_cli.core.fleet import FleetStats
+    from hw_cli.core.limiter import LimiterStats
+    from hw_cli.core.load import LoadStats
+
 app = typer.Typer(help="Simulation commands", no_args_is_help=True)
 
 
-def _print_telemetry_summary(data: Any, format_type: str = "text") -> None:
+def _check_encoding(encoding: str) -> None:
+    if encoding not in ENCODINGS:
+        print_error(f"Encoding must be one of: {', '.join(ENCODINGS)}")
+        raise typer.Exit(1)
+
+
+def _check_compression(compress: Optional[str]) -> None:
+    if compress is None:
+        return
+    if compress not in COMPRESSIONS:
+        print_error(f"Compression must be one of: {', '.join(COMPRESSIONS)}")
+        raise typer.Exit(1)
+    if compress == "zstd" and not zstd_available():
+        print_error("zstd compression requires zstandard: pip install zstandard")
+        raise typer.Exit(1)
+
+
+def _print_compression_stats(stats: CompressionStats) -> None:
+    if stats.bodies:
+        print(stats.format_summary(), file=sys.stderr)
+
+
+def _print_limiter_stats(stats: "LimiterStats") -> None:
+    if stats.timeline:
+        print(stats.format_summary(), file=sys.stderr)
+        print(stats.format_timeline(), file=sys.stderr)
+
+
+def _check_batching(batch_size: int, encoding: str) -> None:
+    if batch_size > 1 and encoding != "json":
+        print_error("--batch-size requires --encoding json")
+        raise typer.Exit(1)
+
+
+def _print_telemetry_summary(
+    data: Any,
+    format_type: str = "text",
+    latency: Optional[float] = None,
+    encoding: Optional[EncodingStats] = None,
+    compression: Optional[CompressionStats] = None,
+) -> None:
     if format_type == "json":
-        print(json.dumps(asdict(data), indent=2))
+        out = data.to_dict()
+        if latency is not None:
+            out["latency_ms"] = round(latency * 1000, 3)
+        if encoding is not None:
+            out["encoding"] = encoding.to_dict()
+        if compression is not None and compression.bodies:
+            out["compression"] = compression.to_dict()
+        print(json.dumps(out, indent=2))
         return
 
     r = data.reading
@@ -36,11 +97,52 @@ def _print_telemetry_summary(data: Any, format_type: str = "text") -> None:
     print(f"Humidity:    {r.humidity:.1f} %")
     print(f"Pressure:    {r.pressure:.1f} hPa")
     print(f"Rain Tips:   {rain_tips}")
+    if latency is not None:
+        print(f"Latency:     {latency * 1000:.1f} ms")
+    if encoding is not None:
+        for name, size, us in encoding.per_message():
+            print(f"{name + ':':<12} {size:.0f} B, encoded in {us:.1f} us")
+    if compression is not None and compression.bodies:
+        print(
+            f"{'Wire:':<12} {compression.bytes_out} B "
+            f"({compression.method if compression.compressed else 'uncompressed'})"
+        )
+
+
+def _print_agent_send(
+    response: Dict[str, Any], format_type: str, quiet: bool
+) -> None:
+    if not response["ok"]:
+        status = response.get("status")
+        if status == 401:
+            print_error(
+                "HTTP 401 - token may be invalid. "
+                f"Run: hw cache clear -d {response['device']}"
+            )
+        elif status is not None:
+            print_error(f"HTTP {status}: {response['error']}")
+        elif "device" in response:
+            print_error(f"Failed: {response['error']}")
+        else:
+            print_error(response["error"])
+        raise typer.Exit(1)
+
+    if not quiet and format_type == "text":
+        print_success("Telemetry sent (via agent)", file=sys.stderr)
+    compression = response.get("compression")
+    _print_telemetry_summary(
+        TelemetryData.from_dict(response["data"]),
+        format_type,
+        response["latency"],
+        EncodingStats.from_dict(response["encoding"]),
+        CompressionStats.from_dict(compression) if compression else None,
+    )
 
 
 def _print_debug_info(
-    req: httpx.Request, res: Optional[httpx.Response], format_type: str
+    req: "httpx.Request", res: Optional["httpx.Response"], format_type: str
 ) -> None:
+    from rich import print as rich_print
     from rich.console import Group
     from rich.panel import Panel
     from rich.rule import Rule
@@ -114,17 +216,17 @@ def _print_debug_info(
 
 
 @asynccontextmanager
-async def _debug_hooks(client: WeatherIoTClient, enabled: bool):
+async def _debug_hooks(client: "WeatherIoTClient", enabled: bool):
     captured = {"req": [], "res": []}
 
     if not enabled or not client._client:
         yield captured
         return
 
-    async def on_request(request: httpx.Request):
+    async def on_request(request: "httpx.Request"):
         captured["req"].append(request)
 
-    async def on_response(response: httpx.Response):
+    async def on_response(response: "httpx.Response"):
         await response.aread()
         captured["res"].append(response)
 
@@ -164,10 +266,55 @@ def simulate_once(
     debug: bool = typer.Option(
         False, "--debug", help="Print full request/response headers and body"
     ),
+    encoding: str = typer.Option(
+        "json", "--encoding", "-e", help="Request body encoding: json or protobuf"
+    ),
+    compress: Optional[str] = typer.Option(
+        None, "--compress", help="Compress request bodies: gzip, deflate or zstd"
+    ),
+    compress_threshold: int = typer.Option(
+        DEFAULT_THRESHOLD_BYTES,
+        "--compress-threshold",
+        help="Send smaller bodies uncompressed (bytes)",
+        min=0,
+    ),
+    no_agent: bool = typer.Option(
+        False, "--no-agent", help="Send from this process even if an agent runs"
+    ),
 ):
     if format not in ["text", "json"]:
         print_error("Format must be 'text' or 'json'")
         raise typer.Exit(1)
+    _check_encoding(encoding)
+    _check_compression(compress)
+
+    # A running `hw agent` already holds the connection, token and device.
+    if not (dry_run or debug or no_agent):
+        try:
+            response = call_agent(
+                {
+                    "op": "send",
+                    "device": device,
+                    "encoding": encoding,
+                    "compress": compress,
+                    "compress_threshold": compress_threshold,
+                    "force_token": force_token,
+                }
+            )
+        except AgentError as e:
+            print_error(str(e))
+            raise typer.Exit(1)
+        if response is not None:
+            _print_agent_send(response, format, ctx.obj["quiet"])
+            return
+
+    import asyncio
+
+    import httpx
+
+    from hw_cli.core.api.client import WeatherIoTClient
+    from hw_cli.core.data_generator import DataGenerator
+    from hw_cli.core.device_manager import DeviceManager
 
     async def run():
         mgr = DeviceManager()
@@ -188,14 +335,29 @@ def simulate_once(
         generator = DataGenerator()
         data = generator.generate(device_obj)
 
+        # The other encodings are measured for comparison only.
+        encoding_stats = EncodingStats()
+        for other in ENCODINGS:
+            if other != encoding or dry_run:
+                encoding_stats.timed_encode(data, device_obj, other)
+
         if dry_run:
             if not quiet and format == "text":
                 print_info("(Dry Run)", file=sys.stderr)
-            _print_telemetry_summary(data, format)
+            _print_telemetry_summary(data, format, encoding=encoding_stats)
             return
 
         try:
-            async with WeatherIoTClient(device_obj) as client:
+            compressor = (
+                BodyCompressor(compress, compress_threshold) if compress else None
+            )
+            async with WeatherIoTClient(
+                device_obj,
+                encoding=encoding,
+                encoding_stats=encoding_stats,
+                api=ctx.obj["config"].api,
+                compressor=compressor,
+            ) as client:
                 if force_token:
                     client.invalidate_token()
 
@@ -203,18 +365,22 @@ def simulate_once(
 
                 async with _debug_hooks(client, debug) as captured:
                     if use_spinner:
+                        from rich.console import Console
                         from rich.progress import Progress, SpinnerColumn, TextColumn
 
                         with Progress(
                             SpinnerColumn(),
                             TextColumn("{task.description}"),
                             transient=True,
-                            console=rich.console.Console(stderr=True),
+                            console=Console(stderr=True),
                         ) as progress:
                             progress.add_task("Sending telemetry...", total=None)
+                            started = time.perf_counter()
                             await client.send_telemetry(data)
                     else:
+                        started = time.perf_counter()
                         await client.send_telemetry(data)
+                    latency = time.perf_counter() - started
 
                 if debug and captured["req"]:
                     _print_debug_info(
@@ -225,7 +391,13 @@ def simulate_once(
                 else:
                     if not quiet and format == "text":
                         print_success("Telemetry sent", file=sys.stderr)
-                    _print_telemetry_summary(data, format)
+                    _print_telemetry_summary(
+                        data,
+                        format,
+                        latency,
+                        encoding_stats,
+                        compressor.stats if compressor else None,
+                    )
 
         except httpx.HTTPStatusError as e:
             if debug and "captured" in locals():
@@ -283,16 +455,47 @@ def simulate_loop(
         "text", "--format", "-f", help="Output format: text or json"
     ),
     debug: bool = typer.Option(False, "--debug", help="Print full request/response"),
+    encoding: str = typer.Option(
+        "json", "--encoding", "-e", help="Request body encoding: json or protobuf"
+    ),
+    compress: Optional[str] = typer.Option(
+        None, "--compress", help="Compress request bodies: gzip, deflate or zstd"
+    ),
+    compress_threshold: int = typer.Option(
+        DEFAULT_THRESHOLD_BYTES,
+        "--compress-threshold",
+        help="Send smaller bodies uncompressed (bytes)",
+        min=0,
+    ),
 ):
     """Run continuous telemetry simulation."""
+    import asyncio
+    import random
+
+    import httpx
+
+    from hw_cli.core.api.client import WeatherIoTClient
+    from hw_cli.core.data_generator import DataGenerator
+    from hw_cli.core.device_manager import DeviceManager
+    from hw_cli.core.histogram import LatencyHistogram
+    from hw_cli.core.limiter import is_throttled, retry_after
+    from hw_cli.core.scheduler import Scheduler
+
     if jitter >= interval:
         print_error(f"Jitter ({jitter}s) must be less than interval ({interval}s)")
         raise typer.Exit(1)
+    _check_encoding(encoding)
+    _check_compression(compress)
+
+    quiet = ctx.obj["quiet"]
+    stats: Dict[str, Any] = {"sent": 0, "errors": 0}
+    latencies = LatencyHistogram()
+    encoding_stats = EncodingStats()
+    compressor = BodyCompressor(compress, compress_threshold) if compress else None
 
     async def run():
         mgr = DeviceManager()
         device_obj = mgr.resolve_device(device)
-        quiet = ctx.obj["quiet"]
 
         if not device_obj:
             print_error("Device not found or no default set")
@@ -306,15 +509,25 @@ def simulate_loop(
 
         generator = DataGenerator(seed=seed)
 
-        stats = {"sent": 0, "errors": 0, "start_time": time.time()}
+        stats["start_time"] = time.time()
+        start_monotonic = time.monotonic()
+        scheduler = Scheduler()
         consecutive_errors = 0
         MAX_CONSECUTIVE_ERRORS = 5
+        throttled = 0
+        resume_at = 0.0
 
         if not quiet:
             print_info(f"Starting simulation for: {device_obj.name}", file=sys.stderr)
             print_info(f"Interval: {interval}s (+/-{jitter}s jitter)", file=sys.stderr)
 
-        async with WeatherIoTClient(device_obj) as client:
+        async with WeatherIoTClient(
+            device_obj,
+            encoding=encoding,
+            encoding_stats=encoding_stats,
+            api=ctx.obj["config"].api,
+            compressor=compressor,
+        ) as client:
             if force_token:
                 client.invalidate_token()
 
@@ -331,13 +544,16 @@ def simulate_loop(
                                 )
                             print(f"{data.timestamp} | Generated (Dry Run)")
                         elif format == "json":
-                            print(json.dumps(asdict(data)))
+                            print(json.dumps(data.to_dict()))
                     else:
                         async with _debug_hooks(client, debug) as captured:
+                            started = time.perf_counter()
                             await client.send_telemetry(data)
+                            latencies.record(time.perf_counter() - started)
 
                         stats["sent"] += 1
                         consecutive_errors = 0
+                        throttled = 0
 
                         if debug and captured["req"]:
                             _print_debug_info(
@@ -354,16 +570,31 @@ def simulate_loop(
                                     )
                                 print(f"{data.timestamp} | Sent")
                             elif format == "json":
-                                print(json.dumps(asdict(data)))
+                                print(json.dumps(data.to_dict()))
 
                 except httpx.HTTPStatusError as e:
-                    consecutive_errors += 1
                     stats["errors"] += 1
+                    # Throttling is the backend asking us to slow down, not a
+                    # failure: wait as told (or back off) instead of aborting.
+                    if is_throttled(e):
+                        throttled += 1
+                        consecutive_errors = 0
+                        wait = retry_after(e)
+                        if wait is None:
+                            wait = min(interval, 2.0**throttled)
+                        resume_at = time.monotonic() + wait
+                    else:
+                        consecutive_errors += 1
 
                     if debug and "captured" in locals():
                         req = captured["req"][-1] if captured["req"] else e.request
                         res = captured["res"][-1] if captured["res"] else e.response
                         _print_debug_info(req, res, format)
+                    elif is_throttled(e):
+                        print_warning(
+                            f"HTTP {e.response.status_code}: throttled, "
+                            f"retrying in {wait:.1f}s"
+                        )
                     else:
                         if e.response.status_code == 401:
                             print_error(
@@ -391,30 +622,676 @@ def simulate_loop(
                 if max_messages and stats["sent"] >= max_messages:
                     break
 
-                target_timestamp = stats["start_time"] + (stats["sent"] * interval)
-                target_timestamp += random.uniform(-jitter, jitter)
+                deadline = start_monotonic + (stats["sent"] * interval)
+                deadline += random.uniform(-jitter, jitter)
+                await scheduler.sleep_until(
+                    max(deadline, time.monotonic() + 0.1, resume_at)
+                )
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print_error(f"Fatal: {e}")
+        raise typer.Exit(1)
+
+    if "start_time" not in stats:
+        return
+
+    elapsed = time.time() - stats["start_time"]
+    if not quiet:
+        print_info("\nStopped", file=sys.stderr)
+        print(
+            f"Sent: {stats['sent']} | Errors: {stats['errors']} | Time: {elapsed:.1f}s",
+            file=sys.stderr,
+        )
+        if not dry_run:
+            print(latencies.format_summary(), file=sys.stderr)
+            print(encoding_stats.format_summary(), file=sys.stderr)
+            if compressor:
+                _print_compression_stats(compressor.stats)
+    if format == "json" and not dry_run:
+        summary = {
+            "sent": stats["sent"],
+            "errors": stats["errors"],
+            "elapsed": round(elapsed, 3),
+            "latency": latencies.to_dict(),
+            "encoding": encoding_stats.to_dict(),
+        }
+        if compressor:
+            summary["compression"] = compressor.stats.to_dict()
+        print(json.dumps({"summary": summary}))
+
+
+def _print_fleet_stats(stats: "FleetStats", final: bool = False) -> None:
+    line = (
+        f"Sent: {stats.sent} | Errors: {stats.errors} | "
+        f"Rate: {stats.throughput:.2f} msg/s | Time: {stats.elapsed:.1f}s"
+    )
+    if not final:
+        line += f" | Active: {stats.active}"
+        if stats.concurrency.timeline:
+            line += f" | Limit: {stats.concurrency.limit}"
+    print(line, file=sys.stderr)
+    if final:
+        print(stats.latency.format_summary(), file=sys.stderr)
+        print(stats.encoding.format_summary(), file=sys.stderr)
+        _print_compression_stats(stats.compression)
+        if stats.batching.requests:
+            print(stats.batching.format_summary(), file=sys.stderr)
+        _print_limiter_stats(stats.concurrency)
+
+
+@app.command("fleet")
+def simulate_fleet(
+    ctx: typer.Context,
+    match: Optional[str] = typer.Option(
+        None, "--match", "-p", help="Glob pattern on device name or device_id"
+    ),
+    count: Optional[int] = typer.Option(
+        None, "--count", "-c", help="Max number of devices to run", min=1
+    ),
+    interval: int = typer.Option(
+        300, "--interval", "-i", help="Interval in seconds", min=1
+    ),
+    jitter: float = typer.Option(
+        5.0, "--jitter", "-j", help="Random jitter seconds", min=0
+    ),
+    max_messages: Optional[int] = typer.Option(
+        None, "--max-messages", "-m", help="Max messages per device", min=1
+    ),
+    duration: Optional[float] = typer.Option(
+        None, "--duration", help="Stop after this many seconds", min=0
+    ),
+    seed: Optional[int] = typer.Option(
+        None, "--seed", "-s", help="Random seed for deterministic data"
+    ),
+    stagger: bool = typer.Option(
+        True, "--stagger/--no-stagger", help="Spread device start times over one interval"
+    ),
+    report_interval: float = typer.Option(
+        10.0, "--report-interval", help="Seconds between progress lines", min=0.1
+    ),
+    workers: int = typer.Option(
+        1, "--workers", "-w", help="Worker processes, each with its own event loop", min=1
+    ),
+    encoding: str = typer.Option(
+        "json", "--encoding", "-e", help="Request body encoding: json or protobuf"
+    ),
+    compress: Optional[str] = typer.Option(
+        None, "--compress", help="Compress request bodies: gzip, deflate or zstd"
+    ),
+    compress_threshold: int = typer.Option(
+        DEFAULT_THRESHOLD_BYTES,
+        "--compress-threshold",
+        help="Send smaller bodies uncompressed (bytes)",
+        min=0,
+    ),
+    batch_size: int = typer.Option(
+        1, "--batch-size", help="Readings per request (JSON encoding only)", min=1
+    ),
+    linger_ms: float = typer.Option(
+        100.0,
+        "--linger-ms",
+        help="Max time a reading waits for its batch to fill",
+        min=0,
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Adapt requests in flight to throttling (429/503) and latency",
+    ),
+    target_latency_ms: float = typer.Option(
+        DEFAULT_TARGET_LATENCY_SEC * 1000,
+        "--target-latency-ms",
+        help="With --adaptive, back off when responses take longer than this",
+        min=1,
+    ),
+    format: str = typer.Option(
+        "text", "--format", "-f", help="Output format: text or json"
+    ),
+):
+    """Run many registered devices concurrently in one process."""
+    import asyncio
+
+    from hw_cli.core.device_manager import DeviceManager
+    from hw_cli.core.fleet import FleetRunner, select_devices
+    from hw_cli.core.sharding import ShardedFleetRunner
+
+    if jitter >= interval:
+        print_error(f"Jitter ({jitter}s) must be less than interval ({interval}s)")
+        raise typer.Exit(1)
+    _check_encoding(encoding)
+    _check_compression(compress)
+    _check_batching(batch_size, encoding)
+
+    quiet = ctx.obj["quiet"]
+    devices = select_devices(DeviceManager().get_devices(registered=True), match, count)
+
+    if not devices:
+        print_error("No registered devices match the filter")
+        raise typer.Exit(1)
+
+    options = dict(
+        interval=interval,
+        jitter=jitter,
+        max_messages=max_messages,
+        duration=duration,
+        seed=seed,
+        stagger=stagger,
+        encoding=encoding,
+        api=ctx.obj["config"].api,
+        compression=compress,
+        compression_threshold=compress_threshold,
+        batch_size=batch_size,
+        linger=linger_ms / 1000,
+        adaptive=adaptive,
+        target_latency=target_latency_ms / 1000,
+    )
+
+    if not quiet:
+        print_info(
+            f"Starting fleet of {len(devices)} devices"
+            + (f" across {workers} workers" if workers > 1 else ""),
+            file=sys.stderr,
+        )
+        print_info(f"Interval: {interval}s (+/-{jitter}s jitter)", file=sys.stderr)
+
+    on_progress = None if quiet else _print_fleet_stats
+
+    try:
+        if workers > 1:
+            runner = ShardedFleetRunner(
+                devices, workers, report_interval=report_interval, **options
+            )
+            runner.run(on_progress)
+        else:
+            runner = FleetRunner(devices, **options)
+            asyncio.run(runner.run(on_progress, report_interval))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print_error(f"Fatal: {e}")
+        raise typer.Exit(1)
+
+    if format == "json":
+        print(json.dumps(runner.stats.to_dict()))
+    elif not quiet:
+        print_info("\nStopped", file=sys.stderr)
+        _print_fleet_stats(runner.stats, final=True)
+
+
+def _print_load_stats(stats: "LoadStats", final: bool = False) -> None:
+    line = (
+        f"Offered: {stats.offered_rate:.2f} msg/s | "
+        f"Achieved: {stats.achieved_rate:.2f} msg/s | "
+        f"Sent: {stats.sent} | Errors: {stats.errors} | Time: {stats.elapsed:.1f}s"
+    )
+    if not final:
+        line += f" | In-flight: {stats.in_flight}"
+        if stats.concurrency.timeline:
+            line += f" | Limit: {stats.concurrency.limit}"
+    else:
+        line += f" | Peak in-flight: {stats.peak_in_flight}"
+    print(line, file=sys.stderr)
+    print(stats.latency.format_summary(), file=sys.stderr)
+    if final:
+        print(stats.encoding.format_summary(), file=sys.stderr)
+        _print_compression_stats(stats.compression)
+        if stats.batching.requests:
+            print(stats.batching.format_summary(), file=sys.stderr)
+        _print_limiter_stats(stats.concurrency)
+
+
+@app.command("load")
+def simulate_load(
+    ctx: typer.Context,
+    rate: float = typer.Option(
+        ..., "--rate", "-r", help="Offered load in messages per second", min=0.001
+    ),
+    duration: float = typer.Option(
+        ..., "--duration", help="Length of the arrival schedule in seconds", min=0.001
+    ),
+    max_in_flight: int = typer.Option(
+        1000, "--max-in-flight", help="Cap on outstanding requests", min=1
+    ),
+    match: Optional[str] = typer.Option(
+        None, "--match", "-p", help="Glob pattern on device name or device_id"
+    ),
+    count: Optional[int] = typer.Option(
+        None, "--count", "-c", help="Max number of devices to use", min=1
+    ),
+    seed: Optional[int] = typer.Option(
+        None, "--seed", "-s", help="Random seed for deterministic data"
+    ),
+    report_interval: float = typer.Option(
+        10.0, "--report-interval", help="Seconds between progress lines", min=0.1
+    ),
+    encoding: str = typer.Option(
+        "json", "--encoding", "-e", help="Request body encoding: json or protobuf"
+    ),
+    compress: Optional[str] = typer.Option(
+        None, "--compress", help="Compress request bodies: gzip, deflate or zstd"
+    ),
+    compress_threshold: int = typer.Option(
+        DEFAULT_THRESHOLD_BYTES,
+        "--compress-threshold",
+        help="Send smaller bodies uncompressed (bytes)",
+        min=0,
+    ),
+    batch_size: int = typer.Option(
+        1, "--batch-size", help="Readings per request (JSON encoding only)", min=1
+    ),
+    linger_ms: float = typer.Option(
+        100.0,
+        "--linger-ms",
+        help="Max time a reading waits for its batch to fill",
+        min=0,
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Adapt requests in flight to throttling (429/503) and latency",
+    ),
+    target_latency_ms: float = typer.Option(
+        DEFAULT_TARGET_LATENCY_SEC * 1000,
+        "--target-latency-ms",
+        help="With --adaptive, back off when responses take longer than this",
+        min=1,
+    ),
+    format: str = typer.Option(
+        "text", "--format", "-f", help="Output format: text or json"
+    ),
+):
+    """Open-loop load at a constant arrival rate, spread across devices."""
+    import asyncio
+
+    from hw_cli.core.device_manager import DeviceManager
+    from hw_cli.core.fleet import select_devices
+    from hw_cli.core.load import OpenLoopLoadRunner
+
+    _check_encoding(encoding)
+    _check_compression(compress)
+    _check_batching(batch_size, encoding)
+    quiet = ctx.obj["quiet"]
+    devices = select_devices(DeviceManager().get_devices(registered=True), match, count)
+
+    if not devices:
+        print_error("No registered devices match the filter")
+        raise typer.Exit(1)
+
+    runner = OpenLoopLoadRunner(
+        devices,
+        rate=rate,
+        duration=duration,
+        max_in_flight=max_in_flight,
+        seed=seed,
+        encoding=encoding,
+        api=ctx.obj["config"].api,
+        compression=compress,
+        compression_threshold=compress_threshold,
+        batch_size=batch_size,
+        linger=linger_ms / 1000,
+        adaptive=adaptive,
+        target_latency=target_latency_ms / 1000,
+    )
+
+    if not quiet:
+        print_info(
+            f"Offering {rate:g} msg/s for {duration:g}s across {len(devices)} devices",
+            file=sys.stderr,
+        )
+
+    on_progress = None if quiet else _print_load_stats
 
-                now = time.time()
-                sleep_secs = max(0.1, target_timestamp - now)
+    try:
+        asyncio.run(runner.run(on_progress, report_interval))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print_error(f"Fatal: {e}")
+        raise typer.Exit(1)
+
+    if format == "json":
+        print(json.dumps(runner.stats.to_dict()))
+    elif not quiet:
+        print_info("\nStopped", file=sys.stderr)
+        _print_load_stats(runner.stats, final=True)
+
+
+def _parse_time(value: str) -> int:
+    """Parse an epoch timestamp or ISO 8601 date/datetime (local time if naive)."""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        raise typer.BadParameter(f"Expected epoch seconds or ISO date, got '{value}'")
 
-                remaining = sleep_secs
-                while remaining > 0:
-                    chunk = min(0.1, remaining)
-                    await asyncio.sleep(chunk)
-                    remaining -= chunk
 
-        elapsed = time.time() - stats["start_time"]
+def _print_backfill_stats(stats: "BackfillStats", final: bool = False) -> None:
+    done = stats.sent + stats.errors
+    line = (
+        f"Progress: {done}/{stats.total} | Sent: {stats.sent} | "
+        f"Errors: {stats.errors} | Rate: {stats.throughput:.2f} msg/s | "
+        f"Time: {stats.elapsed:.1f}s"
+    )
+    if not final and stats.concurrency.timeline:
+        line += f" | Limit: {stats.concurrency.limit}"
+    print(line, file=sys.stderr)
+    if final:
+        print(stats.latency.format_summary(), file=sys.stderr)
+        _print_compression_stats(stats.compression)
+        _print_limiter_stats(stats.concurrency)
+
+
+@app.command("backfill")
+def simulate_backfill(
+    ctx: typer.Context,
+    start: str = typer.Option(
+        ..., "--from", help="Start of range (epoch seconds or ISO date), inclusive"
+    ),
+    end: str = typer.Option(
+        ..., "--to", help="End of range (epoch seconds or ISO date), exclusive"
+    ),
+    step: int = typer.Option(300, "--step", help="Seconds between readings", min=1),
+    device: Optional[str] = typer.Option(
+        None,
+        "--device",
+        "--name",
+        "-n",
+        "--device-id",
+        "-d",
+        help="Device name or device_id",
+    ),
+    match: Optional[str] = typer.Option(
+        None, "--match", "-p", help="Glob pattern on device name or device_id"
+    ),
+    count: Optional[int] = typer.Option(
+        None, "--count", "-c", help="Max number of devices to backfill", min=1
+    ),
+    concurrency: int = typer.Option(
+        50, "--concurrency", help="Max requests in flight", min=1
+    ),
+    seed: Optional[int] = typer.Option(
+        None, "--seed", "-s", help="Random seed for deterministic data"
+    ),
+    restart: bool = typer.Option(
+        False, "--restart", help="Ignore saved progress and start from --from"
+    ),
+    compress: Optional[str] = typer.Option(
+        None, "--compress", help="Compress request bodies: gzip, deflate or zstd"
+    ),
+    compress_threshold: int = typer.Option(
+        DEFAULT_THRESHOLD_BYTES,
+        "--compress-threshold",
+        help="Send smaller bodies uncompressed (bytes)",
+        min=0,
+    ),
+    report_interval: float = typer.Option(
+        10.0, "--report-interval", help="Seconds between progress lines", min=0.1
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Adapt requests in flight to throttling (429/503) and latency",
+    ),
+    target_latency_ms: float = typer.Option(
+        DEFAULT_TARGET_LATENCY_SEC * 1000,
+        "--target-latency-ms",
+        help="With --adaptive, back off when responses take longer than this",
+        min=1,
+    ),
+    format: str = typer.Option(
+        "text", "--format", "-f", help="Output format: text or json"
+    ),
+):
+    """Generate and upload historical telemetry, resuming interrupted runs."""
+    import asyncio
+
+    from hw_cli.core.backfill import BackfillRunner
+    from hw_cli.core.device_manager import DeviceManager
+    from hw_cli.core.fleet import select_devices
+
+    _check_compression(compress)
+    quiet = ctx.obj["quiet"]
+    start_ts, end_ts = _parse_time(start), _parse_time(end)
+    if end_ts <= start_ts:
+        print_error("--to must be after --from")
+        raise typer.Exit(1)
+
+    mgr = DeviceManager()
+    if match or count:
+        devices = select_devices(mgr.get_devices(registered=True), match, count)
+    else:
+        device_obj = mgr.resolve_device(device)
+        devices = [device_obj] if device_obj and device_obj.is_registered else []
+
+    if not devices:
+        print_error("No registered device found")
+        raise typer.Exit(1)
+
+    runner = BackfillRunner(
+        devices,
+        start=start_ts,
+        end=end_ts,
+        step=step,
+        concurrency=concurrency,
+        seed=seed,
+        restart=restart,
+        api=ctx.obj["config"].api,
+        compression=compress,
+        compression_threshold=compress_threshold,
+        adaptive=adaptive,
+        target_latency=target_latency_ms / 1000,
+    )
+
+    on_progress = None if quiet else _print_backfill_stats
+
+    try:
+        asyncio.run(runner.run(on_progress, report_interval))
+    except KeyboardInterrupt:
         if not quiet:
-            print_info("\nStopped", file=sys.stderr)
-            print(
-                f"Sent: {stats['sent']} | Errors: {stats['errors']} | Time: {elapsed:.1f}s",
+            print_warning("\nInterrupted, progress saved", file=sys.stderr)
+    except Exception as e:
+        print_error(f"Fatal: {e}")
+        raise typer.Exit(1)
+
+    if format == "json":
+        print(json.dumps(runner.stats.to_dict()))
+    elif not quiet:
+        if runner.stats.resumed:
+            print_info(
+                f"Resumed: skipped {runner.stats.resumed} already uploaded readings",
                 file=sys.stderr,
             )
+        _print_backfill_stats(runner.stats, final=True)
+
+
+@app.command("record")
+def simulate_record(
+    ctx: typer.Context,
+    out: Path = typer.Option(..., "--out", "-o", help="Corpus file to write"),
+    start: str = typer.Option(
+        ..., "--from", help="Start of range (epoch seconds or ISO date), inclusive"
+    ),
+    end: str = typer.Option(
+        ..., "--to", help="End of range (epoch seconds or ISO date), exclusive"
+    ),
+    step: int = typer.Option(300, "--step", help="Seconds between readings", min=1),
+    device: Optional[str] = typer.Option(
+        None,
+        "--device",
+        "--name",
+        "-n",
+        "--device-id",
+        "-d",
+        help="Device name or device_id",
+    ),
+    match: Optional[str] = typer.Option(
+        None, "--match", "-p", help="Glob pattern on device name or device_id"
+    ),
+    count: Optional[int] = typer.Option(
+        None, "--count", "-c", help="Max number of devices to record", min=1
+    ),
+    seed: Optional[int] = typer.Option(
+        None, "--seed", "-s", help="Random seed for deterministic data"
+    ),
+):
+    """Write pre-encoded telemetry request bodies to a replayable corpus."""
+    from hw_cli.core.corpus import record_corpus
+    from hw_cli.core.device_manager import DeviceManager
+    from hw_cli.core.fleet import select_devices
+
+    start_ts, end_ts = _parse_time(start), _parse_time(end)
+    if end_ts <= start_ts:
+        print_error("--to must be after --from")
+        raise typer.Exit(1)
+
+    mgr = DeviceManager()
+    if match or count:
+        devices = select_devices(mgr.get_devices(registered=True), match, count)
+    else:
+        device_obj = mgr.resolve_device(device)
+        devices = [device_obj] if device_obj and device_obj.is_registered else []
+
+    # Replay only sends for registered devices, so only those are recorded.
+    if not devices:
+        print_error("No registered device found")
+        raise typer.Exit(1)
+
+    started = time.perf_counter()
+    writer = record_corpus(out, devices, start_ts, end_ts, step, seed=seed)
+    elapsed = time.perf_counter() - started
+
+    if not ctx.obj["quiet"]:
+        print_success(
+            f"Recorded {len(writer)} messages for {len(devices)} devices "
+            f"({writer.bytes_written / 1024:.1f} KiB) in {elapsed:.1f}s -> {out}",
+            file=sys.stderr,
+        )
+
+
+def _print_replay_stats(stats: "ReplayStats", final: bool = False) -> None:
+    line = (
+        f"Sent: {stats.sent} | Errors: {stats.errors} | "
+        f"Rate: {stats.throughput:.2f} msg/s | "
+        f"Bytes: {stats.bytes_sent / 1024:.1f} KiB | Time: {stats.elapsed:.1f}s"
+    )
+    if not final and stats.concurrency.timeline:
+        line += f" | Limit: {stats.concurrency.limit}"
+    print(line, file=sys.stderr)
+    if final:
+        print(stats.latency.format_summary(), file=sys.stderr)
+        _print_compression_stats(stats.compression)
+        _print_limiter_stats(stats.concurrency)
+
+
+@app.command("replay")
+def simulate_replay(
+    ctx: typer.Context,
+    corpus_path: Path = typer.Argument(..., help="Corpus file from 'simulate record'"),
+    concurrency: int = typer.Option(
+        100, "--concurrency", help="Max requests in flight", min=1
+    ),
+    speed: Optional[float] = typer.Option(
+        None,
+        "--speed",
+        help="Keep recorded inter-arrival times, scaled by this factor (default: as fast as possible)",
+        min=0.000001,
+    ),
+    loops: int = typer.Option(1, "--loops", help="Times to replay the corpus", min=1),
+    compress: Optional[str] = typer.Option(
+        None, "--compress", help="Compress request bodies: gzip, deflate or zstd"
+    ),
+    compress_threshold: int = typer.Option(
+        DEFAULT_THRESHOLD_BYTES,
+        "--compress-threshold",
+        help="Send smaller bodies uncompressed (bytes)",
+        min=0,
+    ),
+    report_interval: float = typer.Option(
+        10.0, "--report-interval", help="Seconds between progress lines", min=0.1
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Adapt requests in flight to throttling (429/503) and latency",
+    ),
+    target_latency_ms: float = typer.Option(
+        DEFAULT_TARGET_LATENCY_SEC * 1000,
+        "--target-latency-ms",
+        help="With --adaptive, back off when responses take longer than this",
+        min=1,
+    ),
+    format: str = typer.Option(
+        "text", "--format", "-f", help="Output format: text or json"
+    ),
+):
+    """Send a recorded corpus straight from a memory-mapped file."""
+    import asyncio
+
+    from hw_cli.core.corpus import Corpus, ReplayRunner
+    from hw_cli.core.device_manager import DeviceManager
+
+    _check_compression(compress)
+    quiet = ctx.obj["quiet"]
 
     try:
-        asyncio.run(run())
+        corpus = Corpus(corpus_path)
+    except (OSError, ValueError) as e:
+        print_error(f"Cannot open corpus: {e}")
+        raise typer.Exit(1)
+
+    mgr = DeviceManager()
+    devices = {}
+    for device_id in corpus.device_ids:
+        device_obj = mgr.get_device_by_id(device_id)
+        if device_obj and device_obj.is_registered:
+            devices[device_id] = device_obj
+        elif not quiet:
+            print_warning(f"Skipping unknown or unregistered device {device_id}")
+
+    if not devices:
+        corpus.close()
+        print_error("No registered devices in corpus")
+        raise typer.Exit(1)
+
+    runner = ReplayRunner(
+        corpus,
+        devices,
+        concurrency=concurrency,
+        speed=speed,
+        loops=loops,
+        api=ctx.obj["config"].api,
+        compression=compress,
+        compression_threshold=compress_threshold,
+        adaptive=adaptive,
+        target_latency=target_latency_ms / 1000,
+    )
+
+    if not quiet:
+        print_info(
+            f"Replaying {len(corpus)} messages for {len(devices)} devices",
+            file=sys.stderr,
+        )
+
+    on_progress = None if quiet else _print_replay_stats
+
+    try:
+        asyncio.run(runner.run(on_progress, report_interval))
     except KeyboardInterrupt:
         pass
     except Exception as e:
         print_error(f"Fatal: {e}")
         raise typer.Exit(1)
+    finally:
+        corpus.close()
+
+    if format == "json":
+        print(json.dumps(runner.stats.to_dict()))
+    elif not quiet:
+        _print_replay_stats(runner.stats, final=True)
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from hw_cli.core.agent_client import socket_path
+from hw_cli.core.api.client import WeatherIoTClient
+from hw_cli.core.api.compression import BodyCompressor, CompressionStats
+from hw_cli.core.api.encoding import ENCODINGS, EncodingStats
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.data_generator import DataGenerator
+from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.token_cache import get_token_cache
+
+logger = logging.getLogger(__name__)
+
+IDLE_POLL_SEC = 1.0
+
+
+class Agent:
+    """Serves CLI requests over a Unix socket from one long-lived process.
+
+    The HTTP connection pool, device clients (and with them, access tokens)
+    and the parsed device configs stay warm between requests, so a send costs
+    one socket round trip instead of a process start, a database open and a
+    TCP/TLS handshake.
+    """
+
+    def __init__(
+        self,
+        api: Optional[ApiDefaults] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.api = api or ApiDefaults()
+        self.idle_timeout = idle_timeout
+        self.requests = 0
+        self.errors = 0
+        self._mgr = DeviceManager()
+        self._http: Optional[httpx.AsyncClient] = None
+        # (device_id, encoding, compression) -> connected client
+        self._clients: Dict[Tuple[str, str, Optional[str]], WeatherIoTClient] = {}
+        # One send at a time per client: a send sets the client's stats and
+        # may replace the client, so concurrent sends would mix them up.
+        self._locks: Dict[Tuple[str, str, Optional[str]], asyncio.Lock] = {}
+        self._started = time.monotonic()
+        self._last_active = self._started
+        self._stop: Optional[asyncio.Event] = None
+
+    async def serve(self, path: Optional[Path] = None) -> None:
+        """Listen on `path` until stopped or idle for `idle_timeout` seconds."""
+        path = path or socket_path()
+        self._stop = asyncio.Event()
+        self._http = create_http_client(self.api)
+        # Create the socket owner-only, rather than narrowing it after bind
+        # while another user could already connect.
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=str(path))
+        finally:
+            os.umask(umask)
+        logger.info(f"Agent listening on {path}")
+
+        try:
+            async with server:
+                while not self._stop.is_set():
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), IDLE_POLL_SEC)
+                    except asyncio.TimeoutError:
+                        pass
+                    idle = time.monotonic() - self._last_active
+                    if self.idle_timeout is not None and idle > self.idle_timeout:
+                        logger.info(f"Agent idle for {idle:.0f}s, exiting")
+                        break
+        finally:
+            for client in self._clients.values():
+                await client.close()
+            await self._http.aclose()
+            path.unlink(missing_ok=True)
+            get_token_cache().flush()
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.monotonic() - self._started, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "clients": len(self._clients),
+        }
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"Bad request: {e}"}
+                else:
+                    if isinstance(request, dict):
+                        response = await self.handle(request)
+                    else:
+                        response = {
+                            "ok": False,
+                            "error": "Bad request: expected a JSON object",
+                        }
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self._last_active = time.monotonic()
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, **self.status()}
+        if op == "stop":
+            self.stop()
+            return {"ok": True}
+        if op == "send":
+            self.requests += 1
+            # Pick up tokens cleared or replaced by other processes now,
+            # rather than up to a sync interval later.
+            get_token_cache().sync()
+            response = await self._send(request)
+            if not response["ok"]:
+                self.errors += 1
+            return response
+        return {"ok": False, "error": f"Unknown op '{op}'"}
+
+    async def _client_for(
+        self,
+        device: DeviceConfig,
+        encoding: str,
+        compress: Optional[str],
+        threshold: int,
+    ) -> WeatherIoTClient:
+        """The connected client for this device and settings.
+
+        Callers hold the key's lock, so one key never connects two clients.
+        """
+        key = (device.device_id, encoding, compress)
+        client = self._clients.get(key)
+        if client is not None and client.device == device and (
+            client.compressor is None or client.compressor.threshold == threshold
+        ):
+            return client
+        reconfigured = client is not None and client.device != device
+        if client is not None:
+            await client.close()
+
+        client = WeatherIoTClient(
+            device,
+            http_client=self._http,
+            encoding=encoding,
+            api=self.api,
+            compressor=BodyCompressor(compress, threshold) if compress else None,
+        )
+        await client.connect()
+        if reconfigured:
+            # Re-registered or edited since; a cached token belongs to the
+            # old registration.
+            client.invalidate_token()
+        self._clients[key] = client
+        return client
+
+    async def _send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate and send one reading, as `simulate once` does."""
+        encoding = request.get("encoding", "json")
+        compress = request.get("compress")
+        if encoding not in ENCODINGS:
+            return {"ok": False, "error": f"Unknown encoding '{encoding}'"}
+
+        device = self._mgr.resolve_device(request.get("device"))
+        if not device:
+            return {"ok": False, "error": "Device not found or no default set"}
+        if not device.is_registered:
+            return {
+                "ok": False,
+                "error": f"Device '{device.name}' not registered. "
+                f"Run 'hw devices register {device.name}' first.",
+            }
+
+        data = DataGenerator().generate(device)
+        # The other encodings are measured for comparison only.
+        encoding_stats = EncodingStats()
+        for other in ENCODINGS:
+            if other != encoding:
+                encoding_stats.timed_encode(data, device, other)
+
+        lock = self._locks.setdefault(
+            (device.device_id, encoding, compress), asyncio.Lock()
+        )
+        try:
+            async with lock:
+                client = await self._client_for(
+                    device, encoding, compress, request.get("compress_threshold", 0)
+                )
+                client.encoding_stats = encoding_stats
+                compression = None
+                if client.compressor is not None:
+                    compression = client.compressor.stats = CompressionStats()
+                    compression.method = compress
+                if request.get("force_token"):
+                    client.invalidate_token()
+
+                started = time.perf_counter()
+                await client.send_telemetry(data)
+                latency = time.perf_counter() - started
+        except httpx.HTTPStatusError as e:
+            return {
+                "ok": False,
+                "device": device.name,
+                "status": e.response.status_code,
+                "error": e.response.text,
+            }
+        except Exception as e:
+            return {"ok": False, "device": device.name, "error": str(e)}
+
+        return {
+            "ok": True,
+            "device": device.name,
+            "data": data.to_dict(),
+            "latency": latency,
+            "encoding": encoding_stats.to_dict(),
+            "compression": compression.to_dict() if compression else None,
+        }
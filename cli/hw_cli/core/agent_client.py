@@ -0,0 +1,60 @@
+import json
+import logging
+import socket
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from hw_cli.core.storage import get_app_dir
+
+logger = logging.getLogger(__name__)
+
+SOCKET_FILENAME = "agent.sock"
+
+# How long a command waits for the agent to accept, and then to answer.
+CONNECT_TIMEOUT_SEC = 1.0
+REQUEST_TIMEOUT_SEC = 120.0
+
+
+class AgentError(Exception):
+    """The agent accepted a request but did not answer it."""
+
+
+def socket_path() -> Path:
+    return get_app_dir() / SOCKET_FILENAME
+
+
+def call_agent(
+    request: Dict[str, Any],
+    path: Optional[Path] = None,
+    timeout: float = REQUEST_TIMEOUT_SEC,
+) -> Optional[Dict[str, Any]]:
+    """Send one request to a running agent and return its response.
+
+    Returns None when no agent is listening, so the caller can do the work
+    in-process instead. Raises AgentError if the agent goes away after the
+    request was sent, since the request may already have taken effect.
+    """
+    path = path or socket_path()
+    if not path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        sock.settimeout(CONNECT_TIMEOUT_SEC)
+        try:
+            sock.connect(str(path))
+        except OSError as e:
+            logger.debug(f"Agent not reachable at {path}: {e}")
+            return None
+
+        sock.settimeout(timeout)
+        try:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        except OSError as e:
+            raise AgentError(f"Agent connection failed: {e}") from e
+
+    if not line:
+        raise AgentError("Agent closed the connection without answering")
+    return json.loads(line)
@@ -0,0 +1,151 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# "array" sends `[reading, ...]`; "envelope" sends `{"n": count, "dat": [...]}`.
+BATCH_FORMATS = ("array", "envelope")
+
+
+def frame_batch(bodies: List[bytes], batch_format: str = "array") -> bytes:
+    """Join encoded JSON readings into one batch request body."""
+    items = b",".join(bodies)
+    if batch_format == "array":
+        return b"[" + items + b"]"
+    if batch_format == "envelope":
+        return b'{"n":%d,"dat":[%b]}' % (len(bodies), items)
+    raise ValueError(
+        f"Unknown batch format '{batch_format}', expected one of {BATCH_FORMATS}"
+    )
+
+
+class BatchStats:
+    """Readings versus the requests that carried them."""
+
+    def __init__(self):
+        self.requests = 0
+        self.readings = 0
+
+    @property
+    def mean_size(self) -> float:
+        return self.readings / self.requests if self.requests else 0.0
+
+    def merge(self, other: "BatchStats") -> None:
+        self.requests += other.requests
+        self.readings += other.readings
+
+    def format_summary(self) -> str:
+        return (
+            f"Batching: {self.readings} readings in {self.requests} requests "
+            f"({self.mean_size:.1f}/request)"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "readings": self.readings,
+            "mean_size": round(self.mean_size, 3),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchStats":
+        stats = cls()
+        stats.requests = data.get("requests", 0)
+        stats.readings = data.get("readings", 0)
+        return stats
+
+
+class TelemetryBatcher:
+    """Coalesces one device's encoded readings into batch requests.
+
+    A batch is sent as soon as it holds `batch_size` readings, or `linger`
+    seconds after its first reading arrived. Each `submit` returns a future
+    that resolves, or fails, with the request that carried the reading.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        batch_size: int,
+        linger: float,
+        batch_format: str = "array",
+        stats: Optional[BatchStats] = None,
+    ):
+        if batch_format not in BATCH_FORMATS:
+            raise ValueError(f"Unknown batch format '{batch_format}'")
+        self.batch_size = batch_size
+        self.linger = linger
+        self.batch_format = batch_format
+        self.stats = stats if stats is not None else BatchStats()
+        self._send = send
+        self._bodies: List[bytes] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def submit(self, body: bytes) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._bodies.append(body)
+        self._futures.append(future)
+
+        if len(self._bodies) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self.flush)
+        return future
+
+    def flush(self) -> None:
+        """Send whatever is pending now, without waiting for the response."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._bodies:
+            return
+
+        bodies, futures = self._bodies, self._futures
+        self._bodies, self._futures = [], []
+        task = asyncio.create_task(self._send_batch(bodies, futures))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def close(self) -> None:
+        """Flush pending readings and wait for every batch to complete."""
+        self.flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def cancel(self) -> None:
+        """Drop pending readings and abandon batches still in flight."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for future in self._futures:
+            future.cancel()
+        self._bodies, self._futures = [], []
+        for task in self._in_flight:
+            task.cancel()
+
+    async def _send_batch(
+        self, bodies: List[bytes], futures: List[asyncio.Future]
+    ) -> None:
+        error: Optional[BaseException] = None
+        try:
+            await self._send(frame_batch(bodies, self.batch_format))
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            error = e
+
+        self.stats.requests += 1
+        self.stats.readings += len(bodies)
+        for future in futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
@@ -1,42 +1,88 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 import httpx
 
+from hw_cli.core.api.batching import BatchStats, TelemetryBatcher
+from hw_cli.core.api.compression import BodyCompressor
+from hw_cli.core.api.encoding import CONTENT_TYPES, EncodingStats, encode_telemetry
 from hw_cli.core.api.token_manager import TokenManager
+from hw_cli.core.api.transport import create_http_client
 from hw_cli.core.api.weather_api_gateway import WeatherApiGateway
+from hw_cli.core.config import ApiDefaults
 from hw_cli.core.models import DeviceConfig, TelemetryData
 
 logger = logging.getLogger(__name__)
 
 
 class WeatherIoTClient:
-    def __init__(self, device: DeviceConfig):
+    def __init__(
+        self,
+        device: DeviceConfig,
+        http_client: Optional[httpx.AsyncClient] = None,
+        encoding: str = "json",
+        encoding_stats: Optional[EncodingStats] = None,
+        api: Optional[ApiDefaults] = None,
+        compressor: Optional[BodyCompressor] = None,
+        batch_size: int = 1,
+        linger: float = 0.0,
+        batch_stats: Optional[BatchStats] = None,
+    ):
+        if encoding not in CONTENT_TYPES:
+            raise ValueError(f"Unknown encoding '{encoding}'")
+        if batch_size > 1 and encoding != "json":
+            raise ValueError("Batching is only supported with JSON encoding")
         self.device = device
+        self.encoding = encoding
+        self.encoding_stats = encoding_stats
+        self.api = api
+        self.compressor = compressor
+        self.batch_size = batch_size
+        self.linger = linger
+        self.batch_stats = batch_stats
+        self._batcher: Optional[TelemetryBatcher] = None
+        self._shared_client = http_client
         self._client: Optional[httpx.AsyncClient] = None
         self._api_gateway: Optional[WeatherApiGateway] = None
         self._token_manager: Optional[TokenManager] = None
+        self._body_headers: Dict[str, str] = {}
+        self._body_headers_token: Optional[str] = None
 
     async def __aenter__(self) -> WeatherIoTClient:
         await self.connect()
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if self._batcher is not None and exc_type is asyncio.CancelledError:
+            self._batcher.cancel()
         await self.close()
 
     async def connect(self) -> None:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            self._client = self._shared_client or create_http_client(self.api)
             self._api_gateway = WeatherApiGateway(
-                self.device.api_base_url, self._client
+                self.device.api_base_url, self._client, compressor=self.compressor
             )
             self._init_token_manager_if_registered()
+            if self.batch_size > 1:
+                self._batcher = TelemetryBatcher(
+                    lambda body: self.send_telemetry_body(body, CONTENT_TYPES["json"]),
+                    self.batch_size,
+                    self.linger,
+                    batch_format=(self.api or ApiDefaults()).batch_format,
+                    stats=self.batch_stats,
+                )
 
     async def close(self) -> None:
+        if self._batcher is not None:
+            await self._batcher.close()
+            self._batcher = None
         if self._client:
-            await self._client.aclose()
+            if self._shared_client is None:
+                await self._client.aclose()
             self._client = None
             self._api_gateway = None
             self._token_manager = None
@@ -47,11 +93,14 @@ class WeatherIoTClient:
 
     def _init_token_manager_if_registered(self) -> None:
         if self.device.hmac_secret and self._api_gateway:
+            api = self.api or ApiDefaults()
             self._token_manager = TokenManager(
                 device_id=self.device.device_id,
                 provisioning_token=self.device.provisioning_token,
                 hmac_secret=self.device.hmac_secret,
                 api_gateway=self._api_gateway,
+                refresh_fraction=api.token_refresh_fraction,
+                refresh_jitter=api.token_refresh_jitter,
             )
             logger.debug(
                 f"Token manager initialized for device {self.device.device_id}"
@@ -75,15 +124,62 @@ class WeatherIoTClient:
         data = await self._api_gateway.request_claim_code(self.device.device_id, token)
         return data["claim_code"]
 
+    def _encode(self, telemetry: TelemetryData) -> bytes:
+        if self.encoding_stats is not None:
+            return self.encoding_stats.timed_encode(
+                telemetry, self.device, self.encoding
+            )
+        return encode_telemetry(telemetry, self.device, self.encoding)
+
     async def send_telemetry(self, telemetry: TelemetryData) -> None:
         if not self._token_manager or not self._api_gateway:
             raise RuntimeError("Device not registered. Call register() first.")
 
-        token = await self._token_manager.get_token()
+        if self._batcher is not None:
+            await self.submit_telemetry(telemetry)
+            return
+
         logger.info(f"Sending telemetry for ts={telemetry.timestamp}")
-        await self._api_gateway.send_telemetry(token, telemetry)
+        await self.send_telemetry_body(
+            self._encode(telemetry), CONTENT_TYPES[self.encoding]
+        )
         logger.info("Telemetry sent successfully")
 
+    def submit_telemetry(self, telemetry: TelemetryData) -> asyncio.Future:
+        """Queue a reading and return a future for the request that carries it.
+
+        With batching, readings are coalesced until `batch_size` or `linger`
+        is reached; without it, the reading is sent right away.
+        """
+        if not self._token_manager or not self._api_gateway:
+            raise RuntimeError("Device not registered. Call register() first.")
+
+        if self._batcher is not None:
+            return self._batcher.submit(self._encode(telemetry))
+        return asyncio.ensure_future(self.send_telemetry(telemetry))
+
+    async def send_telemetry_body(
+        self, body: bytes, content_type: str = CONTENT_TYPES["json"]
+    ) -> None:
+        """Send an already encoded telemetry body.
+
+        The header dict is built once per access token and reused.
+        """
+        if not self._token_manager or not self._api_gateway:
+            raise RuntimeError("Device not registered. Call register() first.")
+
+        token = await self._token_manager.get_token()
+        if (
+            token != self._body_headers_token
+            or content_type != self._body_headers.get("Content-Type")
+        ):
+            self._body_headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": content_type,
+            }
+            self._body_headers_token = token
+        await self._api_gateway.send_telemetry_body(self._body_headers, body)
+
     def invalidate_token(self) -> None:
         if self._token_manager:
             self._token_manager.invalidate()
@@ -0,0 +1,146 @@
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+COMPRESSIONS = ("gzip", "deflate", "zstd")
+DEFAULT_THRESHOLD_BYTES = 256
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _compressor(method: str, level: Optional[int]) -> Callable[[bytes], bytes]:
+    if method == "gzip":
+        level = 6 if level is None else level
+
+        def gzip_compress(body: bytes) -> bytes:
+            # zlib with a gzip wrapper skips gzip.compress's per-call overhead
+            # and leaves the header mtime at zero.
+            c = zlib.compressobj(level, zlib.DEFLATED, 31)
+            return c.compress(body) + c.flush()
+
+        return gzip_compress
+    if method == "deflate":
+        # HTTP "deflate" is the zlib format (RFC 1950), not raw deflate.
+        level = 6 if level is None else level
+        return lambda body: zlib.compress(body, level)
+    if method == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "zstd compression requires zstandard. "
+                "Install it with: pip install zstandard"
+            ) from e
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress
+    raise ValueError(f"Unknown compression '{method}', expected one of {COMPRESSIONS}")
+
+
+class CompressionStats:
+    """Bytes in and out of the compressor and the CPU time it used."""
+
+    def __init__(self):
+        self.method: Optional[str] = None
+        self.bodies = 0
+        self.attempts = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_ns = 0
+
+    @property
+    def ratio(self) -> float:
+        """Original size over sent size, across every body."""
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+    def merge(self, other: "CompressionStats") -> None:
+        self.method = self.method or other.method
+        self.bodies += other.bodies
+        self.attempts += other.attempts
+        self.compressed += other.compressed
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.cpu_ns += other.cpu_ns
+
+    def format_summary(self) -> str:
+        if not self.bodies:
+            return "Compression: n/a"
+        per_body = self.cpu_ns / self.attempts / 1000 if self.attempts else 0.0
+        return (
+            f"Compression: {self.method} {self.ratio:.2f}x | "
+            f"{self.compressed}/{self.bodies} compressed | "
+            f"CPU {self.cpu_ns / 1e6:.1f} ms ({per_body:.1f} us/body)"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "bodies": self.bodies,
+            "attempts": self.attempts,
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.ratio, 3),
+            "cpu_ns": self.cpu_ns,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompressionStats":
+        stats = cls()
+        stats.method = data.get("method")
+        stats.bodies = data.get("bodies", 0)
+        stats.attempts = data.get("attempts", 0)
+        stats.compressed = data.get("compressed", 0)
+        stats.bytes_in = data.get("bytes_in", 0)
+        stats.bytes_out = data.get("bytes_out", 0)
+        stats.cpu_ns = data.get("cpu_ns", 0)
+        return stats
+
+
+class BodyCompressor:
+    """Compresses request bodies of at least `threshold` bytes.
+
+    Smaller bodies, and bodies that would not shrink, are sent as they are.
+    CPU time is measured with the thread clock, so time spent waiting on other
+    tasks is not counted.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        threshold: int = DEFAULT_THRESHOLD_BYTES,
+        level: Optional[int] = None,
+        stats: Optional[CompressionStats] = None,
+    ):
+        self.method = method
+        self.threshold = threshold
+        self.stats = stats if stats is not None else CompressionStats()
+        self.stats.method = method
+        self._compress = _compressor(method, level)
+
+    def compress(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """Return the body to send and its `Content-Encoding`, if any."""
+        stats = self.stats
+        stats.bodies += 1
+        stats.bytes_in += len(body)
+
+        if len(body) < self.threshold:
+            stats.bytes_out += len(body)
+            return body, None
+
+        started = time.thread_time_ns()
+        compressed = self._compress(body)
+        stats.cpu_ns += time.thread_time_ns() - started
+        stats.attempts += 1
+
+        if len(compressed) >= len(body):
+            stats.bytes_out += len(body)
+            return body, None
+        stats.compressed += 1
+        stats.bytes_out += len(compressed)
+        return compressed, self.method
@@ -0,0 +1,241 @@
+import struct
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from hw_cli.core.api.weather_api_gateway import build_telemetry_payload
+from hw_cli.core.models import DeviceConfig, RainfallHistogram, TelemetryData
+
+ENCODINGS = ("json", "protobuf")
+CONTENT_TYPES = {
+    "json": "application/json",
+    "protobuf": "application/x-protobuf",
+}
+
+# Tip counts are packed like the firmware's WeatherEntry bitmask: two 4-bit
+# counts per byte, even intervals in the low nibble, saturating at 15.
+TIP_BITS = 4
+MAX_TIPS_PER_INTERVAL = (1 << TIP_BITS) - 1
+
+_FLOAT = struct.Struct("<f")
+
+# Field keys for firmware/weather.proto, (field_number << 3) | wire_type.
+_VARINT, _FIXED32, _LEN = 0, 5, 2
+_WEATHER_CREATED_AT = (1 << 3) | _VARINT
+_WEATHER_TEMPERATURE = (2 << 3) | _FIXED32
+_WEATHER_PRESSURE = (3 << 3) | _FIXED32
+_WEATHER_HUMIDITY = (4 << 3) | _FIXED32
+_WEATHER_TIPS = (5 << 3) | _LEN
+_WEATHER_INFO = (6 << 3) | _LEN
+_HISTOGRAM_DATA = (1 << 3) | _LEN
+_HISTOGRAM_COUNT = (2 << 3) | _VARINT
+_HISTOGRAM_INTERVAL = (3 << 3) | _VARINT
+_HISTOGRAM_START = (4 << 3) | _VARINT
+_INFO_ID = (1 << 3) | _LEN
+_INFO_MM_PER_TIP = (2 << 3) | _FIXED32
+
+
+def _load_json_backend() -> Tuple[str, Optional[Callable[[Any], bytes]]]:
+    try:
+        import orjson
+
+        return "orjson", orjson.dumps
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return "msgspec", msgspec.json.Encoder().encode
+    except ImportError:
+        pass
+    return "builtin", None
+
+
+# orjson or msgspec when installed; otherwise bodies are formatted directly.
+JSON_BACKEND, _json_dumps = _load_json_backend()
+
+
+def _write_varint(buf: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _write_uint(buf: bytearray, key: int, value: Optional[int]) -> None:
+    # proto3 leaves zero-valued scalars off the wire.
+    if value:
+        buf.append(key)
+        _write_varint(buf, value)
+
+
+def _write_float(buf: bytearray, key: int, value: Optional[float]) -> None:
+    if value:
+        buf.append(key)
+        buf += _FLOAT.pack(value)
+
+
+def _write_bytes(buf: bytearray, key: int, value: bytes) -> None:
+    buf.append(key)
+    _write_varint(buf, len(value))
+    buf += value
+
+
+def pack_tips(rain: RainfallHistogram) -> bytes:
+    """Pack a sparse tip histogram into the firmware's nibble bitmask."""
+    n = rain.num_buckets
+    packed = bytearray((n + 1) // 2)
+    for key, tips in rain.data.items():
+        i = int(key)
+        if 0 <= i < n and tips > 0:
+            if tips > MAX_TIPS_PER_INTERVAL:
+                tips = MAX_TIPS_PER_INTERVAL
+            packed[i >> 1] |= (tips << 4) if i & 1 else tips
+    return bytes(packed)
+
+
+@lru_cache(maxsize=65536)
+def _device_info(device_id: str, mm_per_tip: float) -> bytes:
+    """Encoded `WeatherData.info` field, which is constant per device."""
+    info = bytearray()
+    _write_bytes(info, _INFO_ID, device_id.encode("utf-8"))
+    _write_float(info, _INFO_MM_PER_TIP, mm_per_tip)
+    buf = bytearray()
+    _write_bytes(buf, _WEATHER_INFO, info)
+    return bytes(buf)
+
+
+def encode_protobuf(telemetry: TelemetryData, device: DeviceConfig) -> bytes:
+    """Serialize a reading as the firmware's `proto.WeatherData` message."""
+    r = telemetry.reading
+    buf = bytearray()
+    _write_uint(buf, _WEATHER_CREATED_AT, telemetry.timestamp)
+    _write_float(buf, _WEATHER_TEMPERATURE, r.temperature)
+    _write_float(buf, _WEATHER_PRESSURE, r.pressure)
+    _write_float(buf, _WEATHER_HUMIDITY, r.humidity)
+
+    if r.rain is not None:
+        hist = bytearray()
+        _write_bytes(hist, _HISTOGRAM_DATA, pack_tips(r.rain))
+        _write_uint(hist, _HISTOGRAM_COUNT, r.rain.num_buckets)
+        _write_uint(hist, _HISTOGRAM_INTERVAL, r.rain.bucket_seconds)
+        _write_uint(hist, _HISTOGRAM_START, r.rain.start_timestamp)
+        _write_bytes(buf, _WEATHER_TIPS, hist)
+
+    buf += _device_info(device.device_id, device.mm_per_tip)
+    return bytes(buf)
+
+
+def encode_json(telemetry: TelemetryData) -> bytes:
+    """Serialize a reading as the `POST /device/telemetry` JSON body.
+
+    Produces the same bytes as `encode_json_body(build_telemetry_payload(...))`.
+    Without orjson or msgspec the body is formatted straight from the reading;
+    generated values are always finite, so `repr` is valid JSON for floats.
+    """
+    r = telemetry.reading
+    if _json_dumps is not None:
+        return _json_dumps(
+            build_telemetry_payload(
+                telemetry.timestamp,
+                r.temperature,
+                r.pressure,
+                r.humidity,
+                r.precipitation_mm,
+                r.rain,
+            )
+        )
+
+    fields = []
+    if r.temperature is not None:
+        fields.append(f'"tmp":{r.temperature!r}')
+    if r.pressure is not None:
+        fields.append(f'"prs":{r.pressure!r}')
+    if r.humidity is not None:
+        fields.append(f'"hum":{r.humidity!r}')
+    if r.precipitation_mm is not None:
+        fields.append(f'"mmpt":{r.precipitation_mm!r}')
+    rain = r.rain
+    if rain and rain.data:
+        tips = ",".join([f'"{k}":{v}' for k, v in rain.data.items()])
+        fields.append(
+            f'"rain":{{"dat":{{{tips}}},"sec":{rain.bucket_seconds},'
+            f'"sts":{rain.start_timestamp},"n":{rain.num_buckets}}}'
+        )
+    return f'{{"ts":{telemetry.timestamp},"dat":{{{",".join(fields)}}}}}'.encode()
+
+
+def encode_telemetry(
+    telemetry: TelemetryData, device: DeviceConfig, encoding: str = "json"
+) -> bytes:
+    """Encode a reading as a `POST /device/telemetry` body."""
+    if encoding == "protobuf":
+        return encode_protobuf(telemetry, device)
+    if encoding == "json":
+        return encode_json(telemetry)
+    raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
+
+
+class EncodingStats:
+    """Body size and encode time per message, kept separately per encoding."""
+
+    def __init__(self):
+        # encoding -> [messages, bytes, encode nanoseconds]
+        self.totals: Dict[str, list] = {}
+
+    def record(self, encoding: str, size: int, encode_ns: int) -> None:
+        totals = self.totals.setdefault(encoding, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += size
+        totals[2] += encode_ns
+
+    def timed_encode(
+        self, telemetry: TelemetryData, device: DeviceConfig, encoding: str
+    ) -> bytes:
+        started = time.perf_counter_ns()
+        body = encode_telemetry(telemetry, device, encoding)
+        self.record(encoding, len(body), time.perf_counter_ns() - started)
+        return body
+
+    def merge(self, other: "EncodingStats") -> None:
+        for encoding, (n, size, ns) in other.totals.items():
+            totals = self.totals.setdefault(encoding, [0, 0, 0])
+            totals[0] += n
+            totals[1] += size
+            totals[2] += ns
+
+    def per_message(self) -> Iterable[Tuple[str, float, float]]:
+        """(encoding, bytes per message, encode microseconds per message)."""
+        for encoding, (n, size, ns) in sorted(self.totals.items()):
+            if n:
+                yield encoding, size / n, ns / n / 1000
+
+    def format_summary(self) -> str:
+        parts = [
+            f"{encoding} {size:.0f} B/msg, {us:.1f} us/msg"
+            for encoding, size, us in self.per_message()
+        ]
+        return f"Encoding: {' | '.join(parts)}" if parts else "Encoding: n/a"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            encoding: {
+                "messages": n,
+                "bytes": size,
+                "encode_ns": ns,
+                "bytes_per_msg": round(size / n, 1) if n else 0.0,
+                "encode_us_per_msg": round(ns / n / 1000, 3) if n else 0.0,
+            }
+            for encoding, (n, size, ns) in sorted(self.totals.items())
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EncodingStats":
+        stats = cls()
+        for encoding, totals in data.items():
+            stats.totals[encoding] = [
+                totals.get("messages", 0),
+                totals.get("bytes", 0),
+                totals.get("encode_ns", 0),
+            ]
+        return stats
@@ -1,14 +1,34 @@
+import asyncio
 import logging
 import time
+import zlib
+from typing import Any, Dict, Tuple
 
 from hw_cli.core.api.auth import create_hmac_signature
 from hw_cli.core.api.weather_api_gateway import WeatherApiGateway
+from hw_cli.core.constants import TOKEN_DEFAULT_TTL_SEC
 from hw_cli.core.token_cache import get_token_cache
 
 logger = logging.getLogger(__name__)
 
+# After a failed background refresh, keep serving the cached token this long
+# before trying again.
+REFRESH_RETRY_SEC = 30.0
+
 
 class TokenManager:
+    """Access tokens for one device, requested at most once at a time.
+
+    Concurrent callers that miss the cache share one token request, also
+    across managers for the same device. Once a cached token is
+    `refresh_fraction` of the way through its lifetime, shifted per device by
+    up to `refresh_jitter`, callers keep getting it while its replacement is
+    requested in the background; only a cold or expired cache makes them wait.
+    """
+
+    # device_id -> token request in flight
+    _inflight: Dict[str, asyncio.Task] = {}
+
     def __init__(
         self,
         device_id: str,
@@ -16,20 +36,70 @@ class TokenManager:
         hmac_secret: str,
         api_gateway: WeatherApiGateway,
         cache=None,
+        refresh_fraction: float = 0.8,
+        refresh_jitter: float = 0.1,
     ):
         self.device_id = device_id
         self.provisioning_token = provisioning_token
         self.hmac_secret = hmac_secret
         self.api_gateway = api_gateway
         self.cache = cache or get_token_cache()
+        # A stable offset in [-1, 1) per device, so a fleet that was started
+        # together spreads its refreshes out instead of repeating the burst.
+        offset = zlib.crc32(device_id.encode("utf-8")) / 2**31 - 1
+        self.refresh_fraction = min(
+            max(refresh_fraction + refresh_jitter * offset, 0.0), 1.0
+        )
+        self._retry_at = 0.0
 
     async def get_token(self, force_refresh: bool = False) -> str:
         if not force_refresh:
-            cached = self.cache.get_token(self.device_id)
-            if cached:
+            entry = self.cache.get_entry(self.device_id)
+            if entry:
+                if time.time() >= self._refresh_at(entry):
+                    self._refresh_in_background()
                 logger.debug("Using cached access token")
-                return cached
+                return entry["token"]
+
+        # Shielded so that a caller giving up does not cancel the request
+        # for everyone else waiting on it.
+        return await asyncio.shield(self._request())
+
+    def _refresh_at(self, entry: Dict[str, Any]) -> float:
+        expires_in = entry.get("expires_in")
+        cached_at = entry.get("cached_at")
+        if expires_in is None or cached_at is None:
+            return entry.get("expires_at", 0)
+        return cached_at + expires_in * self.refresh_fraction
 
+    def _request(self) -> asyncio.Task:
+        task = self._inflight.get(self.device_id)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._fetch())
+            self._inflight[self.device_id] = task
+            task.add_done_callback(self._forget)
+        return task
+
+    def _forget(self, task: asyncio.Task) -> None:
+        if self._inflight.get(self.device_id) is task:
+            del self._inflight[self.device_id]
+
+    def _refresh_in_background(self) -> None:
+        if self.device_id in self._inflight or time.monotonic() < self._retry_at:
+            return
+        logger.debug("Refreshing access token ahead of expiry")
+        self._request().add_done_callback(self._refreshed)
+
+    def _refreshed(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self._retry_at = time.monotonic() + REFRESH_RETRY_SEC
+            logger.warning(f"Background token refresh failed: {error!r}")
+
+    async def request_token(self) -> Tuple[str, int]:
+        """Ask the provisioning endpoint for a token without caching it."""
         logger.info("Requesting new access token")
         timestamp = int(time.time())
         signature = create_hmac_signature(self.device_id, self.hmac_secret, timestamp)
@@ -37,13 +107,12 @@ class TokenManager:
         response = await self.api_gateway.request_token(
             self.provisioning_token, self.device_id, timestamp, signature
         )
+        return response["token"], response.get("expires_in", TOKEN_DEFAULT_TTL_SEC)
 
-        token = response["token"]
-        expires_in = response.get("expires_in", 86400)
-
+    async def _fetch(self) -> str:
+        token, expires_in = await self.request_token()
         self.cache.set_token(self.device_id, token, expires_in)
         logger.info(f"Access token obtained (expires in {expires_in}s)")
-
         return token
 
     def invalidate(self) -> None:
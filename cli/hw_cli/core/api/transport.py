@@ -0,0 +1,59 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from hw_cli.core.config import ApiDefaults
+
+logger = logging.getLogger(__name__)
+
+
+def h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(
+    api: Optional[ApiDefaults] = None, max_connections: Optional[int] = None
+) -> httpx.AsyncClient:
+    """Build an `httpx.AsyncClient` from the `api.transport` settings.
+
+    `max_connections` is the caller's preferred pool size and only applies
+    when the config does not set one. HTTP/2 needs the optional `h2` package;
+    without it the client falls back to HTTP/1.1 with a warning.
+    """
+    api = api or ApiDefaults()
+    t = api.transport
+
+    def phase(value: Optional[float]) -> float:
+        return float(api.timeout_seconds) if value is None else value
+
+    timeout = httpx.Timeout(
+        connect=phase(t.connect_timeout),
+        read=phase(t.read_timeout),
+        write=phase(t.write_timeout),
+        pool=phase(t.pool_timeout),
+    )
+    limits = httpx.Limits(
+        max_connections=t.max_connections or max_connections or 100,
+        max_keepalive_connections=t.max_keepalive_connections,
+        keepalive_expiry=t.keepalive_expiry,
+    )
+
+    http2 = t.http2 or t.http2_prior_knowledge
+    if http2 and not h2_available():
+        logger.warning(
+            "HTTP/2 requested but the 'h2' package is not installed; using "
+            "HTTP/1.1. Install it with: pip install 'httpx[http2]'"
+        )
+        http2 = False
+
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=limits,
+        http2=http2,
+        http1=not (http2 and t.http2_prior_knowledge),
+    )
@@ -1,38 +1,75 @@
+import json
 import logging
-from typing import Any, Dict
-
-import httpx
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
+from hw_cli.core.api.compression import BodyCompressor
 from hw_cli.core.constants import API_PATH_TELEMETRY
-from hw_cli.core.models import TelemetryData
+from hw_cli.core.models import RainfallHistogram, TelemetryData
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
 
+def build_telemetry_payload(
+    timestamp: int,
+    temperature: Optional[float] = None,
+    pressure: Optional[float] = None,
+    humidity: Optional[float] = None,
+    precipitation_mm: Optional[float] = None,
+    rain: Optional[RainfallHistogram] = None,
+) -> Dict[str, Any]:
+    """Build the `POST /device/telemetry` JSON body from plain values."""
+    dat: Dict[str, Any] = {}
+    if temperature is not None:
+        dat["tmp"] = temperature
+    if pressure is not None:
+        dat["prs"] = pressure
+    if humidity is not None:
+        dat["hum"] = humidity
+    if precipitation_mm is not None:
+        dat["mmpt"] = precipitation_mm
+    if rain and rain.data:
+        dat["rain"] = {
+            "dat": rain.data,
+            "sec": rain.bucket_seconds,
+            "sts": rain.start_timestamp,
+            "n": rain.num_buckets,
+        }
+    return {"ts": timestamp, "dat": dat}
+
+
+def encode_json_body(payload: Any) -> bytes:
+    """Encode a JSON request body the same way httpx's `json=` does."""
+    return json.dumps(
+        payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+    ).encode("utf-8")
+
+
 class WeatherApiGateway:
-    def __init__(self, base_url: str, client: httpx.AsyncClient):
+    def __init__(
+        self,
+        base_url: str,
+        client: "httpx.AsyncClient",
+        compressor: Optional[BodyCompressor] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.client = client
+        self.compressor = compressor
+        self._encoded_headers: Dict[str, str] = {}
+        self._encoded_headers_for: Optional[Dict[str, str]] = None
 
     def _format_telemetry_payload(self, telemetry: TelemetryData) -> Dict[str, Any]:
-        dat: Dict[str, Any] = {}
         r = telemetry.reading
-        if r.temperature is not None:
-            dat["tmp"] = r.temperature
-        if r.pressure is not None:
-            dat["prs"] = r.pressure
-        if r.humidity is not None:
-            dat["hum"] = r.humidity
-        if r.precipitation_mm is not None:
-            dat["mmpt"] = r.precipitation_mm
-        if r.rain and r.rain.data:
-            dat["rain"] = {
-                "dat": r.rain.data,
-                "sec": r.rain.bucket_seconds,
-                "sts": r.rain.start_timestamp,
-                "n": r.rain.num_buckets,
-            }
-        return {"ts": telemetry.timestamp, "dat": dat}
+        return build_telemetry_payload(
+            telemetry.timestamp,
+            r.temperature,
+            r.pressure,
+            r.humidity,
+            r.precipitation_mm,
+            r.rain,
+        )
 
     async def register_device(
         self, provisioning_token: str, device_id: str
@@ -64,9 +101,34 @@ class WeatherApiGateway:
         return resp.json().get("data", {})
 
     async def send_telemetry(self, access_token: str, telemetry: TelemetryData) -> None:
-        url = f"{self.base_url}{API_PATH_TELEMETRY}"
-        headers = {"Authorization": f"Bearer {access_token}"}
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
         payload = self._format_telemetry_payload(telemetry)
+        await self.send_telemetry_body(headers, encode_json_body(payload))
 
-        resp = await self.client.post(url, headers=headers, json=payload)
+    async def send_telemetry_body(self, headers: Dict[str, str], body: bytes) -> None:
+        """Send a pre-encoded telemetry body with caller-supplied headers.
+
+        With a compressor set, bodies over its threshold are compressed and
+        sent with `Content-Encoding`.
+        """
+        if self.compressor is not None:
+            body, content_encoding = self.compressor.compress(body)
+            if content_encoding:
+                headers = self._with_content_encoding(headers, content_encoding)
+
+        resp = await self.client.post(
+            f"{self.base_url}{API_PATH_TELEMETRY}", headers=headers, content=body
+        )
         resp.raise_for_status()
+
+    def _with_content_encoding(
+        self, headers: Dict[str, str], content_encoding: str
+    ) -> Dict[str, str]:
+        # Callers reuse one header dict per token, so keep one derived copy.
+        if headers is not self._encoded_headers_for:
+            self._encoded_headers = {**headers, "Content-Encoding": content_encoding}
+            self._encoded_headers_for = headers
+        return self._encoded_headers
@@ -0,0 +1,336 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Union
+
+import httpx
+
+from hw_cli.core.api.client import WeatherIoTClient
+from hw_cli.core.api.compression import (
+    DEFAULT_THRESHOLD_BYTES,
+    BodyCompressor,
+    CompressionStats,
+)
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.data_generator import DataGenerator, numpy_available
+from hw_cli.core.histogram import LatencyHistogram
+from hw_cli.core.limiter import (
+    DEFAULT_TARGET_LATENCY_SEC,
+    AdaptiveLimiter,
+    LimiterStats,
+    limiter_for,
+    retry_after,
+)
+from hw_cli.core.models import DeviceConfig, TelemetryData
+from hw_cli.core.storage import get_data
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+CHECKPOINT_INTERVAL_SEC = 5.0
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY_SEC = 0.5
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Settings key holding the seed an unseeded job drew, by job id.
+SEED_SETTING_PREFIX = "backfill_seed:"
+
+
+def backfill_job_id(start: int, end: int, step: int, seed: Optional[int]) -> str:
+    # The seed is part of the job: resuming one seed's progress with another
+    # would splice two different series together. Unseeded jobs store the
+    # seed they drew under SEED_SETTING_PREFIX instead.
+    return f"{start}:{end}:{step}:{seed}"
+
+
+@dataclass
+class BackfillStats:
+    total: int = 0
+    sent: int = 0
+    errors: int = 0
+    resumed: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    compression: CompressionStats = field(default_factory=CompressionStats)
+    concurrency: LimiterStats = field(default_factory=LimiterStats)
+    start_time: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "sent": self.sent,
+            "errors": self.errors,
+            "resumed": self.resumed,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 3),
+            "latency": self.latency.to_dict(),
+            "compression": self.compression.to_dict(),
+            "concurrency": self.concurrency.to_dict(),
+        }
+
+
+class _DeviceProgress:
+    """Contiguous watermark of acknowledged timestamps for one device.
+
+    Sends complete out of order, so only the first timestamp that has not been
+    acknowledged yet is checkpointed; anything past it is re-sent on resume.
+    """
+
+    def __init__(self, next_timestamp: int, step: int):
+        self.next_timestamp = next_timestamp
+        self.step = step
+        self.failed = False
+        self._acked: Set[int] = set()
+
+    def ack(self, timestamp: int) -> None:
+        self._acked.add(timestamp)
+        while self.next_timestamp in self._acked:
+            self._acked.discard(self.next_timestamp)
+            self.next_timestamp += self.step
+
+
+class BackfillRunner:
+    """Generates and uploads a historical series for each device.
+
+    Covers `[start, end)` in `step`-second increments with at most
+    `concurrency` requests in flight. Progress is checkpointed to the local
+    database under a job id derived from the range and seed, so re-running
+    the same range resumes where an interrupted run stopped. Progress rows
+    are per device; finishing or restarting a job only touches the rows of
+    this run's devices. Without a seed, the first run of a job draws one and
+    keeps it until the job has no progress left, so resumes continue the
+    same series.
+
+    With `adaptive` set, `concurrency` is only the upper bound: an
+    `AdaptiveLimiter` finds the level the backend sustains. Retries of
+    throttled requests wait for `Retry-After` when the response carries one.
+    """
+
+    def __init__(
+        self,
+        devices: List[DeviceConfig],
+        start: int,
+        end: int,
+        step: int,
+        concurrency: int = 50,
+        seed: Optional[int] = None,
+        restart: bool = False,
+        db=None,
+        api: Optional[ApiDefaults] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_THRESHOLD_BYTES,
+        adaptive: bool = False,
+        target_latency: float = DEFAULT_TARGET_LATENCY_SEC,
+    ):
+        self.devices = devices
+        self.start = start
+        self.end = end
+        self.step = step
+        self.concurrency = concurrency
+        self.restart = restart
+        self.api = api
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.seed = seed
+        self.generator = DataGenerator(seed=seed)
+        self.job_id = backfill_job_id(start, end, step, seed)
+        self.stats = BackfillStats()
+        self._db = db or get_data()
+        self._progress: Dict[str, _DeviceProgress] = {}
+        self._limiter: Optional[AdaptiveLimiter] = None
+
+    def _count(self, first: int) -> int:
+        return max(0, math.ceil((self.end - first) / self.step))
+
+    def _seed_setting(self) -> str:
+        return SEED_SETTING_PREFIX + self.job_id
+
+    def _load_seed(self) -> None:
+        if self.seed is not None:
+            return
+        saved = self._db.get_setting(self._seed_setting())
+        if saved is None:
+            saved = str(random.getrandbits(64))
+            self._db.set_setting(self._seed_setting(), saved)
+        self.generator = DataGenerator(seed=int(saved))
+
+    def _load_progress(self) -> None:
+        self._load_seed()
+        if self.restart:
+            self._db.delete_backfill_progress(
+                self.job_id, [device.device_id for device in self.devices]
+            )
+        saved = self._db.get_backfill_progress(self.job_id)
+
+        self._progress = {}
+        for device in self.devices:
+            first = max(self.start, saved.get(device.device_id, self.start))
+            self._progress[device.device_id] = _DeviceProgress(first, self.step)
+            self.stats.total += self._count(first)
+            self.stats.resumed += self._count(self.start) - self._count(first)
+
+    def _checkpoint(self) -> None:
+        self._db.save_backfill_progress(
+            self.job_id,
+            {device_id: p.next_timestamp for device_id, p in self._progress.items()},
+        )
+
+    def _readings(self, device: DeviceConfig, first: int) -> Iterator[TelemetryData]:
+        batched = numpy_available()
+        for chunk_start in range(first, self.end, self.step * CHUNK_SIZE):
+            chunk_end = min(self.end, chunk_start + self.step * CHUNK_SIZE)
+            timestamps = range(chunk_start, chunk_end, self.step)
+            if batched:
+                yield from self.generator.generate_batch([device], list(timestamps))
+            else:
+                for ts in timestamps:
+                    yield self.generator.generate(device, ts)
+
+    async def run(
+        self,
+        on_progress: Optional[Callable[[BackfillStats], None]] = None,
+        report_interval: float = 10.0,
+    ) -> BackfillStats:
+        self.stats = BackfillStats()
+        self._load_progress()
+        compressor = (
+            BodyCompressor(
+                self.compression,
+                self.compression_threshold,
+                stats=self.stats.compression,
+            )
+            if self.compression
+            else None
+        )
+
+        self._limiter = limiter_for(
+            self.adaptive, self.concurrency, self.target_latency, self.stats.concurrency
+        )
+        slots = self._limiter or asyncio.Semaphore(self.concurrency)
+        pending: Set[asyncio.Task] = set()
+
+        async with create_http_client(
+            self.api, max_connections=self.concurrency
+        ) as http, AsyncExitStack() as clients:
+            helpers = [asyncio.create_task(self._checkpoint_periodically())]
+            if on_progress:
+                helpers.append(
+                    asyncio.create_task(self._report(on_progress, report_interval))
+                )
+
+            try:
+                for device in self.devices:
+                    progress = self._progress[device.device_id]
+                    if progress.next_timestamp >= self.end:
+                        continue
+
+                    client = await clients.enter_async_context(
+                        WeatherIoTClient(
+                            device, http_client=http, compressor=compressor
+                        )
+                    )
+                    for data in self._readings(device, progress.next_timestamp):
+                        if progress.failed:
+                            break
+                        await slots.acquire()
+                        task = asyncio.create_task(
+                            self._send(client, progress, data, slots)
+                        )
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+
+                if pending:
+                    await asyncio.wait(pending)
+            finally:
+                for task in list(pending) + helpers:
+                    task.cancel()
+                await asyncio.gather(*pending, *helpers, return_exceptions=True)
+                self._checkpoint()
+
+        finished = [
+            device_id
+            for device_id, p in self._progress.items()
+            if p.next_timestamp >= self.end and not p.failed
+        ]
+        if finished:
+            self._db.delete_backfill_progress(self.job_id, finished)
+        if self.seed is None and not self._db.get_backfill_progress(self.job_id):
+            self._db.delete_setting(self._seed_setting())
+
+        return self.stats
+
+    async def _checkpoint_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL_SEC)
+            self._checkpoint()
+
+    async def _report(
+        self, on_progress: Callable[[BackfillStats], None], report_interval: float
+    ) -> None:
+        while True:
+            await asyncio.sleep(report_interval)
+            on_progress(self.stats)
+
+    async def _send(
+        self,
+        client: WeatherIoTClient,
+        progress: _DeviceProgress,
+        data: TelemetryData,
+        slots: Union[asyncio.Semaphore, AdaptiveLimiter],
+    ) -> None:
+        limiter = self._limiter
+        try:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                wait = None
+                try:
+                    started = time.monotonic()
+                    await client.send_telemetry(data)
+                    self.stats.latency.record(time.monotonic() - started)
+                    self.stats.sent += 1
+                    progress.ack(data.timestamp)
+                    if limiter is not None:
+                        limiter.on_response(started)
+                    return
+                except httpx.HTTPStatusError as e:
+                    retryable = e.response.status_code in RETRYABLE_STATUS
+                    error = f"HTTP {e.response.status_code}"
+                    wait = retry_after(e)
+                    if limiter is not None:
+                        limiter.on_response(started, e)
+                except httpx.HTTPError as e:
+                    retryable = True
+                    error = repr(e)
+                    if limiter is not None:
+                        limiter.on_response(started, e)
+                except Exception as e:
+                    # Not a delivery failure, so retrying will not help; but
+                    # the device must still stop rather than hold its
+                    # watermark and keep sending past it.
+                    retryable = False
+                    error = repr(e)
+
+                if not retryable or attempt == MAX_ATTEMPTS:
+                    break
+                if wait is None:
+                    wait = RETRY_BASE_DELAY_SEC * 2 ** (attempt - 1)
+                await asyncio.sleep(wait)
+
+            logger.warning(f"{client.device.name} @ {data.timestamp}: {error}")
+            self.stats.errors += 1
+            progress.failed = True
+        finally:
+            slots.release()
@@ -5,7 +5,13 @@ from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from hw_cli.core.storage import get_app_dir
+from hw_cli.core.storage import (
+    DEFAULT_BUSY_TIMEOUT_SEC,
+    DEFAULT_CACHE_SIZE_MB,
+    DEFAULT_MMAP_SIZE_MB,
+    DEFAULT_SYNCHRONOUS,
+    get_app_dir,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +23,56 @@ class SimulationDefaults:
     max_messages: Optional[int] = None
 
 
+@dataclass
+class TransportConfig:
+    """HTTP connection settings shared by every request the CLI makes.
+
+    Unset timeouts fall back to `api.timeout_seconds`. An unset
+    `max_connections` lets bulk runners size the pool to their concurrency.
+    """
+
+    http2: bool = False
+    # Speak HTTP/2 without TLS/ALPN negotiation, e.g. to a plaintext local gateway.
+    http2_prior_knowledge: bool = False
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    write_timeout: Optional[float] = None
+    pool_timeout: Optional[float] = None
+
+
 @dataclass
 class ApiDefaults:
     base_url: str = "https://apim-weather-app-dev.azure-api.net"
     timeout_seconds: int = 30
     token_refresh_buffer: int = 60
+    # Refresh tokens in the background once this fraction of their lifetime
+    # has passed, shifted per device by up to +/- token_refresh_jitter.
+    token_refresh_fraction: float = 0.8
+    token_refresh_jitter: float = 0.1
+    # Body shape for batched telemetry: "array" or "envelope".
+    batch_format: str = "array"
+    transport: TransportConfig = field(default_factory=TransportConfig)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ApiDefaults":
+        data = dict(data)
+        transport = TransportConfig(**data.pop("transport", {}))
+        return cls(transport=transport, **data)
+
+
+@dataclass
+class StorageConfig:
+    """SQLite settings for the local data store, shared by all processes."""
+
+    # Seconds a writer waits for another process's transaction to finish.
+    busy_timeout: float = DEFAULT_BUSY_TIMEOUT_SEC
+    # OFF, NORMAL, FULL or EXTRA; NORMAL is durable across crashes in WAL mode.
+    synchronous: str = DEFAULT_SYNCHRONOUS
+    mmap_size_mb: int = DEFAULT_MMAP_SIZE_MB
+    cache_size_mb: int = DEFAULT_CACHE_SIZE_MB
 
 
 @dataclass
@@ -39,14 +90,16 @@ class AppConfig:
     simulation: SimulationDefaults = field(default_factory=SimulationDefaults)
     api: ApiDefaults = field(default_factory=ApiDefaults)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
+    storage: StorageConfig = field(default_factory=StorageConfig)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "AppConfig":
         return cls(
             verbose=data.get("verbose", False),
             simulation=SimulationDefaults(**data.get("simulation", {})),
-            api=ApiDefaults(**data.get("api", {})),
+            api=ApiDefaults.from_dict(data.get("api", {})),
             logging=LoggingConfig(**data.get("logging", {})),
+            storage=StorageConfig(**data.get("storage", {})),
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -55,6 +108,7 @@ class AppConfig:
             "simulation": asdict(self.simulation),
             "api": asdict(self.api),
             "logging": asdict(self.logging),
+            "storage": asdict(self.storage),
         }
 
 
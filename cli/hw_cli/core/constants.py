@@ -9,4 +9,7 @@ DEFAULT_BUCKET_SECONDS = 120
 DEFAULT_NUM_BUCKETS = 5
 
 TOKEN_REFRESH_BUFFER_SEC = 60
-TOKEN_DEFAULT_TTL_SEC = 86400
\ No newline at end of file
+TOKEN_DEFAULT_TTL_SEC = 86400
+
+# Latency above which the adaptive limiter backs off.
+DEFAULT_TARGET_LATENCY_SEC = 0.5
@@ -0,0 +1,410 @@
+import asyncio
+import json
+import logging
+import mmap
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import httpx
+
+from hw_cli.core.api.client import WeatherIoTClient
+from hw_cli.core.api.compression import (
+    DEFAULT_THRESHOLD_BYTES,
+    BodyCompressor,
+    CompressionStats,
+)
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.api.weather_api_gateway import (
+    build_telemetry_payload,
+    encode_json_body,
+)
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.data_generator import DataGenerator, numpy_available
+from hw_cli.core.histogram import LatencyHistogram
+from hw_cli.core.limiter import (
+    DEFAULT_TARGET_LATENCY_SEC,
+    AdaptiveLimiter,
+    LimiterStats,
+    limiter_for,
+)
+from hw_cli.core.models import DeviceConfig
+
+logger = logging.getLogger(__name__)
+
+# File layout:
+#   header   magic, version, device count, record count, device table offset,
+#            index offset
+#   bodies   ready-to-send request bodies, back to back
+#   devices  JSON array of device_ids
+#   index    one fixed-size entry per record, ordered by timestamp
+MAGIC = b"HWC1"
+VERSION = 1
+HEADER = struct.Struct("<4sIIQQQ")
+INDEX_ENTRY = struct.Struct("<IqQI")  # device index, timestamp, offset, length
+
+
+class CorpusWriter:
+    """Streams request bodies to a corpus file and writes the index on close."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: BinaryIO = path.open("wb")
+        self._file.write(b"\0" * HEADER.size)
+        self._offset = HEADER.size
+        self._devices: Dict[str, int] = {}
+        self._entries: List[Tuple[int, int, int, int]] = []
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes_written(self) -> int:
+        return self._offset
+
+    def add(self, device_id: str, timestamp: int, body: bytes) -> None:
+        device_index = self._devices.setdefault(device_id, len(self._devices))
+        self._file.write(body)
+        self._entries.append((device_index, timestamp, self._offset, len(body)))
+        self._offset += len(body)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+
+        device_table = json.dumps(list(self._devices)).encode("utf-8")
+        devices_offset = self._offset
+        self._file.write(device_table)
+
+        index_offset = devices_offset + len(device_table)
+        self._entries.sort(key=lambda e: (e[1], e[0]))
+        for entry in self._entries:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+
+        self._file.seek(0)
+        self._file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(self._devices),
+                len(self._entries),
+                devices_offset,
+                index_offset,
+            )
+        )
+        self._file.close()
+
+
+class Corpus:
+    """Read-only, memory-mapped view of a corpus file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = path.open("rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            self._file.close()
+            raise ValueError(f"Truncated corpus header: {path}") from e
+
+        try:
+            magic, version, n_devices, n_records, devices_offset, index_offset = (
+                HEADER.unpack_from(self._mm, 0)
+            )
+        except struct.error as e:
+            self.close()
+            raise ValueError(f"Truncated corpus header: {path}") from e
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a telemetry corpus (v{VERSION}): {path}")
+
+        index_end = index_offset + n_records * INDEX_ENTRY.size
+        if not HEADER.size <= devices_offset <= index_offset <= index_end <= len(
+            self._mm
+        ):
+            self.close()
+            raise ValueError(f"Truncated or corrupt corpus: {path}")
+        try:
+            self.device_ids: List[str] = json.loads(
+                self._mm[devices_offset:index_offset].decode("utf-8")
+            )
+        except ValueError as e:
+            self.close()
+            raise ValueError(f"Corrupt corpus device table: {path}") from e
+        self.record_count = n_records
+        self._index = memoryview(self._mm)[index_offset:index_end]
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def entries(self) -> Iterator[Tuple[int, int, int, int]]:
+        """(device index, timestamp, offset, length) in timestamp order."""
+        return INDEX_ENTRY.iter_unpack(self._index)
+
+    def body(self, offset: int, length: int) -> bytes:
+        """The stored request body, copied out of the mapping.
+
+        httpx only sends `bytes` bodies, so a zero-copy view would be copied
+        on the way out anyway; copying here also keeps no buffer exported
+        that would stop `close()` from unmapping the file.
+        """
+        return self._mm[offset : offset + length]
+
+    def close(self) -> None:
+        if hasattr(self, "_index"):
+            self._index.release()
+        self._mm.close()
+        self._file.close()
+
+
+def record_corpus(
+    path: Path,
+    devices: List[DeviceConfig],
+    start: int,
+    end: int,
+    step: int,
+    seed: Optional[int] = None,
+) -> CorpusWriter:
+    """Generate readings for `[start, end)` and store their encoded bodies."""
+    generator = DataGenerator(seed=seed)
+    timestamps = list(range(start, end, step))
+
+    with CorpusWriter(path) as writer:
+        for device in devices:
+            if numpy_available():
+                batch = generator.generate_batch([device], timestamps)
+                payloads = (batch.payload(i) for i in range(len(batch)))
+            else:
+                payloads = (
+                    build_telemetry_payload(
+                        t.timestamp,
+                        t.reading.temperature,
+                        t.reading.pressure,
+                        t.reading.humidity,
+                        t.reading.precipitation_mm,
+                        t.reading.rain,
+                    )
+                    for t in (generator.generate(device, ts) for ts in timestamps)
+                )
+
+            for payload in payloads:
+                writer.add(device.device_id, payload["ts"], encode_json_body(payload))
+
+    return writer
+
+
+@dataclass
+class ReplayStats:
+    sent: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    compression: CompressionStats = field(default_factory=CompressionStats)
+    concurrency: LimiterStats = field(default_factory=LimiterStats)
+    start_time: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 3),
+            "latency": self.latency.to_dict(),
+            "compression": self.compression.to_dict(),
+            "concurrency": self.concurrency.to_dict(),
+        }
+
+
+class ReplayRunner:
+    """Sends the bodies of a corpus without re-generating or re-encoding them.
+
+    With `speed` set, records are issued on their recorded inter-arrival times
+    scaled by `speed` and latency is measured from the scheduled time;
+    otherwise they are sent as fast as `concurrency` allows. With `adaptive`
+    set, `concurrency` is the upper bound of an `AdaptiveLimiter`.
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        devices: Dict[str, DeviceConfig],
+        concurrency: int = 100,
+        speed: Optional[float] = None,
+        loops: int = 1,
+        api: Optional[ApiDefaults] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_THRESHOLD_BYTES,
+        adaptive: bool = False,
+        target_latency: float = DEFAULT_TARGET_LATENCY_SEC,
+    ):
+        self.corpus = corpus
+        self.devices = devices
+        self.concurrency = concurrency
+        self.speed = speed
+        self.loops = loops
+        self.api = api
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.stats = ReplayStats()
+        self._limiter: Optional[AdaptiveLimiter] = None
+
+    async def run(
+        self,
+        on_progress: Optional[Callable[[ReplayStats], None]] = None,
+        report_interval: float = 10.0,
+    ) -> ReplayStats:
+        self.stats = ReplayStats()
+        stats = self.stats
+        compressor = (
+            BodyCompressor(
+                self.compression,
+                self.compression_threshold,
+                stats=stats.compression,
+            )
+            if self.compression
+            else None
+        )
+
+        self._limiter = limiter_for(
+            self.adaptive, self.concurrency, self.target_latency, stats.concurrency
+        )
+        slots = self._limiter or asyncio.Semaphore(self.concurrency)
+        pending: set = set()
+
+        async with create_http_client(
+            self.api, max_connections=self.concurrency
+        ) as http:
+            clients: List[Optional[WeatherIoTClient]] = []
+            for device_id in self.corpus.device_ids:
+                device = self.devices.get(device_id)
+                client = None
+                if device:
+                    client = WeatherIoTClient(
+                        device, http_client=http, compressor=compressor
+                    )
+                    await client.connect()
+                clients.append(client)
+
+            reporter = (
+                asyncio.create_task(self._report(on_progress, report_interval))
+                if on_progress
+                else None
+            )
+            try:
+                for _ in range(self.loops):
+                    loop_start = time.monotonic()
+                    first_ts: Optional[int] = None
+
+                    for device_index, ts, offset, length in self.corpus.entries():
+                        client = clients[device_index]
+                        if client is None:
+                            continue
+
+                        if self.speed:
+                            if first_ts is None:
+                                first_ts = ts
+                            intended = loop_start + (ts - first_ts) / self.speed
+                            delay = intended - time.monotonic()
+                            if delay > 0:
+                                await asyncio.sleep(delay)
+                        else:
+                            intended = None
+
+                        await slots.acquire()
+                        task = asyncio.create_task(
+                            self._send(
+                                client,
+                                self.corpus.body(offset, length),
+                                intended,
+                                slots,
+                            )
+                        )
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+
+                if pending:
+                    await asyncio.wait(pending)
+            finally:
+                helpers = [reporter] if reporter else []
+                for task in list(pending) + helpers:
+                    task.cancel()
+                await asyncio.gather(*pending, *helpers, return_exceptions=True)
+                for client in clients:
+                    if client:
+                        await client.close()
+
+        return self.stats
+
+    async def _report(
+        self, on_progress: Callable[[ReplayStats], None], report_interval: float
+    ) -> None:
+        while True:
+            await asyncio.sleep(report_interval)
+            on_progress(self.stats)
+
+    async def _send(
+        self,
+        client: WeatherIoTClient,
+        body: bytes,
+        intended: Optional[float],
+        slots: Union[asyncio.Semaphore, AdaptiveLimiter],
+    ) -> None:
+        limiter = self._limiter
+        issued = time.monotonic()
+        started = issued if intended is None else intended
+        try:
+            await client.send_telemetry_body(body)
+            self.stats.sent += 1
+            self.stats.bytes_sent += len(body)
+            if limiter is not None:
+                limiter.on_response(issued)
+        except httpx.HTTPStatusError as e:
+            self.stats.errors += 1
+            logger.warning(f"{client.device.name}: HTTP {e.response.status_code}")
+            if limiter is not None:
+                limiter.on_response(issued, e)
+        except httpx.HTTPError as e:
+            self.stats.errors += 1
+            logger.warning(f"{client.device.name}: {e!r}")
+            if limiter is not None:
+                limiter.on_response(issued, e)
+        finally:
+            slots.release()
+
+        self.stats.latency.record(time.monotonic() - started)
@@ -1,7 +1,8 @@
+import hashlib
 import math
 import random
 import time
-from typing import Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
 from hw_cli.core.constants import (
     BASE_HUMIDITY_PERCENT,
@@ -14,8 +15,169 @@ from hw_cli.core.constants import (
 from hw_cli.core.models import DeviceConfig, RainfallHistogram, TelemetryData, WeatherReading
 
 
+# Each reading uses 16-bit random words: twelve for each of the three
+# normals (Irwin-Hall), then one "wet" and one "tips" word per rain bucket.
+# One 64-bit mix yields four words.
+_NORMAL_WORDS = 12
+_TEMP, _PRESSURE, _HUMIDITY = 0, 12, 24
+_WET = 3 * _NORMAL_WORDS
+_TIPS = _WET + DEFAULT_NUM_BUCKETS
+_READING_MIXES = -(-(_TIPS + DEFAULT_NUM_BUCKETS) // 4)
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+_WORD = 1 << 16
+
+
+def derive_seed(seed: int, device_id: str) -> int:
+    """Stable 64-bit key for one device's readings.
+
+    Depends only on the run seed and the device, so it is the same in every
+    process, shard and task ordering.
+    """
+    digest = hashlib.sha256(f"{seed}:{device_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _mix64(z: int) -> int:
+    """SplitMix64 finalizer; a bijection on 64-bit integers."""
+    z = ((z ^ (z >> 30)) * _MIX1) & _MASK64
+    z = ((z ^ (z >> 27)) * _MIX2) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _reading_words(key: int, timestamp: int) -> List[int]:
+    """The random 16-bit words for one device key at one timestamp.
+
+    A pure function of its arguments: readings do not depend on what else
+    was generated before them, in which order or in which batch.
+    """
+    base = _mix64((key + timestamp * _GOLDEN64) & _MASK64)
+    words = []
+    for j in range(1, _READING_MIXES + 1):
+        z = _mix64((base + j * _GOLDEN64) & _MASK64)
+        words += (z & 0xFFFF, (z >> 16) & 0xFFFF, (z >> 32) & 0xFFFF, z >> 48)
+    return words
+
+
+def _normal(words: List[int], offset: int) -> float:
+    """Approximately standard normal: sum of twelve uniforms minus six.
+
+    Summed as integers, so the result does not depend on addition order.
+    """
+    return sum(words[offset : offset + _NORMAL_WORDS]) / _WORD - 6.0
+
+
+def _round2(x: float) -> float:
+    # round(x, 2) rounds the exact decimal value and can disagree with
+    # NumPy in the last digit; this matches `_batch_round2` exactly.
+    return round(x * 100) / 100
+
+
+def _diurnal(timestamp: int) -> float:
+    hour = (timestamp % 86400) / 3600
+    return 5 * math.sin((hour - 6) * math.pi / 12)
+
+
+def numpy_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise RuntimeError(
+            "Batch generation requires numpy. Install it with: pip install numpy"
+        ) from e
+    return numpy
+
+
+class TelemetryBatch:
+    """Columnar telemetry for many rows, as produced by `generate_batch`.
+
+    Row `i` belongs to `devices[device_index[i]]` at `timestamp[i]`. `rain` has
+    one column of tip counts per histogram bucket.
+    """
+
+    def __init__(
+        self,
+        devices: Sequence[DeviceConfig],
+        device_index: Any,
+        timestamp: Any,
+        temperature: Any,
+        pressure: Any,
+        humidity: Any,
+        precipitation_mm: Any,
+        rain: Any,
+    ):
+        self.devices = devices
+        self.device_index = device_index
+        self.timestamp = timestamp
+        self.temperature = temperature
+        self.pressure = pressure
+        self.humidity = humidity
+        self.precipitation_mm = precipitation_mm
+        self.rain = rain
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __iter__(self) -> Iterator[TelemetryData]:
+        return (self.telemetry(i) for i in range(len(self)))
+
+    def device(self, i: int) -> DeviceConfig:
+        return self.devices[self.device_index[i]]
+
+    def _rain_histogram(self, i: int, ts: int) -> RainfallHistogram:
+        counts = self.rain[i].tolist()
+        return RainfallHistogram(
+            data={str(b): n for b, n in enumerate(counts) if n},
+            bucket_seconds=DEFAULT_BUCKET_SECONDS,
+            start_timestamp=ts - DEFAULT_NUM_BUCKETS * DEFAULT_BUCKET_SECONDS,
+            num_buckets=DEFAULT_NUM_BUCKETS,
+        )
+
+    def telemetry(self, i: int) -> TelemetryData:
+        ts = int(self.timestamp[i])
+        reading = WeatherReading(
+            temperature=float(self.temperature[i]),
+            pressure=float(self.pressure[i]),
+            humidity=float(self.humidity[i]),
+            precipitation_mm=float(self.precipitation_mm[i]),
+            rain=self._rain_histogram(i, ts),
+        )
+        return TelemetryData(timestamp=ts, reading=reading)
+
+    def payload(self, i: int) -> Dict[str, Any]:
+        """Request body for row `i` without building the dataclass tree."""
+        from hw_cli.core.api.weather_api_gateway import build_telemetry_payload
+
+        ts = int(self.timestamp[i])
+        return build_telemetry_payload(
+            ts,
+            float(self.temperature[i]),
+            float(self.pressure[i]),
+            float(self.humidity[i]),
+            float(self.precipitation_mm[i]),
+            self._rain_histogram(i, ts) if self.rain[i].any() else None,
+        )
+
+
 class DataGenerator:
-    """Generates simulated weather telemetry data."""
+    """Generates simulated weather telemetry data.
+
+    Each reading's random values are a pure function of the run seed, the
+    device_id and the timestamp, so the same seed yields byte-identical data
+    however devices are sharded, interleaved, batched or resumed, and whether
+    or not `generate_batch` (NumPy) is used instead of `generate`.
+    """
 
     def __init__(self, seed: Optional[int] = None):
         self.base_temp = BASE_TEMP_C
@@ -23,32 +185,46 @@ class DataGenerator:
         self.base_humidity = BASE_HUMIDITY_PERCENT
         self.rain_prob_factor = RAIN_PROBABILITY_FACTOR
 
-        if seed is not None:
-            random.seed(seed)
+        self.seed = seed
+        # Unseeded generators still need a fixed seed so that the scalar and
+        # batch paths agree; it just differs from one instance to the next.
+        self._seed = random.getrandbits(64) if seed is None else seed
+        self._keys: Dict[str, int] = {}
+
+    def _key_for(self, device_id: str) -> int:
+        key = self._keys.get(device_id)
+        if key is None:
+            key = self._keys[device_id] = derive_seed(self._seed, device_id)
+        return key
 
-    def generate(self, device: DeviceConfig) -> TelemetryData:
-        now = int(time.time())
-        hour = (now % 86400) / 3600
+    def generate(
+        self, device: DeviceConfig, timestamp: Optional[int] = None
+    ) -> TelemetryData:
+        now = int(time.time()) if timestamp is None else int(timestamp)
+        w = _reading_words(self._key_for(device.device_id), now)
 
-        temp = self.base_temp + 5 * math.sin((hour - 6) * math.pi / 12) + random.gauss(0, 2)
+        temp = self.base_temp + _diurnal(now) + 2 * _normal(w, _TEMP)
 
-        pressure = self.base_pressure + random.gauss(0, 5)
-        humidity = max(0.0, min(100.0, self.base_humidity + random.gauss(0, 10)))
+        pressure = self.base_pressure + 5 * _normal(w, _PRESSURE)
+        humidity = self.base_humidity + 10 * _normal(w, _HUMIDITY)
+        humidity = max(0.0, min(100.0, humidity))
 
-        rain = self._generate_rain(now, humidity)
+        rain = self._generate_rain(w, now, humidity)
         total_tips = sum(rain.data.values()) if rain.data else 0
         precip_mm = total_tips * device.mm_per_tip
 
         reading = WeatherReading(
-            temperature=round(temp, 2),
-            pressure=round(pressure, 2),
-            humidity=round(humidity, 2),
-            precipitation_mm=round(precip_mm, 2),
+            temperature=_round2(temp),
+            pressure=_round2(pressure),
+            humidity=_round2(humidity),
+            precipitation_mm=_round2(precip_mm),
             rain=rain,
         )
         return TelemetryData(timestamp=now, reading=reading)
 
-    def _generate_rain(self, now: int, humidity: float) -> RainfallHistogram:
+    def _generate_rain(
+        self, words: List[int], now: int, humidity: float
+    ) -> RainfallHistogram:
         """Generate sparse rainfall histogram."""
         start_ts = now - DEFAULT_NUM_BUCKETS * DEFAULT_BUCKET_SECONDS
         data: Dict[str, int] = {}
@@ -57,13 +233,97 @@ class DataGenerator:
         rain_factor = (humidity / 100.0) * self.rain_prob_factor
 
         for i in range(DEFAULT_NUM_BUCKETS):
-            if random.random() < rain_factor:
-                tips = random.randint(1, 5)
-                data[str(i)] = tips
+            if words[_WET + i] / _WORD < rain_factor:
+                data[str(i)] = (words[_TIPS + i] * 5 >> 16) + 1
 
         return RainfallHistogram(
             data=data,
             bucket_seconds=DEFAULT_BUCKET_SECONDS,
             start_timestamp=start_ts,
             num_buckets=DEFAULT_NUM_BUCKETS,
-        )
\ No newline at end of file
+        )
+
+    def generate_batch(
+        self,
+        devices: Sequence[DeviceConfig],
+        timestamps: Union[int, Sequence[int], None] = None,
+    ) -> TelemetryBatch:
+        """Generate readings for every (device, timestamp) pair in one pass.
+
+        Rows are device-major: all timestamps for `devices[0]` first. Computes
+        the same values as `generate`, with the same integer mixing and
+        operation order, as NumPy columns.
+        """
+        np = _require_numpy()
+
+        if timestamps is None:
+            timestamps = int(time.time())
+        ts_col = np.atleast_1d(np.asarray(timestamps, dtype=np.int64))
+
+        n_devices, n_ts = len(devices), len(ts_col)
+        device_index = np.repeat(np.arange(n_devices, dtype=np.int32), n_ts)
+        ts = np.tile(ts_col, n_devices)
+
+        keys = np.array(
+            [self._key_for(d.device_id) for d in devices], dtype=np.uint64
+        )
+        w = _batch_words(np, keys[device_index], ts.astype(np.uint64))
+
+        # Per timestamp with `math`, so it matches `generate` to the last bit.
+        diurnal = np.array([_diurnal(t) for t in ts_col.tolist()])
+        diurnal = np.tile(diurnal, n_devices)
+        temp = self.base_temp + diurnal + 2 * _batch_normal(w, _TEMP)
+        pressure = self.base_pressure + 5 * _batch_normal(w, _PRESSURE)
+        humidity = self.base_humidity + 10 * _batch_normal(w, _HUMIDITY)
+        humidity = np.clip(humidity, 0.0, 100.0)
+
+        rain_factor = (humidity / 100.0) * self.rain_prob_factor
+        wet = w[:, _WET : _WET + DEFAULT_NUM_BUCKETS] / _WORD
+        tips = (w[:, _TIPS : _TIPS + DEFAULT_NUM_BUCKETS] * 5 >> 16) + 1
+        rain = np.where(wet < rain_factor[:, None], tips, 0)
+
+        mm_per_tip = np.array([d.mm_per_tip for d in devices], dtype=np.float64)
+        precip = rain.sum(axis=1) * mm_per_tip[device_index]
+
+        return TelemetryBatch(
+            devices=devices,
+            device_index=device_index,
+            timestamp=ts,
+            temperature=_batch_round2(np, temp),
+            pressure=_batch_round2(np, pressure),
+            humidity=_batch_round2(np, humidity),
+            precipitation_mm=_batch_round2(np, precip),
+            rain=rain,
+        )
+
+
+def _batch_mix64(np: Any, z: Any) -> Any:
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+    return z ^ (z >> np.uint64(31))
+
+
+def _batch_words(np: Any, keys: Any, ts: Any) -> Any:
+    """`_reading_words` for many (key, timestamp) rows at once, as int64."""
+    golden = np.uint64(_GOLDEN64)
+    words = np.empty((len(ts), 4 * _READING_MIXES), dtype=np.int64)
+    # uint64 arithmetic wraps modulo 2**64, as the masks do in Python.
+    with np.errstate(over="ignore"):
+        base = _batch_mix64(np, keys + ts * golden)
+        z = base.copy()
+        for j in range(_READING_MIXES):
+            z += golden
+            mixed = _batch_mix64(np, z)
+            for k in range(4):
+                word = (mixed >> np.uint64(16 * k)) & np.uint64(0xFFFF)
+                words[:, 4 * j + k] = word.astype(np.int64)
+    return words
+
+
+def _batch_normal(words: Any, offset: int) -> Any:
+    total = words[:, offset : offset + _NORMAL_WORDS].sum(axis=1)
+    return total / _WORD - 6.0
+
+
+def _batch_round2(np: Any, x: Any) -> Any:
+    return np.rint(x * 100) / 100
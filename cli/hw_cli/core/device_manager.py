@@ -1,12 +1,44 @@
-from typing import List, Optional
+import copy
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from hw_cli.core.models import DeviceConfig
 from hw_cli.core.storage import get_data
 
+# Devices written per statement by `import_devices`.
+IMPORT_CHUNK_SIZE = 1000
+
 
 class DeviceManager:
+    """Looks up and saves devices.
+
+    Parsed devices are cached per manager and dropped whenever the devices
+    table changes, in this process or another; callers get copies they may
+    modify freely.
+    """
+
     def __init__(self, db=None):
         self._db = db or get_data()
+        self._version: Optional[int] = None
+        self._by_id: Dict[str, DeviceConfig] = {}
+        self._id_by_name: Dict[str, str] = {}
+        # Whether _by_id holds every device, so a miss means "not found".
+        self._complete = False
+
+    def _sync(self) -> None:
+        version = self._db.devices_version()
+        if version != self._version:
+            self._version = version
+            self._by_id.clear()
+            self._id_by_name.clear()
+            self._complete = False
+
+    def _remember(self, data: Optional[Dict[str, Any]]) -> Optional[DeviceConfig]:
+        if not data:
+            return None
+        device = DeviceConfig.from_dict(data)
+        self._by_id[device.device_id] = device
+        self._id_by_name[device.name] = device.device_id
+        return _copy(device)
 
     def resolve_device(self, ref: Optional[str] = None) -> Optional[DeviceConfig]:
         """Resolve device by name/ID, or fallback to default if ref is None."""
@@ -20,34 +52,109 @@ class DeviceManager:
     def update_device(self, device: DeviceConfig) -> None:
         self._db.save_device(device.device_id, device.to_dict())
 
+    def update_devices(self, devices: List[DeviceConfig]) -> None:
+        self._db.save_devices([(d.device_id, d.to_dict()) for d in devices])
+
+    def import_devices(
+        self, devices: Iterable[DeviceConfig], replace: bool = False
+    ) -> Tuple[List[str], int]:
+        """Save many devices in one transaction, resolving clashes in one pass.
+
+        A device_id that is already stored, or repeated in `devices`, is
+        skipped; with `replace`, a stored one is overwritten but keeps its
+        name. Names already in use get a numeric suffix, as `devices add` does.
+        `devices` is consumed lazily and written in chunks; if iterating it
+        raises, nothing is saved. Returns the saved device_ids and how many
+        were skipped.
+        """
+        saved: List[str] = []
+        skipped = 0
+
+        with self._db.batch():
+            existing = self._db.get_device_names()
+            names = set(existing.values())
+            seen: Set[str] = set()
+            chunk: List[DeviceConfig] = []
+
+            for device in devices:
+                if device.device_id in seen or (
+                    device.device_id in existing and not replace
+                ):
+                    skipped += 1
+                    continue
+                seen.add(device.device_id)
+
+                if device.device_id in existing:
+                    device.name = existing[device.device_id]
+                else:
+                    device.name = _unique_name(device.name, names)
+                    names.add(device.name)
+                saved.append(device.device_id)
+                chunk.append(device)
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    self.update_devices(chunk)
+                    chunk = []
+
+            self.update_devices(chunk)
+        return saved, skipped
+
     def remove_device(self, device_id: str) -> bool:
         if not self.device_exists_by_id(device_id):
             return False
 
-        deleted = self._db.delete_device(device_id)
-        if deleted and self.get_default_device_id() == device_id:
-            self._db.delete_setting("default_device")
+        with self._db.batch():
+            deleted = self._db.delete_device(device_id)
+            if deleted and self.get_default_device_id() == device_id:
+                self._db.delete_setting("default_device")
         return deleted
 
     def get_device_by_id(self, device_id: str) -> Optional[DeviceConfig]:
-        data = self._db.get_device(device_id)
-        return DeviceConfig.from_dict(data) if data else None
+        self._sync()
+        device = self._by_id.get(device_id)
+        if device is not None:
+            return _copy(device)
+        if self._complete:
+            return None
+        return self._remember(self._db.get_device(device_id))
 
     def get_device_by_name(self, name: str) -> Optional[DeviceConfig]:
-        for device in self.get_devices():
-            if device.name == name:
-                return device
-        return None
+        self._sync()
+        device_id = self._id_by_name.get(name)
+        if device_id is not None:
+            return _copy(self._by_id[device_id])
+        if self._complete:
+            return None
+        return self._remember(self._db.get_device_by_name(name))
 
     def device_exists_by_id(self, device_id: str) -> bool:
         return self._db.device_exists(device_id)
 
     def device_exists_by_name(self, name: str) -> bool:
-        return self.get_device_by_name(name) is not None
-
-    def get_devices(self) -> List[DeviceConfig]:
-        raw_list = self._db.get_all_devices()
-        return [DeviceConfig.from_dict(d) for d in raw_list]
+        return self._db.device_name_exists(name)
+
+    def get_devices(self, registered: Optional[bool] = None) -> List[DeviceConfig]:
+        """All devices, or only the (un)registered ones if `registered` is set.
+
+        Until every device has been loaded once, a filtered call reads only
+        the matching rows, using the index on registration state.
+        """
+        self._sync()
+        if not self._complete:
+            if registered is not None:
+                return [
+                    self._remember(data)
+                    for data in self._db.get_all_devices(registered)
+                ]
+            self._by_id.clear()
+            self._id_by_name.clear()
+            for data in self._db.get_all_devices():
+                self._remember(data)
+            self._complete = True
+        return [
+            _copy(d)
+            for d in self._by_id.values()
+            if registered is None or d.is_registered == registered
+        ]
 
     def set_default_device(self, device_id: str) -> None:
         if not self.device_exists_by_id(device_id):
@@ -67,3 +174,19 @@ class DeviceManager:
 
     def get_storage_path(self) -> str:
         return str(self._db.db_path)
+
+
+def _copy(device: DeviceConfig) -> DeviceConfig:
+    # metadata is the only mutable field.
+    copied = copy.copy(device)
+    copied.metadata = dict(device.metadata)
+    return copied
+
+
+def _unique_name(base_name: str, taken: Set[str]) -> str:
+    if base_name not in taken:
+        return base_name
+    counter = 1
+    while f"{base_name}-{counter}" in taken:
+        counter += 1
+    return f"{base_name}-{counter}"
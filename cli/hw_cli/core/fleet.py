@@ -0,0 +1,387 @@
+import asyncio
+import fnmatch
+import functools
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from hw_cli.core.api.batching import BatchStats
+from hw_cli.core.api.client import WeatherIoTClient
+from hw_cli.core.api.compression import (
+    DEFAULT_THRESHOLD_BYTES,
+    BodyCompressor,
+    CompressionStats,
+)
+from hw_cli.core.api.encoding import EncodingStats
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.data_generator import DataGenerator
+from hw_cli.core.histogram import LatencyHistogram
+from hw_cli.core.limiter import (
+    DEFAULT_TARGET_LATENCY_SEC,
+    AdaptiveLimiter,
+    LimiterStats,
+    is_throttled,
+    limiter_for,
+    retry_after,
+)
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+MAX_CONSECUTIVE_ERRORS = 5
+
+
+@dataclass
+class FleetStats:
+    """Combined counters for every device in a fleet run."""
+
+    sent: int = 0
+    errors: int = 0
+    active: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    encoding: EncodingStats = field(default_factory=EncodingStats)
+    compression: CompressionStats = field(default_factory=CompressionStats)
+    batching: BatchStats = field(default_factory=BatchStats)
+    concurrency: LimiterStats = field(default_factory=LimiterStats)
+    start_time: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "errors": self.errors,
+            "active": self.active,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 3),
+            "latency": self.latency.to_dict(),
+            "encoding": self.encoding.to_dict(),
+            "compression": self.compression.to_dict(),
+            "batching": self.batching.to_dict(),
+            "concurrency": self.concurrency.to_dict(),
+        }
+
+    @classmethod
+    def merged(cls, snapshots: Iterable[Dict[str, Any]]) -> "FleetStats":
+        """Combine `to_dict` snapshots from several runners into one."""
+        stats = cls()
+        elapsed = 0.0
+        for snapshot in snapshots:
+            stats.sent += snapshot.get("sent", 0)
+            stats.errors += snapshot.get("errors", 0)
+            stats.active += snapshot.get("active", 0)
+            elapsed = max(elapsed, snapshot.get("elapsed", 0.0))
+            stats.latency.merge(LatencyHistogram.from_dict(snapshot.get("latency", {})))
+            stats.encoding.merge(EncodingStats.from_dict(snapshot.get("encoding", {})))
+            stats.compression.merge(
+                CompressionStats.from_dict(snapshot.get("compression", {}))
+            )
+            stats.batching.merge(BatchStats.from_dict(snapshot.get("batching", {})))
+            stats.concurrency.merge(
+                LimiterStats.from_dict(snapshot.get("concurrency", {}))
+            )
+        stats.start_time -= elapsed
+        return stats
+
+
+def select_devices(
+    devices: List[DeviceConfig],
+    pattern: Optional[str] = None,
+    count: Optional[int] = None,
+    registered: bool = True,
+) -> List[DeviceConfig]:
+    """Filter devices by name/device_id glob and cap the count.
+
+    Only registered devices are kept, or only unregistered ones with
+    `registered=False`.
+    """
+    selected = [
+        d
+        for d in devices
+        if d.is_registered == registered
+        and (
+            pattern is None
+            or fnmatch.fnmatchcase(d.name, pattern)
+            or fnmatch.fnmatchcase(d.device_id, pattern)
+        )
+    ]
+    if count is not None:
+        selected = selected[:count]
+    return selected
+
+
+class FleetRunner:
+    """Drives many devices concurrently from a single event loop.
+
+    All devices share one httpx connection pool (sized and, with HTTP/2,
+    multiplexed per `api.transport`), one SQLite handle and one
+    `Scheduler`; each device runs as its own task with an independent interval
+    and jitter, parked on the scheduler between sends.
+
+    With `batch_size` above 1 a device queues readings instead of waiting for
+    each response; they go out in batches and latency covers the linger time.
+
+    Throttling responses (429/503) do not count towards a device's error
+    limit, and the device waits out any `Retry-After` before its next send.
+    With `adaptive` set, sends across the fleet also go through one
+    `AdaptiveLimiter`, so a backend that pushes back sees fewer requests at
+    once and every device pauses for `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        devices: List[DeviceConfig],
+        interval: float,
+        jitter: float = 0.0,
+        max_messages: Optional[int] = None,
+        duration: Optional[float] = None,
+        seed: Optional[int] = None,
+        stagger: bool = True,
+        encoding: str = "json",
+        api: Optional[ApiDefaults] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_THRESHOLD_BYTES,
+        batch_size: int = 1,
+        linger: float = 0.0,
+        adaptive: bool = False,
+        target_latency: float = DEFAULT_TARGET_LATENCY_SEC,
+    ):
+        self.devices = devices
+        self.interval = interval
+        self.jitter = jitter
+        self.max_messages = max_messages
+        self.duration = duration
+        self.stagger = stagger
+        self.encoding = encoding
+        self.api = api
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.batch_size = batch_size
+        self.linger = linger
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.generator = DataGenerator(seed=seed)
+        self.stats = FleetStats()
+        self.scheduler = Scheduler()
+        self._stop: Optional[asyncio.Event] = None
+        self._limiter: Optional[AdaptiveLimiter] = None
+
+    def stop(self) -> None:
+        """Ask a running `run()` to cancel its device tasks and return."""
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(
+        self,
+        on_progress: Optional[Callable[[FleetStats], None]] = None,
+        report_interval: float = 10.0,
+    ) -> FleetStats:
+        self.stats = FleetStats()
+        self.scheduler = Scheduler()
+        self._stop = asyncio.Event()
+        compressor = (
+            BodyCompressor(
+                self.compression,
+                self.compression_threshold,
+                stats=self.stats.compression,
+            )
+            if self.compression
+            else None
+        )
+        self._limiter = limiter_for(
+            self.adaptive,
+            len(self.devices) * self.batch_size,
+            self.target_latency,
+            self.stats.concurrency,
+        )
+
+        # Without batching each device waits for its response, so one
+        # connection per device covers every request in flight. Batched
+        # devices do not wait: a batch that is sent while an earlier one is
+        # still out waits for a free connection, which counts towards its
+        # latency. Set `api.transport.max_connections` if that shows up.
+        async with create_http_client(
+            self.api, max_connections=max(1, len(self.devices))
+        ) as http:
+            tasks = [
+                asyncio.create_task(self._run_device(device, http, compressor))
+                for device in self.devices
+            ]
+            reporter = (
+                asyncio.create_task(self._report(on_progress, report_interval))
+                if on_progress
+                else None
+            )
+
+            stopper = asyncio.create_task(self._stop.wait())
+
+            try:
+                if tasks:
+                    devices_done = asyncio.ensure_future(asyncio.wait(tasks))
+                    await asyncio.wait(
+                        {devices_done, stopper},
+                        timeout=self.duration,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    devices_done.cancel()
+            finally:
+                helpers = [stopper] + ([reporter] if reporter else [])
+                for task in tasks + helpers:
+                    task.cancel()
+                await asyncio.gather(*tasks, *helpers, return_exceptions=True)
+
+        return self.stats
+
+    async def _report(
+        self, on_progress: Callable[[FleetStats], None], report_interval: float
+    ) -> None:
+        while True:
+            await asyncio.sleep(report_interval)
+            on_progress(self.stats)
+
+    async def _run_device(
+        self,
+        device: DeviceConfig,
+        http: httpx.AsyncClient,
+        compressor: Optional[BodyCompressor],
+    ) -> None:
+        sent = 0
+        attempts = 0
+        consecutive_errors = 0
+        resume_at = 0.0
+        batched = {"consecutive_errors": 0, "resume_at": 0.0}
+        limiter = self._limiter
+        self.stats.active += 1
+
+        try:
+            async with WeatherIoTClient(
+                device,
+                http_client=http,
+                encoding=self.encoding,
+                encoding_stats=self.stats.encoding,
+                compressor=compressor,
+                api=self.api,
+                batch_size=self.batch_size,
+                linger=self.linger,
+                batch_stats=self.stats.batching,
+            ) as client:
+                start = time.monotonic()
+                if self.stagger:
+                    start += random.uniform(0, self.interval)
+                    await self.scheduler.sleep_until(start)
+
+                while self.max_messages is None or sent < self.max_messages:
+                    data = self.generator.generate(device)
+                    attempts += 1
+                    if limiter is not None:
+                        await limiter.acquire()
+
+                    if self.batch_size > 1:
+                        try:
+                            future = client.submit_telemetry(data)
+                        except Exception as e:
+                            self.stats.errors += 1
+                            _log_send_error(device, e)
+                            batched["consecutive_errors"] += 1
+                            if limiter is not None:
+                                limiter.release()
+                        else:
+                            future.add_done_callback(
+                                functools.partial(
+                                    self._settle_batched,
+                                    device,
+                                    time.monotonic(),
+                                    batched,
+                                )
+                            )
+                            sent += 1
+                        consecutive_errors = batched["consecutive_errors"]
+                        resume_at = batched["resume_at"]
+                    else:
+                        started = time.monotonic()
+                        try:
+                            await client.send_telemetry(data)
+                            self.stats.latency.record(time.monotonic() - started)
+                            sent += 1
+                            self.stats.sent += 1
+                            consecutive_errors = 0
+                            if limiter is not None:
+                                limiter.on_response(started)
+                        # Not just httpx errors: one bad send must not end the
+                        # device's task, only MAX_CONSECUTIVE_ERRORS of them.
+                        except Exception as e:
+                            self.stats.errors += 1
+                            _log_send_error(device, e)
+                            if is_throttled(e):
+                                resume_at = time.monotonic() + (retry_after(e) or 0.0)
+                            else:
+                                consecutive_errors += 1
+                            if limiter is not None:
+                                limiter.on_response(started, e)
+                        finally:
+                            if limiter is not None:
+                                limiter.release()
+
+                    if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                        logger.error(
+                            f"{device.name}: stopping after "
+                            f"{MAX_CONSECUTIVE_ERRORS} consecutive errors"
+                        )
+                        break
+
+                    if self.max_messages is not None and sent >= self.max_messages:
+                        break
+
+                    target = start + attempts * self.interval
+                    target += random.uniform(-self.jitter, self.jitter)
+                    await self.scheduler.sleep_until(max(target, resume_at))
+        finally:
+            self.stats.active -= 1
+
+    def _settle_batched(
+        self,
+        device: DeviceConfig,
+        started: float,
+        state: Dict[str, Any],
+        future: asyncio.Future,
+    ) -> None:
+        limiter = self._limiter
+        if future.cancelled():
+            if limiter is not None:
+                limiter.release()
+            return
+        error = future.exception()
+        if error is None:
+            self.stats.latency.record(time.monotonic() - started)
+            self.stats.sent += 1
+            state["consecutive_errors"] = 0
+        else:
+            self.stats.errors += 1
+            if is_throttled(error):
+                state["resume_at"] = time.monotonic() + (retry_after(error) or 0.0)
+            else:
+                state["consecutive_errors"] += 1
+            _log_send_error(device, error)
+        if limiter is not None:
+            limiter.on_response(started, error)
+            limiter.release()
+
+
+def _log_send_error(device: DeviceConfig, error: BaseException) -> None:
+    if isinstance(error, httpx.HTTPStatusError):
+        logger.warning(f"{device.name}: HTTP {error.response.status_code}")
+    else:
+        logger.warning(f"{device.name}: {error!r}")
@@ -0,0 +1,123 @@
+import math
+from typing import Any, Dict, Iterable, Optional
+
+# Log-linear bucketing in the style of HdrHistogram: values below
+# 2**SUB_BUCKET_BITS microseconds get exact buckets, larger values are
+# bucketed by power of two with 2**(SUB_BUCKET_BITS - 1) linear sub-buckets
+# each, which bounds the relative error to under 1%.
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+# Values are clamped to about 12.7 days, which caps the bucket count at ~4.4k.
+MAX_TRACKABLE_US = (1 << 40) - 1
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    top = index - (shift << (SUB_BUCKET_BITS - 1))
+    return ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Constant-memory, mergeable latency histogram with microsecond resolution."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value = min(max(int(seconds * 1_000_000), 0), MAX_TRACKABLE_US)
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (
+            self.min_us is None or other.min_us < self.min_us
+        ):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        result = cls()
+        for hist in histograms:
+            result.merge(hist)
+        return result
+
+    def percentile(self, p: float) -> float:
+        """Value in seconds at or below which `p` percent of samples fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(_bucket_upper(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        return self.total_us / self.count / 1_000_000 if self.count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentile summary in milliseconds."""
+        data: Dict[str, Any] = {
+            "count": self.count,
+            "min_ms": round((self.min_us or 0) / 1000, 3),
+            "mean_ms": round(self.mean * 1000, 3),
+        }
+        for p in PERCENTILES:
+            data[f"p{p:g}_ms".replace(".", "_")] = round(self.percentile(p) * 1000, 3)
+        data["max_ms"] = round(self.max_us / 1000, 3)
+        return data
+
+    def format_summary(self) -> str:
+        if not self.count:
+            return "Latency: n/a"
+        parts = [f"p{p:g} {self.percentile(p) * 1000:.1f}" for p in PERCENTILES]
+        return f"Latency (ms): {' | '.join(parts)} | max {self.max_us / 1000:.1f}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form that `from_dict` can restore for merging."""
+        return {
+            **self.summary(),
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "buckets": {str(k): v for k, v in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls()
+        hist.counts = {int(k): v for k, v in data.get("buckets", {}).items()}
+        hist.count = sum(hist.counts.values())
+        hist.total_us = data.get("total_us", 0)
+        hist.min_us = data.get("min_us")
+        hist.max_us = data.get("max_us", 0)
+        return hist
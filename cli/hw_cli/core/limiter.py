@@ -0,0 +1,260 @@
+import asyncio
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from hw_cli.core.constants import DEFAULT_TARGET_LATENCY_SEC
+
+THROTTLE_STATUS = {429, 503}
+DEFAULT_INITIAL_LIMIT = 10
+BACKOFF_RATIO = 0.5
+# A misbehaving gateway should not be able to park a run indefinitely.
+MAX_RETRY_AFTER_SEC = 60.0
+# The limit timeline keeps at most one point per this many seconds.
+TIMELINE_RESOLUTION_SEC = 1.0
+
+
+def is_throttled(error: Optional[BaseException]) -> bool:
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code in THROTTLE_STATUS
+    )
+
+
+def is_congested(error: Optional[BaseException]) -> bool:
+    """Whether a failed request suggests the backend is overloaded.
+
+    Throttling responses say so outright; timeouts and dropped or refused
+    connections are what an overloaded backend looks like from the client.
+    """
+    return is_throttled(error) or isinstance(error, httpx.TransportError)
+
+
+def retry_after(error: Optional[BaseException]) -> Optional[float]:
+    """Seconds requested by a throttling response's `Retry-After`, if any."""
+    if not is_throttled(error):
+        return None
+    value = error.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SEC)
+
+
+class LimiterStats:
+    """Concurrency limit over time and the signals that moved it."""
+
+    def __init__(self):
+        self.limit = 0
+        self.low: Optional[int] = None
+        self.high = 0
+        self.decreases = 0
+        self.throttled = 0
+        self.pauses = 0
+        self.paused_seconds = 0.0
+        # (seconds since start, limit) at each change, coalesced per resolution.
+        self.timeline: List[List[float]] = []
+        self.start_time = time.monotonic()
+
+    def record_limit(self, limit: int) -> None:
+        if limit == self.limit and self.timeline:
+            return
+        self.limit = limit
+        self.low = limit if self.low is None else min(self.low, limit)
+        self.high = max(self.high, limit)
+
+        t = round(time.monotonic() - self.start_time, 3)
+        timeline = self.timeline
+        if len(timeline) > 1 and t - timeline[-1][0] < TIMELINE_RESOLUTION_SEC:
+            timeline[-1][1] = limit
+        else:
+            timeline.append([t, limit])
+
+    def limit_at(self, t: float) -> int:
+        limit = self.timeline[0][1] if self.timeline else 0
+        for at, value in self.timeline:
+            if at > t:
+                break
+            limit = value
+        return int(limit)
+
+    def merge(self, other: "LimiterStats") -> None:
+        """Add another limiter's counters; the timelines are summed."""
+        if other.timeline:
+            times = sorted({at for at, _ in self.timeline + other.timeline})
+            self.timeline = [
+                [at, self.limit_at(at) + other.limit_at(at)] for at in times
+            ]
+            self.limit += other.limit
+            limits = [int(limit) for _, limit in self.timeline]
+            self.low, self.high = min(limits), max(limits)
+        self.decreases += other.decreases
+        self.throttled += other.throttled
+        self.pauses += other.pauses
+        self.paused_seconds += other.paused_seconds
+
+    def format_summary(self) -> str:
+        if not self.timeline:
+            return "Concurrency: n/a"
+        return (
+            f"Concurrency: limit {self.limit} (range {self.low}-{self.high}) | "
+            f"{self.decreases} decreases | {self.throttled} throttled | "
+            f"{self.pauses} Retry-After pauses ({self.paused_seconds:.1f}s)"
+        )
+
+    def format_timeline(self, points: int = 12) -> str:
+        """The limit sampled at evenly spaced times across the run."""
+        if not self.timeline:
+            return "Limit over time: n/a"
+        end = self.timeline[-1][0]
+        times = [end * i / (points - 1) for i in range(points)] if end else [0.0]
+        samples = [f"{t:.0f}s={self.limit_at(t)}" for t in times]
+        return f"Limit over time: {' '.join(samples)}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "low": self.low,
+            "high": self.high,
+            "decreases": self.decreases,
+            "throttled": self.throttled,
+            "pauses": self.pauses,
+            "paused_seconds": round(self.paused_seconds, 3),
+            "timeline": self.timeline,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LimiterStats":
+        stats = cls()
+        stats.limit = data.get("limit", 0)
+        stats.low = data.get("low")
+        stats.high = data.get("high", 0)
+        stats.decreases = data.get("decreases", 0)
+        stats.throttled = data.get("throttled", 0)
+        stats.pauses = data.get("pauses", 0)
+        stats.paused_seconds = data.get("paused_seconds", 0.0)
+        stats.timeline = [list(point) for point in data.get("timeline", [])]
+        return stats
+
+
+class AdaptiveLimiter:
+    """AIMD cap on requests in flight, used in place of a fixed semaphore.
+
+    Each success that came back within `target_latency` while the limit was
+    at least half used raises the limit by `1 / limit`, so about one per
+    round trip. A throttling response (429/503), a timeout or transport error,
+    or a slower success cuts it by `BACKOFF_RATIO`, at most once per round
+    trip: only requests issued after the previous cut can cut again. `Retry-After` holds back every new
+    request until it has passed.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        target_latency: float = DEFAULT_TARGET_LATENCY_SEC,
+        stats: Optional[LimiterStats] = None,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.target_latency = target_latency
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.in_flight = 0
+        self.stats = stats if stats is not None else LimiterStats()
+        self.stats.record_limit(int(self.limit))
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < int(self.limit):
+                break
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def on_response(
+        self, started: float, error: Optional[BaseException] = None
+    ) -> None:
+        """Adjust the limit for a request sent at monotonic time `started`."""
+        now = time.monotonic()
+        throttled = is_throttled(error)
+        if throttled:
+            self.stats.throttled += 1
+            wait = retry_after(error)
+            if wait:
+                until = now + wait
+                if until > self._paused_until:
+                    if self._paused_until <= now:
+                        self.stats.pauses += 1
+                    self.stats.paused_seconds += until - max(now, self._paused_until)
+                    self._paused_until = until
+        elif error is not None and not is_congested(error):
+            # Other failures say nothing about how loaded the backend is.
+            return
+
+        if error is not None or now - started > self.target_latency:
+            if started >= self._last_decrease:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * BACKOFF_RATIO)
+                self.stats.decreases += 1
+        elif self.in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self.stats.record_limit(int(self.limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        woken = 0
+        for waiter in self._waiters:
+            if woken >= free:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                woken += 1
+
+
+def limiter_for(
+    adaptive: bool,
+    max_limit: int,
+    target_latency: float,
+    stats: LimiterStats,
+) -> Optional[AdaptiveLimiter]:
+    """An `AdaptiveLimiter` capped at `max_limit`, or None for a fixed cap."""
+    if not adaptive:
+        return None
+    return AdaptiveLimiter(
+        initial=min(DEFAULT_INITIAL_LIMIT, max_limit),
+        max_limit=max_limit,
+        target_latency=target_latency,
+        stats=stats,
+    )
+
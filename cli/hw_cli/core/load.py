@@ -0,0 +1,269 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import httpx
+
+from hw_cli.core.api.batching import BatchStats
+from hw_cli.core.api.client import WeatherIoTClient
+from hw_cli.core.api.compression import (
+    DEFAULT_THRESHOLD_BYTES,
+    BodyCompressor,
+    CompressionStats,
+)
+from hw_cli.core.api.encoding import EncodingStats
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.data_generator import DataGenerator
+from hw_cli.core.histogram import LatencyHistogram
+from hw_cli.core.limiter import (
+    DEFAULT_TARGET_LATENCY_SEC,
+    AdaptiveLimiter,
+    LimiterStats,
+    limiter_for,
+)
+from hw_cli.core.models import DeviceConfig, TelemetryData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadStats:
+    """Counters for an open-loop load run.
+
+    Latency is measured from each request's intended send time on the arrival
+    schedule, not from when it was actually issued, so queueing caused by a
+    slow backend (or by the in-flight cap) shows up in the numbers.
+    """
+
+    offered_rate: float
+    issued: int = 0
+    sent: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    encoding: EncodingStats = field(default_factory=EncodingStats)
+    compression: CompressionStats = field(default_factory=CompressionStats)
+    batching: BatchStats = field(default_factory=BatchStats)
+    concurrency: LimiterStats = field(default_factory=LimiterStats)
+    start_time: float = field(default_factory=time.monotonic)
+    end_time: Optional[float] = None
+
+    @property
+    def completed(self) -> int:
+        return self.sent + self.errors
+
+    @property
+    def elapsed(self) -> float:
+        end = self.end_time if self.end_time is not None else time.monotonic()
+        return end - self.start_time
+
+    @property
+    def issued_rate(self) -> float:
+        elapsed = self.elapsed
+        return self.issued / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def achieved_rate(self) -> float:
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        if ok:
+            self.sent += 1
+        else:
+            self.errors += 1
+        self.latency.record(latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "offered_rate": self.offered_rate,
+            "issued_rate": round(self.issued_rate, 3),
+            "achieved_rate": round(self.achieved_rate, 3),
+            "issued": self.issued,
+            "sent": self.sent,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "elapsed": round(self.elapsed, 3),
+            "latency": self.latency.to_dict(),
+            "encoding": self.encoding.to_dict(),
+            "compression": self.compression.to_dict(),
+            "batching": self.batching.to_dict(),
+            "concurrency": self.concurrency.to_dict(),
+        }
+
+
+class OpenLoopLoadRunner:
+    """Issues telemetry on a fixed arrival schedule regardless of responses.
+
+    Request `i` is due at `start + i / rate`. Devices are used round-robin.
+    When `max_in_flight` requests are outstanding the issuer waits for a slot,
+    but later requests keep their original due time, so the backlog is charged
+    to latency instead of silently lowering the offered load.
+
+    With `adaptive` set the cap is an `AdaptiveLimiter` that starts low and
+    settles between 1 and `max_in_flight` on throttling and latency feedback.
+    """
+
+    def __init__(
+        self,
+        devices: List[DeviceConfig],
+        rate: float,
+        duration: float,
+        max_in_flight: int = 1000,
+        seed: Optional[int] = None,
+        encoding: str = "json",
+        api: Optional[ApiDefaults] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_THRESHOLD_BYTES,
+        batch_size: int = 1,
+        linger: float = 0.0,
+        adaptive: bool = False,
+        target_latency: float = DEFAULT_TARGET_LATENCY_SEC,
+    ):
+        self.devices = devices
+        self.rate = rate
+        self.duration = duration
+        self.max_in_flight = max_in_flight
+        self.encoding = encoding
+        self.api = api
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.batch_size = batch_size
+        self.linger = linger
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.generator = DataGenerator(seed=seed)
+        self.stats = LoadStats(offered_rate=rate)
+        self._limiter: Optional[AdaptiveLimiter] = None
+
+    async def run(
+        self,
+        on_progress: Optional[Callable[[LoadStats], None]] = None,
+        report_interval: float = 10.0,
+    ) -> LoadStats:
+        self.stats = LoadStats(offered_rate=self.rate)
+        stats = self.stats
+        compressor = (
+            BodyCompressor(
+                self.compression,
+                self.compression_threshold,
+                stats=stats.compression,
+            )
+            if self.compression
+            else None
+        )
+
+        async with create_http_client(
+            self.api, max_connections=self.max_in_flight
+        ) as http, AsyncExitStack() as stack:
+            clients = [
+                await stack.enter_async_context(
+                    WeatherIoTClient(
+                        d,
+                        http_client=http,
+                        encoding=self.encoding,
+                        encoding_stats=stats.encoding,
+                        compressor=compressor,
+                        api=self.api,
+                        batch_size=self.batch_size,
+                        linger=self.linger,
+                        batch_stats=stats.batching,
+                    )
+                )
+                for d in self.devices
+            ]
+            self._limiter = limiter_for(
+                self.adaptive,
+                self.max_in_flight,
+                self.target_latency,
+                stats.concurrency,
+            )
+            slots = self._limiter or asyncio.Semaphore(self.max_in_flight)
+            pending = set()
+            reporter = (
+                asyncio.create_task(self._report(on_progress, report_interval))
+                if on_progress
+                else None
+            )
+
+            stats.start_time = time.monotonic()
+            total = int(self.rate * self.duration)
+            period = 1.0 / self.rate
+
+            try:
+                for i, client in zip(range(total), itertools.cycle(clients)):
+                    intended = stats.start_time + i * period
+                    delay = intended - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                    await slots.acquire()
+                    stats.issued += 1
+                    stats.in_flight += 1
+                    stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+
+                    data = self.generator.generate(client.device)
+                    task = asyncio.create_task(self._send(client, data, intended, slots))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+                if pending:
+                    await asyncio.wait(pending)
+            finally:
+                stats.end_time = time.monotonic()
+                pending = list(pending)
+                for task in pending:
+                    task.cancel()
+                if reporter:
+                    reporter.cancel()
+                await asyncio.gather(
+                    *pending, *([reporter] if reporter else []), return_exceptions=True
+                )
+
+        return self.stats
+
+    async def _report(
+        self, on_progress: Callable[[LoadStats], None], report_interval: float
+    ) -> None:
+        while True:
+            await asyncio.sleep(report_interval)
+            on_progress(self.stats)
+
+    async def _send(
+        self,
+        client: WeatherIoTClient,
+        data: TelemetryData,
+        intended: float,
+        slots: Union[asyncio.Semaphore, AdaptiveLimiter],
+    ) -> None:
+        ok = False
+        limiter = self._limiter
+        started = time.monotonic()
+        try:
+            await client.send_telemetry(data)
+            ok = True
+            if limiter is not None:
+                limiter.on_response(started)
+        except httpx.HTTPStatusError as e:
+            logger.warning(f"{client.device.name}: HTTP {e.response.status_code}")
+            if limiter is not None:
+                limiter.on_response(started, e)
+        except httpx.HTTPError as e:
+            logger.warning(f"{client.device.name}: {e!r}")
+            if limiter is not None:
+                limiter.on_response(started, e)
+        # Anything else still counts as a failed request in the results.
+        except Exception as e:
+            logger.warning(f"{client.device.name}: {e!r}")
+        finally:
+            self.stats.in_flight -= 1
+            slots.release()
+
+        self.stats.record(time.monotonic() - intended, ok)
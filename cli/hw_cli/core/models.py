@@ -1,7 +1,11 @@
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+# Telemetry models are created once per message; use slots where supported.
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class DeviceConfig:
@@ -16,7 +20,8 @@ class DeviceConfig:
 
     @property
     def is_registered(self) -> bool:
-        return self.hmac_secret is not None
+        # Same test as the indexed `registered` column in storage.
+        return bool(self.hmac_secret)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -45,15 +50,32 @@ class DeviceConfig:
         )
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RainfallHistogram:
     data: Dict[str, int]
     bucket_seconds: int
     start_timestamp: int
     num_buckets: int
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "data": dict(self.data),
+            "bucket_seconds": self.bucket_seconds,
+            "start_timestamp": self.start_timestamp,
+            "num_buckets": self.num_buckets,
+        }
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RainfallHistogram":
+        return cls(
+            data=dict(data["data"]),
+            bucket_seconds=data["bucket_seconds"],
+            start_timestamp=data["start_timestamp"],
+            num_buckets=data["num_buckets"],
+        )
+
+
+@dataclass(**_SLOTS)
 class WeatherReading:
     temperature: Optional[float] = None
     pressure: Optional[float] = None
@@ -61,8 +83,38 @@ class WeatherReading:
     precipitation_mm: Optional[float] = None
     rain: Optional[RainfallHistogram] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "temperature": self.temperature,
+            "pressure": self.pressure,
+            "humidity": self.humidity,
+            "precipitation_mm": self.precipitation_mm,
+            "rain": self.rain.to_dict() if self.rain else None,
+        }
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WeatherReading":
+        rain = data.get("rain")
+        return cls(
+            temperature=data.get("temperature"),
+            pressure=data.get("pressure"),
+            humidity=data.get("humidity"),
+            precipitation_mm=data.get("precipitation_mm"),
+            rain=RainfallHistogram.from_dict(rain) if rain else None,
+        )
+
+
+@dataclass(**_SLOTS)
 class TelemetryData:
     timestamp: int
-    reading: WeatherReading
\ No newline at end of file
+    reading: WeatherReading
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"timestamp": self.timestamp, "reading": self.reading.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TelemetryData":
+        return cls(
+            timestamp=data["timestamp"],
+            reading=WeatherReading.from_dict(data["reading"]),
+        )
\ No newline at end of file
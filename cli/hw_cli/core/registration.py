@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from hw_cli.core.api.client import WeatherIoTClient
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.histogram import LatencyHistogram
+from hw_cli.core.models import DeviceConfig
+
+logger = logging.getLogger(__name__)
+
+# Registered devices are saved in batches of this size.
+SAVE_BATCH_SIZE = 200
+
+
+@dataclass
+class RegistrationStats:
+    total: int = 0
+    registered: int = 0
+    # device_id -> error
+    failed: Dict[str, str] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    start_time: float = field(default_factory=time.monotonic)
+    end_time: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.end_time if self.end_time is not None else time.monotonic()
+        return end - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.registered / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "registered": self.registered,
+            "failed": self.failed,
+            "elapsed": round(self.elapsed, 3),
+            "throughput": round(self.throughput, 3),
+            "latency": self.latency.to_dict(),
+        }
+
+
+async def register_devices(
+    devices: List[DeviceConfig],
+    concurrency: int = 20,
+    claim_codes: bool = False,
+    api: Optional[ApiDefaults] = None,
+    on_registered: Optional[Callable[[DeviceConfig, Optional[str]], None]] = None,
+    mgr: Optional[DeviceManager] = None,
+) -> RegistrationStats:
+    """Register `devices` over one connection pool.
+
+    At most `concurrency` devices are in flight at once. HMAC secrets are saved
+    in batched transactions, including when the run is interrupted. With
+    `claim_codes` set, a claim code is requested for each registered device.
+    `on_registered` is called with the device and its claim code, or None.
+    """
+    mgr = mgr or DeviceManager()
+    stats = RegistrationStats(total=len(devices))
+    slots = asyncio.Semaphore(concurrency)
+    unsaved: List[DeviceConfig] = []
+
+    def save() -> None:
+        if unsaved:
+            mgr.update_devices(unsaved)
+            unsaved.clear()
+
+    async def register(http: httpx.AsyncClient, device: DeviceConfig) -> None:
+        async with slots:
+            started = time.perf_counter()
+            stage = "register"
+            code = None
+            try:
+                async with WeatherIoTClient(
+                    device, http_client=http, api=api
+                ) as client:
+                    device.hmac_secret = await client.register()
+                    stats.registered += 1
+                    stats.latency.record(time.perf_counter() - started)
+                    unsaved.append(device)
+                    if len(unsaved) >= SAVE_BATCH_SIZE:
+                        save()
+
+                    if claim_codes:
+                        stage = "claim code"
+                        client.update_device(device)
+                        code = await client.get_claim_code()
+            except httpx.HTTPStatusError as e:
+                stats.failed[device.device_id] = (
+                    f"{stage}: HTTP {e.response.status_code}"
+                )
+                return
+            except (httpx.HTTPError, KeyError) as e:
+                stats.failed[device.device_id] = f"{stage}: {e!r}"
+                return
+
+        if on_registered:
+            on_registered(device, code)
+
+    stats.start_time = time.monotonic()
+    async with create_http_client(api, max_connections=concurrency) as http:
+        try:
+            await asyncio.gather(*(register(http, d) for d in devices))
+        finally:
+            save()
+            stats.end_time = time.monotonic()
+
+    return stats
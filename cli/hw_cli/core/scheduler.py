@@ -0,0 +1,74 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import List, Optional, Tuple
+
+DEFAULT_RESOLUTION_SEC = 0.005
+
+
+class Scheduler:
+    """Shared deadline scheduler for many simulated devices.
+
+    Every waiting device is a single heap entry keyed by its next deadline on
+    the monotonic clock. Only one loop timer is armed, for the earliest
+    deadline; when it fires, every entry due within `resolution` seconds is
+    released in one batch. Idle devices cost no wakeups at all, so idle CPU
+    stays flat however many devices are scheduled.
+    """
+
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION_SEC):
+        self.resolution = resolution
+        self.wakeups = 0
+        self.dispatched = 0
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def sleep_until(self, deadline: float) -> None:
+        """Suspend the caller until `deadline` (a `time.monotonic()` value)."""
+        if deadline - time.monotonic() <= self.resolution:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (deadline, next(self._counter), future))
+        self._arm()
+        await future
+
+    async def sleep(self, delay: float) -> None:
+        await self.sleep_until(time.monotonic() + delay)
+
+    def _arm(self) -> None:
+        while self._heap and self._heap[0][2].done():
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+
+        earliest = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_deadline is not None and self._timer_deadline <= earliest:
+                return
+            self._timer.cancel()
+
+        delay = max(0.0, earliest - time.monotonic())
+        self._timer = asyncio.get_running_loop().call_later(delay, self._fire)
+        self._timer_deadline = earliest
+
+    def _fire(self) -> None:
+        self._timer = None
+        self._timer_deadline = None
+        self.wakeups += 1
+
+        horizon = time.monotonic() + self.resolution
+        while self._heap and self._heap[0][0] <= horizon:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                future.set_result(None)
+                self.dispatched += 1
+
+        self._arm()
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
+
+from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.fleet import FleetRunner, FleetStats
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.storage import configure_data, data_settings
+from hw_cli.core.token_cache import get_token_cache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STOP_POLL_SECONDS = 0.2
+
+
+def shard(items: List[T], workers: int) -> List[List[T]]:
+    """Split items round-robin into at most `workers` disjoint, non-empty shards."""
+    shards = [items[i::workers] for i in range(workers)]
+    return [s for s in shards if s]
+
+
+def _worker_main(
+    index: int,
+    device_ids: List[str],
+    options: Dict[str, Any],
+    report_interval: float,
+    results: Any,
+    stop_event: Any,
+    log_level: int,
+    db_settings: Dict[str, Any],
+) -> None:
+    # The parent owns Ctrl-C and forwards it through stop_event so that every
+    # worker gets a chance to cancel its tasks and report final counters.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s %(levelname)-8s [worker-{index}] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    configure_data(**db_settings)
+
+    mgr = DeviceManager()
+    devices = [d for d in map(mgr.get_device_by_id, device_ids) if d]
+    runner = FleetRunner(devices, **options)
+
+    async def watch_stop() -> None:
+        while not stop_event.is_set():
+            await asyncio.sleep(STOP_POLL_SECONDS)
+        runner.stop()
+
+    async def run() -> None:
+        watcher = asyncio.create_task(watch_stop())
+        try:
+            await runner.run(
+                lambda stats: results.put((index, stats.to_dict(), False)),
+                report_interval,
+            )
+        finally:
+            watcher.cancel()
+
+    try:
+        asyncio.run(run())
+    finally:
+        # Workers leave through os._exit, which skips the atexit flush.
+        get_token_cache().flush()
+        results.put((index, runner.stats.to_dict(), True))
+
+
+class ShardedFleetRunner:
+    """Runs a fleet split across several processes, one event loop each.
+
+    Devices are partitioned into disjoint shards so no device is driven by more
+    than one worker. Workers stream `FleetStats` snapshots back to the parent,
+    which merges them into a single report.
+    """
+
+    def __init__(
+        self,
+        devices: List[DeviceConfig],
+        workers: int,
+        report_interval: float = 10.0,
+        **options: Any,
+    ):
+        self.shards = shard([d.device_id for d in devices], workers)
+        self.report_interval = report_interval
+        self.options = options
+        self.stats = FleetStats()
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._finished: Set[int] = set()
+
+    def run(
+        self, on_progress: Optional[Callable[[FleetStats], None]] = None
+    ) -> FleetStats:
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        stop_event = ctx.Event()
+        self._snapshots = {}
+        self._finished = set()
+
+        procs = []
+        for index, device_ids in enumerate(self.shards):
+            proc = ctx.Process(
+                target=_worker_main,
+                args=(
+                    index,
+                    device_ids,
+                    self.options,
+                    self.report_interval,
+                    results,
+                    stop_event,
+                    logging.getLogger().level,
+                    data_settings(),
+                ),
+                name=f"hw-fleet-{index}",
+            )
+            proc.start()
+            procs.append(proc)
+
+        try:
+            try:
+                self._collect(procs, results, on_progress)
+            except KeyboardInterrupt:
+                logger.info("Interrupted, draining workers")
+                stop_event.set()
+                self._collect(procs, results, None)
+        finally:
+            stop_event.set()
+            for proc in procs:
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()
+                    proc.join()
+
+        self.stats = FleetStats.merged(self._snapshots.values())
+        return self.stats
+
+    def _collect(
+        self,
+        procs: List[Any],
+        results: Any,
+        on_progress: Optional[Callable[[FleetStats], None]],
+    ) -> None:
+        finished = self._finished
+        next_report = time.monotonic() + self.report_interval
+
+        while len(finished) < len(procs):
+            try:
+                index, snapshot, final = results.get(timeout=STOP_POLL_SECONDS)
+                self._snapshots[index] = snapshot
+                if final:
+                    finished.add(index)
+            except queue.Empty:
+                # A worker that exits cleanly always sends a final snapshot;
+                # only crashed workers need to be reaped here.
+                for index, proc in enumerate(procs):
+                    if index in finished or proc.is_alive():
+                        continue
+                    if proc.exitcode:
+                        logger.error(f"Worker {index} exited with {proc.exitcode}")
+                        finished.add(index)
+
+            if on_progress and self._snapshots and time.monotonic() >= next_report:
+                on_progress(FleetStats.merged(self._snapshots.values()))
+                next_report = time.monotonic() + self.report_interval
@@ -3,13 +3,92 @@ import logging
 import os
 import sqlite3
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 DB_FILENAME = "hw.db"
 
+# Connection tuning; overridable through the `storage` config section.
+DEFAULT_BUSY_TIMEOUT_SEC = 30.0
+DEFAULT_SYNCHRONOUS = "NORMAL"
+DEFAULT_MMAP_SIZE_MB = 64
+DEFAULT_CACHE_SIZE_MB = 16
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def _is_registered(data: Dict[str, Any]) -> int:
+    # Must agree with DeviceConfig.is_registered.
+    return int(bool(data.get("hmac_secret")))
+
+
+def _index_device_columns(conn: sqlite3.Connection) -> None:
+    """Promote the device name and registration state to indexed columns."""
+    conn.execute("ALTER TABLE devices ADD COLUMN name TEXT")
+    conn.execute(
+        "ALTER TABLE devices ADD COLUMN registered INTEGER NOT NULL DEFAULT 0"
+    )
+
+    taken = set()
+    rows = []
+    for device_id, raw in conn.execute("SELECT device_id, data FROM devices"):
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.error(f"Corrupted JSON for device {device_id}")
+            continue
+        # Names were only kept unique by convention; suffix any clashes.
+        base = name = data.get("name") or device_id
+        counter = 0
+        while name in taken:
+            counter += 1
+            name = f"{base}-{counter}"
+        taken.add(name)
+        data["name"] = name
+        rows.append((name, _is_registered(data), json.dumps(data), device_id))
+
+    conn.executemany(
+        "UPDATE devices SET name = ?, registered = ?, data = ? WHERE device_id = ?",
+        rows,
+    )
+    conn.execute("CREATE UNIQUE INDEX idx_devices_name ON devices (name)")
+    conn.execute("CREATE INDEX idx_devices_registered ON devices (registered)")
+
+
+def _count_device_changes(conn: sqlite3.Connection) -> None:
+    """Keep a counter that any write to `devices` bumps, from any process."""
+    conn.execute(
+        "CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+    )
+    conn.execute("INSERT INTO counters (name, value) VALUES ('devices', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER devices_{event.lower()}_count AFTER {event} ON devices
+            BEGIN
+                UPDATE counters SET value = value + 1 WHERE name = 'devices';
+            END
+        """)
+
+
+def _count_token_changes(conn: sqlite3.Connection) -> None:
+    """Keep a counter that any write to `tokens` bumps, from any process."""
+    conn.execute("INSERT INTO counters (name, value) VALUES ('tokens', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER tokens_{event.lower()}_count AFTER {event} ON tokens
+            BEGIN
+                UPDATE counters SET value = value + 1 WHERE name = 'tokens';
+            END
+        """)
+
+
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have run; append new steps, never edit or reorder existing ones.
+MIGRATIONS = [_index_device_columns, _count_device_changes, _count_token_changes]
+SCHEMA_VERSION = len(MIGRATIONS)
+
 
 def get_app_dir() -> Path:
     """Get the application data directory."""
@@ -24,14 +103,69 @@ class Database:
     SQLite database wrapper for application data
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT_SEC,
+        synchronous: str = DEFAULT_SYNCHRONOUS,
+        mmap_size_mb: int = DEFAULT_MMAP_SIZE_MB,
+        cache_size_mb: int = DEFAULT_CACHE_SIZE_MB,
+    ):
         self.app_dir = get_app_dir()
         self.app_dir.mkdir(parents=True, exist_ok=True)
         self.db_path = self.app_dir / DB_FILENAME
-        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Implicit transactions take the write lock up front, so a writer waits
+        # out `busy_timeout` instead of failing when another process commits
+        # between its first read and first write.
+        self._conn = sqlite3.connect(
+            self.db_path,
+            timeout=busy_timeout,
+            isolation_level="IMMEDIATE",
+            check_same_thread=False,
+        )
         self._conn.row_factory = sqlite3.Row
+        self._batch_depth = 0
+        self._configure(synchronous, mmap_size_mb, cache_size_mb)
         self._init_schema()
 
+    def _configure(self, synchronous: str, mmap_size_mb: int, cache_size_mb: int):
+        """Set per-connection pragmas for many concurrent processes."""
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(
+                f"Invalid synchronous mode '{synchronous}', "
+                f"expected one of {', '.join(SYNCHRONOUS_MODES)}"
+            )
+
+        # WAL lets readers proceed while one process writes, and with
+        # synchronous=NORMAL commits no longer fsync (only checkpoints do).
+        mode = self._conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if mode.lower() != "wal":
+            logger.warning(f"WAL not available, using journal_mode={mode}")
+        self._conn.execute(f"PRAGMA synchronous = {synchronous}")
+        self._conn.execute(f"PRAGMA mmap_size = {int(mmap_size_mb) * 1024 * 1024}")
+        # A negative cache_size is in KiB rather than pages.
+        self._conn.execute(f"PRAGMA cache_size = {-int(cache_size_mb) * 1024}")
+        self._conn.execute("PRAGMA temp_store = MEMORY")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group reads and writes into one write transaction.
+
+        Every write method runs inside this, so nested batches join the
+        outermost one, which commits once (or rolls back) when it exits.
+        """
+        self._batch_depth += 1
+        try:
+            if self._batch_depth > 1:
+                yield
+            else:
+                with self._conn:
+                    # Lock before any read, so read-modify-write is atomic.
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    yield
+        finally:
+            self._batch_depth -= 1
+
     def _init_schema(self):
         """Initialize SQL tables."""
         with self._conn:
@@ -59,6 +193,40 @@ class Database:
                 )
             """)
 
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_progress (
+                    job_id TEXT NOT NULL,
+                    device_id TEXT NOT NULL,
+                    next_timestamp INTEGER NOT NULL,
+                    PRIMARY KEY (job_id, device_id)
+                )
+            """)
+
+        self._migrate()
+
+    def _migrate(self):
+        """Bring the schema up to SCHEMA_VERSION, one transaction per step."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            logger.warning(
+                f"Database schema version {version} is newer than this CLI "
+                f"supports ({SCHEMA_VERSION})"
+            )
+            return
+
+        while version < SCHEMA_VERSION:
+            with self._conn:
+                # sqlite3 does not open a transaction for DDL by itself.
+                self._conn.execute("BEGIN IMMEDIATE")
+                # Another process may have migrated while we waited for the lock.
+                version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+                if version >= SCHEMA_VERSION:
+                    break
+                MIGRATIONS[version](self._conn)
+                version += 1
+                self._conn.execute(f"PRAGMA user_version = {version}")
+            logger.info(f"Migrated database schema to version {version}")
+
     def close(self):
         self._conn.close()
 
@@ -68,14 +236,14 @@ class Database:
         return row["value"] if row else None
 
     def set_setting(self, key: str, value: str) -> None:
-        with self._conn:
+        with self.batch():
             self._conn.execute(
                 "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
                 (key, value),
             )
 
     def delete_setting(self, key: str) -> None:
-        with self._conn:
+        with self.batch():
             self._conn.execute("DELETE FROM settings WHERE key = ?", (key,))
 
     def get_device(self, device_id: str) -> Optional[Dict[str, Any]]:
@@ -91,8 +259,15 @@ class Database:
                 return None
         return None
 
-    def get_all_devices(self) -> List[Dict[str, Any]]:
-        cur = self._conn.execute("SELECT data FROM devices")
+    def get_all_devices(
+        self, registered: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        if registered is None:
+            cur = self._conn.execute("SELECT data FROM devices")
+        else:
+            cur = self._conn.execute(
+                "SELECT data FROM devices WHERE registered = ?", (int(registered),)
+            )
         results = []
         for row in cur:
             try:
@@ -101,16 +276,67 @@ class Database:
                 continue
         return results
 
+    def devices_version(self) -> int:
+        """A counter that changes whenever any process writes to `devices`."""
+        cur = self._conn.execute("SELECT value FROM counters WHERE name = 'devices'")
+        return cur.fetchone()[0]
+
+    def tokens_version(self) -> int:
+        """A counter that changes whenever any process writes to `tokens`."""
+        cur = self._conn.execute("SELECT value FROM counters WHERE name = 'tokens'")
+        return cur.fetchone()[0]
+
+    def get_device_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        cur = self._conn.execute("SELECT data FROM devices WHERE name = ?", (name,))
+        row = cur.fetchone()
+        if row:
+            try:
+                return json.loads(row["data"])
+            except json.JSONDecodeError:
+                logger.error(f"Corrupted JSON for device named {name}")
+                return None
+        return None
+
+    def device_name_exists(self, name: str) -> bool:
+        cur = self._conn.execute("SELECT 1 FROM devices WHERE name = ?", (name,))
+        return cur.fetchone() is not None
+
+    def get_device_names(self) -> Dict[str, str]:
+        """Map every device_id to its name without decoding device data."""
+        cur = self._conn.execute("SELECT device_id, name FROM devices")
+        return {row["device_id"]: row["name"] for row in cur}
+
     def save_device(self, device_id: str, data: Dict[str, Any]) -> None:
-        json_str = json.dumps(data)
-        with self._conn:
-            self._conn.execute(
-                "INSERT OR REPLACE INTO devices (device_id, data) VALUES (?, ?)",
-                (device_id, json_str),
+        self.save_devices([(device_id, data)])
+
+    def save_devices(self, devices: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Save (device_id, data) pairs in one transaction.
+
+        Raises sqlite3.IntegrityError if a name is taken by another device.
+        """
+        with self.batch():
+            self._conn.executemany(
+                """
+                INSERT INTO devices (device_id, name, registered, data)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (device_id) DO UPDATE SET
+                    name = excluded.name,
+                    registered = excluded.registered,
+                    data = excluded.data
+                """,
+                [
+                    (
+                        device_id,
+                        data.get("name") or device_id,
+                        _is_registered(data),
+                        json.dumps(data),
+                    )
+                    for device_id, data in devices
+                ],
             )
 
     def delete_device(self, device_id: str) -> bool:
-        with self._conn:
+        with self.batch():
             cur = self._conn.execute(
                 "DELETE FROM devices WHERE device_id = ?", (device_id,)
             )
@@ -140,7 +366,7 @@ class Database:
         cached_at: int,
         expires_in: int,
     ) -> None:
-        with self._conn:
+        with self.batch():
             self._conn.execute(
                 """
                 INSERT OR REPLACE INTO tokens (device_id, token, expires_at, cached_at, expires_in)
@@ -149,8 +375,19 @@ class Database:
                 (device_id, token, expires_at, cached_at, expires_in),
             )
 
+    def save_tokens(self, entries: List[Tuple[str, str, int, int, int]]) -> None:
+        """Save (device_id, token, expires_at, cached_at, expires_in) rows in one transaction."""
+        with self.batch():
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO tokens (device_id, token, expires_at, cached_at, expires_in)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                entries,
+            )
+
     def delete_token(self, device_id: str) -> bool:
-        with self._conn:
+        with self.batch():
             cur = self._conn.execute(
                 "DELETE FROM tokens WHERE device_id = ?", (device_id,)
             )
@@ -166,21 +403,66 @@ class Database:
 
     def delete_expired_tokens(self) -> int:
         now = int(time.time())
-        with self._conn:
+        with self.batch():
             cur = self._conn.execute("DELETE FROM tokens WHERE expires_at <= ?", (now,))
             return cur.rowcount
 
     def clear_all_tokens(self) -> int:
-        with self._conn:
+        with self.batch():
             cur = self._conn.execute("DELETE FROM tokens")
             return cur.rowcount
 
+    def get_backfill_progress(self, job_id: str) -> Dict[str, int]:
+        cur = self._conn.execute(
+            "SELECT device_id, next_timestamp FROM backfill_progress WHERE job_id = ?",
+            (job_id,),
+        )
+        return {row["device_id"]: row["next_timestamp"] for row in cur}
+
+    def save_backfill_progress(self, job_id: str, progress: Dict[str, int]) -> None:
+        with self.batch():
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO backfill_progress (job_id, device_id, next_timestamp)
+                VALUES (?, ?, ?)
+                """,
+                [(job_id, device_id, ts) for device_id, ts in progress.items()],
+            )
+
+    def delete_backfill_progress(
+        self, job_id: str, device_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """Drop a job's checkpoints, or only those of `device_ids`."""
+        with self.batch():
+            if device_ids is None:
+                cur = self._conn.execute(
+                    "DELETE FROM backfill_progress WHERE job_id = ?", (job_id,)
+                )
+                return cur.rowcount
+            cur = self._conn.executemany(
+                "DELETE FROM backfill_progress WHERE job_id = ? AND device_id = ?",
+                [(job_id, device_id) for device_id in device_ids],
+            )
+            return cur.rowcount
+
 
 _db_instance: Optional[Database] = None
+_db_settings: Dict[str, Any] = {}
+
+
+def configure_data(**settings: Any) -> None:
+    """Set the `Database` options used by `get_data`; call before first use."""
+    _db_settings.clear()
+    _db_settings.update(settings)
+
+
+def data_settings() -> Dict[str, Any]:
+    """The options set by `configure_data`, to hand to worker processes."""
+    return dict(_db_settings)
 
 
 def get_data() -> Database:
     global _db_instance
     if _db_instance is None:
-        _db_instance = Database()
+        _db_instance = Database(**_db_settings)
     return _db_instance
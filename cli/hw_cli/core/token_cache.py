@@ -1,63 +1,228 @@
+import atexit
+import json
 import logging
 import time
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from hw_cli.core.constants import TOKEN_REFRESH_BUFFER_SEC
 from hw_cli.core.storage import get_data
 
 logger = logging.getLogger(__name__)
 
+# New tokens are written to SQLite once this many are pending, or when a
+# token is cached after the oldest has waited this long, and always on exit.
+WRITE_BEHIND_MAX_PENDING = 500
+WRITE_BEHIND_INTERVAL_SEC = 5.0
+
+# How often a lookup checks whether another process has written tokens.
+SYNC_INTERVAL_SEC = 1.0
+
+# Settings key holding hit/miss counters accumulated across runs.
+STATS_SETTING = "token_cache_stats"
+TIERS = ("memory", "db")
+
 
 class TokenCache:
-    """Caches JWT access tokens per device using SQLite backend."""
+    """Caches JWT access tokens per device.
+
+    Lookups are served from a process-local dict; SQLite is the durable
+    backing store, read on a memory miss and written behind in batches.
+
+    At most every `SYNC_INTERVAL_SEC`, or on `sync()`, a lookup checks the
+    tokens change counter; if another process has written tokens since (a
+    clear, an invalidation, a re-registration), the dict is dropped and
+    entries are re-read from SQLite as they are needed.
+    """
 
     def __init__(self, db=None):
         self._db = db or get_data()
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_since = 0.0
+        self._version = self._db.tokens_version()
+        self._synced_at = time.monotonic()
+        # tier -> [hits, misses] since the last flush
+        self._counters = {tier: [0, 0] for tier in TIERS}
 
     def get_token(self, device_id: str) -> Optional[str]:
-        entry = self._db.get_token_entry(device_id)
+        entry = self.get_entry(device_id)
         if not entry:
             return None
 
-        expires_at = entry.get("expires_at", 0)
+        logger.debug(f"Using cached token for device {device_id}")
+        return entry.get("token")
+
+    def get_entry(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """The cached token with its timestamps, unless it is about to expire."""
+        return self._lookup(device_id, count=True)
+
+    def peek_entry(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Like `get_entry`, but not counted as a hit or miss.
+
+        For bookkeeping lookups, such as checking which devices need a token,
+        that would otherwise skew the hit rates of token use.
+        """
+        return self._lookup(device_id, count=False)
+
+    def _lookup(self, device_id: str, count: bool) -> Optional[Dict[str, Any]]:
+        if time.monotonic() - self._synced_at >= SYNC_INTERVAL_SEC:
+            self.sync()
+
         current_time = time.time()
 
+        entry = self._memory.get(device_id)
+        if entry is not None:
+            if current_time <= entry["expires_at"] - TOKEN_REFRESH_BUFFER_SEC:
+                if count:
+                    self._counters["memory"][0] += 1
+                return entry
+            del self._memory[device_id]
+        if count:
+            self._counters["memory"][1] += 1
+
+        if device_id in self._pending:
+            # Expired before it was written; nothing worth persisting.
+            del self._pending[device_id]
+            return None
+
+        entry = self._db.get_token_entry(device_id)
+        if count:
+            self._counters["db"][0 if entry else 1] += 1
+        if not entry:
+            return None
+
+        expires_at = entry.get("expires_at", 0)
         if current_time > expires_at - TOKEN_REFRESH_BUFFER_SEC:
             logger.info(f"Token expired or expiring soon for device {device_id}")
-            self._db.delete_token(device_id)
+            with self._writing():
+                self._db.delete_token(device_id)
             return None
 
-        logger.debug(f"Using cached token for device {device_id}")
-        return entry.get("token")
+        self._memory[device_id] = entry
+        return entry
+
+    def sync(self) -> None:
+        """Drop the memory tier if another process has written tokens."""
+        self._synced_at = time.monotonic()
+        version = self._db.tokens_version()
+        if version != self._version:
+            self._version = version
+            # Our own unwritten tokens are still the newest we know of.
+            self._memory = dict(self._pending)
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Write tokens without mistaking our own change for another process's."""
+        with self._db.batch():
+            current = self._db.tokens_version() == self._version
+            yield
+            if current:
+                self._version = self._db.tokens_version()
 
     def set_token(self, device_id: str, token: str, expires_in: int) -> None:
         current_time = int(time.time())
-        expires_at = current_time + expires_in
-
-        self._db.save_token(
-            device_id=device_id,
-            token=token,
-            expires_at=expires_at,
-            cached_at=current_time,
-            expires_in=expires_in,
-        )
+        entry = {
+            "token": token,
+            "expires_at": current_time + expires_in,
+            "cached_at": current_time,
+            "expires_in": expires_in,
+        }
+        self._memory[device_id] = entry
+        if not self._pending:
+            self._pending_since = time.time()
+        self._pending[device_id] = entry
         logger.info(f"Cached token for device {device_id} (expires in {expires_in}s)")
 
+        if (
+            len(self._pending) >= WRITE_BEHIND_MAX_PENDING
+            or time.time() - self._pending_since > WRITE_BEHIND_INTERVAL_SEC
+        ):
+            self.flush()
+
+    def set_tokens(self, tokens: Dict[str, Tuple[str, int]]) -> None:
+        """Cache `device_id -> (token, expires_in)` in a single transaction."""
+        current_time = int(time.time())
+        rows = [
+            (device_id, token, current_time + expires_in, current_time, expires_in)
+            for device_id, (token, expires_in) in tokens.items()
+        ]
+        for device_id, token, expires_at, cached_at, expires_in in rows:
+            self._memory[device_id] = {
+                "token": token,
+                "expires_at": expires_at,
+                "cached_at": cached_at,
+                "expires_in": expires_in,
+            }
+            self._pending.pop(device_id, None)
+        with self._writing():
+            self._db.save_tokens(rows)
+        logger.info(f"Cached {len(tokens)} tokens")
+
+    def flush(self) -> None:
+        """Write pending tokens and hit/miss counters to SQLite."""
+        with self._writing():
+            if self._pending:
+                self._db.save_tokens(
+                    [
+                        (
+                            device_id,
+                            e["token"],
+                            e["expires_at"],
+                            e["cached_at"],
+                            e["expires_in"],
+                        )
+                        for device_id, e in self._pending.items()
+                    ]
+                )
+                logger.debug(f"Wrote {len(self._pending)} cached tokens")
+                self._pending = {}
+
+            if any(hits or misses for hits, misses in self._counters.values()):
+                totals = self._saved_counters()
+                for tier, (hits, misses) in self._counters.items():
+                    totals[tier]["hits"] += hits
+                    totals[tier]["misses"] += misses
+                self._db.set_setting(STATS_SETTING, json.dumps(totals))
+                self._counters = {tier: [0, 0] for tier in TIERS}
+
+    def _saved_counters(self) -> Dict[str, Dict[str, int]]:
+        totals = {tier: {"hits": 0, "misses": 0} for tier in TIERS}
+        raw = self._db.get_setting(STATS_SETTING)
+        if raw:
+            try:
+                for tier, counts in json.loads(raw).items():
+                    if tier in totals:
+                        totals[tier].update(counts)
+            except (ValueError, AttributeError):
+                logger.warning("Ignoring corrupted token cache counters")
+        return totals
+
     def invalidate(self, device_id: str) -> bool:
-        if self._db.delete_token(device_id):
+        in_memory = self._memory.pop(device_id, None) is not None
+        pending = self._pending.pop(device_id, None) is not None
+        with self._writing():
+            deleted = self._db.delete_token(device_id)
+        if deleted or in_memory or pending:
             logger.info(f"Invalidated token for device {device_id}")
             return True
         return False
 
     def clear_all(self) -> int:
-        count = self._db.clear_all_tokens()
+        self._pending = {}
+        self._memory.clear()
+        self.flush()
+        with self._writing():
+            count = self._db.clear_all_tokens()
         logger.info(f"Cleared {count} cached tokens")
         return count
 
     def get_all_entries(self) -> Dict[str, Any]:
+        self.flush()
         return self._db.get_all_tokens()
 
     def get_stats(self) -> Dict[str, Any]:
+        self.flush()
         entries = self._db.get_all_tokens()
         now = time.time()
 
@@ -65,14 +230,30 @@ class TokenCache:
         valid = sum(1 for e in entries.values() if e.get("expires_at", 0) > now)
         expired = total - valid
 
-        return {
+        stats: Dict[str, Any] = {
             "total": total,
             "valid": valid,
             "expired": expired,
         }
+        for tier, counts in self._saved_counters().items():
+            lookups = counts["hits"] + counts["misses"]
+            stats[tier] = {
+                **counts,
+                "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        return stats
+
+    def reset_stats(self) -> None:
+        self._counters = {tier: [0, 0] for tier in TIERS}
+        self._db.delete_setting(STATS_SETTING)
 
     def cleanup_expired(self) -> int:
-        removed = self._db.delete_expired_tokens()
+        self.flush()
+        now = time.time()
+        for device_id in [d for d, e in self._memory.items() if e["expires_at"] <= now]:
+            del self._memory[device_id]
+        with self._writing():
+            removed = self._db.delete_expired_tokens()
         if removed > 0:
             logger.debug(f"Cleaned up {removed} expired tokens")
         return removed
@@ -85,4 +266,5 @@ def get_token_cache() -> TokenCache:
     global _cache_instance
     if _cache_instance is None:
         _cache_instance = TokenCache()
+        atexit.register(_cache_instance.flush)
     return _cache_instance
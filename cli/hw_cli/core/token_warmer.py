@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from hw_cli.core.api.token_manager import TokenManager
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.api.weather_api_gateway import WeatherApiGateway
+from hw_cli.core.config import ApiDefaults
+from hw_cli.core.histogram import LatencyHistogram
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.token_cache import TokenCache, get_token_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmStats:
+    fetched: int = 0
+    skipped: int = 0
+    # device_id -> error
+    failed: Dict[str, str] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fetched": self.fetched,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "elapsed": round(self.elapsed, 3),
+            "latency": self.latency.to_dict(),
+        }
+
+
+async def warm_tokens(
+    devices: List[DeviceConfig],
+    concurrency: int = 20,
+    force: bool = False,
+    api: Optional[ApiDefaults] = None,
+    cache: Optional[TokenCache] = None,
+) -> WarmStats:
+    """Fetch access tokens for `devices` and cache them in one transaction.
+
+    Devices that already hold a valid token are skipped unless `force` is set.
+    At most `concurrency` token requests are in flight at once.
+    """
+    cache = cache or get_token_cache()
+    stats = WarmStats()
+    tokens: Dict[str, Tuple[str, int]] = {}
+    slots = asyncio.Semaphore(concurrency)
+
+    pending = []
+    for device in devices:
+        if not force and cache.peek_entry(device.device_id):
+            stats.skipped += 1
+        else:
+            pending.append(device)
+
+    async def fetch(http: httpx.AsyncClient, device: DeviceConfig) -> None:
+        manager = TokenManager(
+            device.device_id,
+            device.provisioning_token,
+            device.hmac_secret,
+            WeatherApiGateway(device.api_base_url, http),
+            cache=cache,
+        )
+        async with slots:
+            started = time.perf_counter()
+            try:
+                tokens[device.device_id] = await manager.request_token()
+                stats.latency.record(time.perf_counter() - started)
+            except httpx.HTTPStatusError as e:
+                stats.failed[device.device_id] = f"HTTP {e.response.status_code}"
+            except (httpx.HTTPError, KeyError) as e:
+                stats.failed[device.device_id] = repr(e)
+
+    started = time.perf_counter()
+    async with create_http_client(api, max_connections=concurrency) as http:
+        try:
+            await asyncio.gather(*(fetch(http, d) for d in pending))
+        finally:
+            # Keep whatever was fetched, also when interrupted.
+            if tokens:
+                cache.set_tokens(tokens)
+            stats.fetched = len(tokens)
+            stats.elapsed = time.perf_counter() - started
+
+    return stats
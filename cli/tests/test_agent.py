@@ -0,0 +1,159 @@
+import asyncio
+import os
+import stat
+
+import httpx
+
+from hw_cli.core import agent, agent_client
+from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.storage import Database
+
+
+def test_agent_serves_sends_over_one_pool_until_stopped(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    DeviceManager(db=Database()).add_device(
+        DeviceConfig(
+            device_id="dev-1",
+            name="sensor",
+            api_base_url="http://gateway",
+            provisioning_token="jwt",
+            hmac_secret="secret",
+        )
+    )
+
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path.endswith("/token"):
+            return httpx.Response(
+                200, json={"data": {"token": "tok", "expires_in": 600}}
+            )
+        return httpx.Response(202)
+
+    clients = []
+
+    def create_http_client(api):
+        clients.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return clients[-1]
+
+    monkeypatch.setattr(agent, "create_http_client", create_http_client)
+    monkeypatch.setattr(agent_client, "get_app_dir", lambda: tmp_path)
+    assert agent_client.call_agent({"op": "ping"}) is None
+
+    async def scenario():
+        server = asyncio.create_task(agent.Agent().serve())
+        while not agent_client.socket_path().exists():
+            await asyncio.sleep(0.01)
+
+        async def call(request):
+            return await asyncio.get_running_loop().run_in_executor(
+                None, agent_client.call_agent, request
+            )
+
+        mode = stat.S_IMODE(os.stat(agent_client.socket_path()).st_mode)
+        sent = [await call({"op": "send", "device": "sensor"}) for _ in range(2)]
+        missing = await call({"op": "send", "device": "nope"})
+        not_object = await call(["send"])
+        status = await call({"op": "ping"})
+        await call({"op": "stop"})
+        await asyncio.wait_for(server, 5)
+        return mode, sent, missing, not_object, status
+
+    mode, sent, missing, not_object, status = asyncio.run(scenario())
+
+    assert mode == 0o600
+
+    assert [r["ok"] for r in sent] == [True, True]
+    assert sent[0]["data"]["timestamp"] > 0
+    assert missing == {"ok": False, "error": "Device not found or no default set"}
+    assert not_object == {"ok": False, "error": "Bad request: expected a JSON object"}
+    assert (status["requests"], status["errors"], status["clients"]) == (3, 1, 1)
+    # One pool and one token for both sends.
+    assert len(clients) == 1
+    assert sum(path.endswith("/token") for path in paths) == 1
+    assert not agent_client.socket_path().exists()
+
+
+def test_agent_drops_the_old_token_after_reregistration(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    mgr = DeviceManager(db=Database())
+    device = DeviceConfig(
+        device_id="dev-reregistered",
+        name="sensor",
+        api_base_url="http://gateway",
+        provisioning_token="jwt",
+        hmac_secret="secret",
+    )
+    mgr.add_device(device)
+
+    tokens = []
+    used = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/token"):
+            tokens.append(f"tok-{len(tokens) + 1}")
+            return httpx.Response(
+                200, json={"data": {"token": tokens[-1], "expires_in": 600}}
+            )
+        used.append(request.headers["Authorization"])
+        return httpx.Response(202)
+
+    async def scenario():
+        a = agent.Agent()
+        a._mgr = mgr
+        a._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        first = await a.handle({"op": "send", "device": "sensor"})
+        device.hmac_secret = "rotated"
+        mgr.update_device(device)
+        second = await a.handle({"op": "send", "device": "sensor"})
+        await a._http.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first["ok"] and second["ok"]
+    assert used == ["Bearer tok-1", "Bearer tok-2"]
+
+
+def test_agent_keeps_concurrent_sends_apart(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    mgr = DeviceManager(db=Database())
+    mgr.add_device(
+        DeviceConfig(
+            device_id="dev-concurrent",
+            name="sensor",
+            api_base_url="http://gateway",
+            provisioning_token="jwt",
+            hmac_secret="secret",
+        )
+    )
+
+    paths = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        await asyncio.sleep(0.01)
+        if request.url.path.endswith("/token"):
+            return httpx.Response(
+                200, json={"data": {"token": "tok", "expires_in": 600}}
+            )
+        return httpx.Response(202)
+
+    async def scenario():
+        a = agent.Agent()
+        a._mgr = mgr
+        a._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        request = {"op": "send", "device": "sensor", "compress": "gzip"}
+        sent = await asyncio.gather(*(a.handle(dict(request)) for _ in range(3)))
+        await a._http.aclose()
+        return sent, a.status()
+
+    sent, status = asyncio.run(scenario())
+
+    assert [r["ok"] for r in sent] == [True] * 3
+    # Each response reports its own body, not a neighbour's.
+    assert [r["compression"]["bodies"] for r in sent] == [1, 1, 1]
+    assert status["clients"] == 1
+    assert sum(path.endswith("/token") for path in paths) == 1
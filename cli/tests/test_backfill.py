@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import httpx
+
+from hw_cli.core import backfill
+from hw_cli.core.backfill import BackfillRunner, backfill_job_id
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.storage import Database
+
+START, END, STEP = 0, 3000, 60
+
+
+def _devices(n):
+    return [
+        DeviceConfig(
+            device_id=f"dev-{i}",
+            name=f"sensor-{i}",
+            api_base_url="http://gateway",
+            provisioning_token="jwt",
+            hmac_secret="secret",
+        )
+        for i in range(n)
+    ]
+
+
+def _run(monkeypatch, devices, db, fail_at=None, error=None, seed=5, **kwargs):
+    """Run a backfill and return the bodies sent, keyed by timestamp."""
+    sent = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/token"):
+            return httpx.Response(
+                200, json={"data": {"token": "tok", "expires_in": 600}}
+            )
+        body = json.loads(request.content)
+        if body["ts"] == fail_at:
+            if error is not None:
+                raise error
+            return httpx.Response(400)
+        sent[body["ts"]] = body
+        return httpx.Response(202)
+
+    monkeypatch.setattr(
+        backfill,
+        "create_http_client",
+        lambda api, max_connections: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ),
+    )
+    runner = BackfillRunner(
+        devices, START, END, STEP, concurrency=4, seed=seed, db=db, **kwargs
+    )
+    stats = asyncio.run(runner.run())
+    return sent, stats
+
+
+def test_resumed_backfill_resends_the_same_readings(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database()
+    devices = _devices(1)
+
+    first, stats = _run(monkeypatch, devices, db, fail_at=1200)
+    assert stats.errors == 1
+    assert db.get_backfill_progress(backfill_job_id(START, END, STEP, 5)) == {
+        "dev-0": 1200
+    }
+
+    resumed, stats = _run(monkeypatch, devices, db)
+    assert stats.resumed == 20
+    assert min(resumed) == 1200
+
+    whole, _ = _run(monkeypatch, devices, db, restart=True)
+    assert len(whole) == 50
+    assert {k: v for k, v in whole.items() if k in resumed} == resumed
+    assert {k: v for k, v in whole.items() if k in first} == first
+
+
+def test_finished_backfill_keeps_other_devices_checkpoints(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database()
+    job_id = backfill_job_id(START, END, STEP, 5)
+    db.save_backfill_progress(job_id, {"other": 600})
+    db.save_backfill_progress(backfill_job_id(START, END, STEP, 6), {"dev-0": 600})
+
+    _run(monkeypatch, _devices(1), db)
+
+    assert db.get_backfill_progress(job_id) == {"other": 600}
+    assert db.get_backfill_progress(backfill_job_id(START, END, STEP, 6)) == {
+        "dev-0": 600
+    }
+
+
+def test_unseeded_backfill_resumes_with_the_seed_it_drew(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database()
+    devices = _devices(1)
+    seed_setting = backfill.SEED_SETTING_PREFIX + backfill_job_id(
+        START, END, STEP, None
+    )
+
+    first, _ = _run(monkeypatch, devices, db, fail_at=1200, seed=None)
+    drawn = int(db.get_setting(seed_setting))
+    resumed, stats = _run(monkeypatch, devices, db, seed=None)
+    assert stats.resumed == 20
+    # Done: the next unseeded run of the range draws a new seed.
+    assert db.get_setting(seed_setting) is None
+
+    whole, _ = _run(monkeypatch, devices, db, seed=drawn)
+    assert {k: v for k, v in whole.items() if k in resumed} == resumed
+    assert {k: v for k, v in whole.items() if k in first} == first
+
+
+def test_unexpected_send_error_stops_the_device(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database()
+
+    sent, stats = _run(
+        monkeypatch, _devices(1), db, fail_at=1200, error=RuntimeError("boom")
+    )
+
+    assert stats.errors == 1
+    assert db.get_backfill_progress(backfill_job_id(START, END, STEP, 5)) == {
+        "dev-0": 1200
+    }
+    # Stopped at the failure instead of sending the rest of the range.
+    assert len(sent) < (END - START) // STEP - 1
@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from hw_cli.core.api.batching import TelemetryBatcher, frame_batch
+
+
+def test_frame_batch_formats():
+    bodies = [b'{"ts":1,"dat":{}}', b'{"ts":2,"dat":{}}']
+
+    assert json.loads(frame_batch(bodies, "array")) == [
+        {"ts": 1, "dat": {}},
+        {"ts": 2, "dat": {}},
+    ]
+    assert json.loads(frame_batch(bodies, "envelope")) == {
+        "n": 2,
+        "dat": [{"ts": 1, "dat": {}}, {"ts": 2, "dat": {}}],
+    }
+
+
+def test_batches_flush_on_size_then_linger():
+    """Full batches go out at once; a partial one waits for the linger time."""
+    sent = []
+
+    async def send(body: bytes) -> None:
+        sent.append(json.loads(body))
+
+    async def run() -> None:
+        batcher = TelemetryBatcher(send, batch_size=3, linger=0.05)
+        futures = [batcher.submit(b"%d" % i) for i in range(5)]
+        await asyncio.wait_for(asyncio.gather(*futures[:3]), timeout=0.01)
+        assert sent == [[0, 1, 2]]
+
+        await asyncio.wait_for(asyncio.gather(*futures[3:]), timeout=1.0)
+        assert sent == [[0, 1, 2], [3, 4]]
+        assert (batcher.stats.requests, batcher.stats.readings) == (2, 5)
+
+    asyncio.run(run())
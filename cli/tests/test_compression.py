@@ -0,0 +1,51 @@
+import asyncio
+import gzip
+import zlib
+
+import httpx
+
+from hw_cli.core.api.compression import BodyCompressor
+from hw_cli.core.api.weather_api_gateway import WeatherApiGateway
+
+
+def test_threshold_and_stats():
+    """Bodies under the threshold or that would grow are sent as they are."""
+    compressor = BodyCompressor("deflate", threshold=64)
+    body = b'{"ts":1,"dat":{"tmp":1.0}}' * 10
+
+    assert compressor.compress(b"x" * 10) == (b"x" * 10, None)
+    assert compressor.compress(bytes(range(100))) == (bytes(range(100)), None)
+    sent, content_encoding = compressor.compress(body)
+
+    assert content_encoding == "deflate"
+    assert zlib.decompress(sent) == body
+    stats = compressor.stats
+    assert (stats.bodies, stats.attempts, stats.compressed) == (3, 2, 1)
+    assert stats.bytes_in == 10 + 100 + len(body)
+    assert stats.bytes_out == 10 + 100 + len(sent)
+
+
+def test_gateway_sets_content_encoding():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={})
+
+    async def send(body: bytes) -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            gateway = WeatherApiGateway(
+                "http://gw", http, compressor=BodyCompressor("gzip", threshold=32)
+            )
+            headers = {"Authorization": "Bearer t", "Content-Type": "application/json"}
+            await gateway.send_telemetry_body(headers, body)
+            await gateway.send_telemetry_body(headers, b"{}")
+
+    body = b'{"ts":1,"dat":{"tmp":1.0,"prs":1000.0}}' * 4
+    asyncio.run(send(body))
+
+    compressed, plain = requests
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.content) == body
+    assert "Content-Encoding" not in plain.headers
+    assert plain.content == b"{}"
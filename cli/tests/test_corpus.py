@@ -0,0 +1,31 @@
+import pytest
+
+from hw_cli.core.corpus import HEADER, Corpus, CorpusWriter
+
+
+def _write(path):
+    with CorpusWriter(path) as writer:
+        writer.add("dev-1", 200, b'{"ts":200}')
+        writer.add("dev-1", 100, b'{"ts":100}')
+    return path.read_bytes()
+
+
+def test_corpus_reads_back_bodies_in_timestamp_order(tmp_path):
+    path = tmp_path / "c.hwc"
+    _write(path)
+
+    with Corpus(path) as corpus:
+        assert corpus.device_ids == ["dev-1"]
+        bodies = [corpus.body(offset, n) for _, _, offset, n in corpus.entries()]
+
+    assert bodies == [b'{"ts":100}', b'{"ts":200}']
+
+
+@pytest.mark.parametrize("keep", [0, HEADER.size - 1, HEADER.size + 4, -1])
+def test_truncated_corpus_raises_value_error(tmp_path, keep):
+    data = _write(tmp_path / "c.hwc")
+    path = tmp_path / "truncated.hwc"
+    path.write_bytes(data[:keep] if keep else b"")
+
+    with pytest.raises(ValueError):
+        Corpus(path)
@@ -0,0 +1,115 @@
+import pytest
+
+from hw_cli.core import device_manager
+from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.storage import Database
+
+
+def _device(device_id: str, name: str, token: str = "jwt") -> DeviceConfig:
+    return DeviceConfig(
+        device_id=device_id,
+        name=name,
+        api_base_url="http://gateway",
+        provisioning_token=token,
+    )
+
+
+def test_import_devices_skips_duplicates_and_renames_clashes(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    mgr = DeviceManager(db=Database())
+    mgr.add_device(_device("old", "sensor"))
+
+    saved, skipped = mgr.import_devices(
+        [
+            _device("old", "other", token="new"),
+            _device("a", "sensor"),
+            _device("b", "sensor"),
+            _device("a", "again"),
+        ]
+    )
+
+    assert skipped == 2
+    assert saved == ["a", "b"]
+    assert mgr.get_device_by_id("a").name == "sensor-1"
+    assert mgr.get_device_by_id("old").provisioning_token == "jwt"
+    assert mgr.get_device_by_id("b").name == "sensor-2"
+
+    saved, skipped = mgr.import_devices(
+        [_device("old", "other", token="new")], replace=True
+    )
+
+    assert (len(saved), skipped) == (1, 0)
+    old = mgr.get_device_by_id("old")
+    assert (old.name, old.provisioning_token) == ("sensor", "new")
+
+
+def test_import_devices_saves_nothing_if_the_input_fails(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(device_manager, "IMPORT_CHUNK_SIZE", 2)
+    mgr = DeviceManager(db=Database())
+
+    def devices():
+        for i in range(5):
+            yield _device(f"d{i}", "sensor")
+        raise ValueError("bad entry")
+
+    with pytest.raises(ValueError):
+        mgr.import_devices(devices())
+
+    assert mgr.get_devices() == []
+    saved, _ = mgr.import_devices(_device(f"d{i}", "sensor") for i in range(5))
+    assert len(mgr.get_devices()) == len(saved) == 5
+
+
+def test_device_cache_serves_copies_and_sees_other_connections(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    mgr = DeviceManager(db=Database())
+    mgr.add_device(_device("a", "sensor"))
+    assert len(mgr.get_devices()) == 1
+
+    parsed = []
+    from_dict = DeviceConfig.from_dict
+    monkeypatch.setattr(
+        DeviceConfig,
+        "from_dict",
+        staticmethod(lambda data: parsed.append(data) or from_dict(data)),
+    )
+    device = mgr.get_device_by_name("sensor")
+    device.metadata["changed"] = True
+    assert mgr.get_device_by_id("a").metadata == {}
+    assert mgr.get_device_by_name("missing") is None
+    assert parsed == []
+
+    other = DeviceManager(db=Database())
+    registered = other.get_device_by_id("a")
+    registered.hmac_secret = "secret"
+    other.update_device(registered)
+
+    assert mgr.get_device_by_id("a").hmac_secret == "secret"
+    assert mgr.get_devices(registered=False) == []
+
+
+def test_filtered_cold_load_reads_only_matching_rows(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    mgr = DeviceManager(db=Database())
+    devices = [_device(f"d{i}", f"sensor-{i}") for i in range(3)]
+    devices[0].hmac_secret = "secret"
+    devices[1].hmac_secret = ""
+    mgr.update_devices(devices)
+
+    parsed = []
+    from_dict = DeviceConfig.from_dict
+    monkeypatch.setattr(
+        DeviceConfig,
+        "from_dict",
+        staticmethod(lambda data: parsed.append(data) or from_dict(data)),
+    )
+    cold = DeviceManager(db=Database())
+    assert [d.device_id for d in cold.get_devices(registered=True)] == ["d0"]
+    assert len(parsed) == 1
+
+    # An empty secret is unregistered both in the index and on the model.
+    unregistered = cold.get_devices(registered=False)
+    assert [d.device_id for d in unregistered] == ["d1", "d2"]
+    assert [d.is_registered for d in cold.get_devices()] == [True, False, False]
@@ -0,0 +1,72 @@
+import struct
+
+from hw_cli.core.api import encoding
+from hw_cli.core.api.encoding import encode_protobuf, pack_tips
+from hw_cli.core.api.weather_api_gateway import build_telemetry_payload, encode_json_body
+from hw_cli.core.data_generator import DataGenerator
+from hw_cli.core.models import (
+    DeviceConfig,
+    RainfallHistogram,
+    TelemetryData,
+    WeatherReading,
+)
+
+
+def test_pack_tips_matches_firmware_nibbles():
+    """Even intervals use the low nibble, odd the high one, capped at 15."""
+    rain = RainfallHistogram(
+        data={"0": 3, "1": 20, "4": 1}, bucket_seconds=120, start_timestamp=0, num_buckets=5
+    )
+    assert pack_tips(rain) == bytes([0xF3, 0x00, 0x01])
+
+
+def test_encode_protobuf_wire_format():
+    """Fields follow firmware/weather.proto; zero scalars are omitted."""
+    device = DeviceConfig(
+        device_id="ab", name="ab", api_base_url="", provisioning_token="", mm_per_tip=0.5
+    )
+    reading = WeatherReading(
+        temperature=1.5,
+        pressure=None,
+        humidity=0.0,
+        rain=RainfallHistogram(
+            data={"1": 2}, bucket_seconds=120, start_timestamp=300, num_buckets=2
+        ),
+    )
+    body = encode_protobuf(TelemetryData(timestamp=150, reading=reading), device)
+
+    f32 = struct.Struct("<f").pack
+    expected = (
+        b"\x08\x96\x01"  # created_at = 150
+        + b"\x15" + f32(1.5)  # temperature
+        + b"\x2a\x0a" + b"\x0a\x01\x20" + b"\x10\x02" + b"\x18\x78" + b"\x20\xac\x02"
+        + b"\x32\x09" + b"\x0a\x02ab" + b"\x15" + f32(0.5)
+    )
+    assert body == expected
+
+
+def test_encode_json_matches_reference_body(monkeypatch):
+    """Both the fast backend and the direct writer match the stdlib body."""
+    device = DeviceConfig(
+        device_id="dev-1", name="dev-1", api_base_url="", provisioning_token=""
+    )
+    generator = DataGenerator(seed=7)
+    readings = [generator.generate(device, 1_700_000_000 + i * 300) for i in range(200)]
+    assert any(t.reading.rain.data for t in readings)
+
+    for direct in (False, True):
+        if direct:
+            monkeypatch.setattr(encoding, "_json_dumps", None)
+        for t in readings:
+            r = t.reading
+            expected = encode_json_body(
+                build_telemetry_payload(
+                    t.timestamp,
+                    r.temperature,
+                    r.pressure,
+                    r.humidity,
+                    r.precipitation_mm,
+                    r.rain,
+                )
+            )
+            assert encoding.encode_json(t) == expected
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from hw_cli.core import fleet
+from hw_cli.core.fleet import FleetRunner
+from hw_cli.core.models import DeviceConfig
+
+
+def _device():
+    return DeviceConfig(
+        device_id="dev-1",
+        name="sensor",
+        api_base_url="http://gateway",
+        provisioning_token="jwt",
+        hmac_secret="secret",
+    )
+
+
+def _run(monkeypatch, tmp_path, fail_first=True, **kwargs):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/token"):
+            return httpx.Response(
+                200, json={"data": {"token": "tok", "expires_in": 600}}
+            )
+        calls.append(request)
+        if fail_first and len(calls) == 1:
+            raise ValueError("not an httpx error")
+        return httpx.Response(202)
+
+    pools = []
+
+    def create_http_client(api, max_connections):
+        pools.append(max_connections)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(fleet, "create_http_client", create_http_client)
+    runner = FleetRunner(
+        [_device()], interval=0.01, max_messages=3, stagger=False, seed=1, **kwargs
+    )
+    return asyncio.run(runner.run()), pools
+
+
+def test_device_keeps_sending_after_an_unexpected_error(monkeypatch, tmp_path):
+    stats, pools = _run(monkeypatch, tmp_path)
+    assert (stats.sent, stats.errors, stats.active) == (3, 1, 0)
+    assert pools == [1]
+
+
+def test_batched_device_survives_a_failing_submit(monkeypatch, tmp_path):
+    submit = fleet.WeatherIoTClient.submit_telemetry
+    failures = ["token store unavailable"]
+
+    def flaky_submit(self, telemetry):
+        if failures:
+            raise RuntimeError(failures.pop())
+        return submit(self, telemetry)
+
+    monkeypatch.setattr(fleet.WeatherIoTClient, "submit_telemetry", flaky_submit)
+    stats, _ = _run(monkeypatch, tmp_path, fail_first=False, batch_size=2)
+    assert (stats.sent, stats.errors, stats.active) == (3, 1, 0)
@@ -0,0 +1,33 @@
+import random
+
+from hw_cli.core.histogram import LatencyHistogram
+
+
+def test_percentiles_within_precision():
+    """Percentiles stay within bucket precision of the exact values."""
+    rng = random.Random(1)
+    values = sorted(rng.expovariate(1 / 0.05) for _ in range(20000))
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+
+    for p in (50, 90, 99, 99.9):
+        exact = values[int(len(values) * p / 100) - 1]
+        assert abs(hist.percentile(p) - exact) <= exact * 0.01 + 1e-6
+    assert hist.count == len(values)
+
+
+def test_merge_round_trip():
+    """Histograms restored from to_dict merge into the same result."""
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for i in range(1, 1000):
+        a.record(i / 1000)
+        b.record(i / 100)
+
+    merged = LatencyHistogram.from_dict(a.to_dict())
+    merged.merge(LatencyHistogram.from_dict(b.to_dict()))
+
+    assert merged.count == a.count + b.count
+    assert merged.max_us == b.max_us
+    assert merged.min_us == a.min_us
+    assert merged.summary() == LatencyHistogram.merged([a, b]).summary()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import httpx
+
+from hw_cli.core.limiter import AdaptiveLimiter, LimiterStats, retry_after
+
+
+def _throttled(status: int = 429, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://test/device/telemetry")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("throttled", request=request, response=response)
+
+
+def test_retry_after_parses_seconds_and_ignores_other_errors():
+    assert retry_after(_throttled(429, {"Retry-After": "2"})) == 2.0
+    assert retry_after(_throttled(503, {"Retry-After": "3600"})) == 60.0
+    assert retry_after(_throttled(429)) is None
+    assert retry_after(_throttled(500, {"Retry-After": "2"})) is None
+
+
+def test_additive_increase_and_one_decrease_per_round_trip():
+    limiter = AdaptiveLimiter(initial=4, max_limit=8, target_latency=1.0)
+    limiter.in_flight = 4
+    now = time.monotonic()
+    for _ in range(4):
+        limiter.on_response(now)
+    assert int(limiter.limit) == 4 and limiter.limit > 4.9
+
+    # Requests issued before the first cut do not cut again.
+    limiter.on_response(now, _throttled())
+    limiter.on_response(now, _throttled())
+    assert int(limiter.limit) == 2
+    assert (limiter.stats.decreases, limiter.stats.throttled) == (1, 2)
+
+    limiter.on_response(now - 5.0)
+    assert int(limiter.limit) == 2
+
+
+def test_timeouts_cut_the_limit_but_server_errors_do_not():
+    request = httpx.Request("POST", "http://test/device/telemetry")
+    limiter = AdaptiveLimiter(initial=8, target_latency=1.0)
+    now = time.monotonic()
+
+    limiter.on_response(now, _throttled(500))
+    assert int(limiter.limit) == 8
+
+    limiter.on_response(now, httpx.ReadTimeout("timed out", request=request))
+    assert int(limiter.limit) == 4
+    limiter.on_response(
+        time.monotonic(), httpx.ConnectError("refused", request=request)
+    )
+    assert int(limiter.limit) == 2
+    assert (limiter.stats.decreases, limiter.stats.throttled) == (2, 0)
+
+
+def test_acquire_waits_for_a_slot_and_for_retry_after():
+    async def run() -> None:
+        limiter = AdaptiveLimiter(initial=1, target_latency=1.0)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        limiter.on_response(time.monotonic(), _throttled(429, {"Retry-After": "0.1"}))
+        limiter.release()
+        started = time.monotonic()
+        await asyncio.wait_for(waiter, timeout=1.0)
+        assert time.monotonic() - started >= 0.09
+        assert limiter.stats.pauses == 1
+
+    asyncio.run(run())
+
+
+def test_stats_merge_sums_timelines():
+    a, b = LimiterStats(), LimiterStats()
+    a.timeline, a.limit = [[0.0, 10], [2.0, 5]], 5
+    b.timeline, b.limit = [[0.0, 10], [1.0, 20]], 20
+
+    merged = LimiterStats.from_dict(a.to_dict())
+    merged.merge(LimiterStats.from_dict(b.to_dict()))
+    assert merged.timeline == [[0.0, 20], [1.0, 30], [2.0, 25]]
+    assert (merged.limit, merged.low, merged.high) == (25, 20, 30)
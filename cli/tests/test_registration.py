@@ -0,0 +1,46 @@
+import asyncio
+
+import httpx
+
+from hw_cli.core import registration
+from hw_cli.core.device_manager import DeviceManager
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.storage import Database
+
+
+def test_register_devices_saves_secrets_and_reports_failures(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    mgr = DeviceManager(db=Database())
+    monkeypatch.setattr(registration, "SAVE_BATCH_SIZE", 2)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        device_id = request.url.path.split("/")[2]
+        if device_id == "broken":
+            return httpx.Response(500)
+        return httpx.Response(200, json={"data": {"hmac_secret": f"s-{device_id}"}})
+
+    monkeypatch.setattr(
+        registration,
+        "create_http_client",
+        lambda api, max_connections: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ),
+    )
+    devices = [
+        DeviceConfig(
+            device_id=device_id,
+            name=device_id,
+            api_base_url="http://gateway",
+            provisioning_token="jwt",
+        )
+        for device_id in ("a", "b", "c", "broken")
+    ]
+    for device in devices:
+        mgr.add_device(device)
+
+    stats = asyncio.run(registration.register_devices(devices, concurrency=2, mgr=mgr))
+
+    assert (stats.total, stats.registered) == (4, 3)
+    assert stats.failed == {"broken": "register: HTTP 500"}
+    assert mgr.get_device_by_id("c").hmac_secret == "s-c"
+    assert not mgr.get_device_by_id("broken").is_registered
@@ -0,0 +1,98 @@
+import json
+import os
+import socketserver
+import subprocess
+import threading
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from hw_cli.core.api.encoding import EncodingStats
+from hw_cli.core.data_generator import DataGenerator
+from hw_cli.core.models import DeviceConfig
+
+# Total import time allowed before a command runs, as measured by
+# `python -X importtime` (which itself adds some overhead).
+STARTUP_BUDGET_MS = float(os.getenv("HW_STARTUP_BUDGET_MS", "500"))
+
+CLI_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _imports(tmp_path: Path, *args: str) -> Dict[str, int]:
+    """Run `hw <args>` and return module -> self import time in microseconds."""
+    env = dict(os.environ, HW_CLI_DATA_DIR=str(tmp_path), PYTHONPATH=str(CLI_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "hw_cli", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=CLI_ROOT,
+    )
+    assert result.returncode == 0, result.stderr
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            imports[module.strip()] = int(self_us)
+    return imports
+
+
+@pytest.mark.parametrize(
+    "args", [("--version",), ("config", "path"), ("devices", "list")]
+)
+def test_startup_skips_http_stack_and_stays_in_budget(tmp_path, args):
+    imports = _imports(tmp_path, *args)
+
+    assert "httpx" not in imports
+    assert "asyncio" not in imports
+    assert "hw_cli.commands.simulate" not in imports
+    total_ms = sum(imports.values()) / 1000
+    assert total_ms < STARTUP_BUDGET_MS, f"imports took {total_ms:.0f}ms"
+
+
+def test_config_path_does_not_create_the_database(tmp_path):
+    imports = _imports(tmp_path, "config", "path")
+
+    assert "hw_cli.commands.devices" not in imports
+    assert not (tmp_path / "hw.db").exists()
+
+
+def test_simulate_once_help_skips_http_stack(tmp_path):
+    imports = _imports(tmp_path, "simulate", "once", "--help")
+
+    assert "httpx" not in imports
+    assert "asyncio" not in imports
+    assert "hw_cli.core.fleet" not in imports
+
+
+def test_simulate_once_via_agent_skips_http_stack(tmp_path):
+    device = DeviceConfig("dev-1", "sensor", "http://gateway", "jwt", "secret")
+    response = {
+        "ok": True,
+        "device": device.device_id,
+        "data": DataGenerator(seed=1).generate(device, 1000).to_dict(),
+        "latency": 0.01,
+        "encoding": EncodingStats().to_dict(),
+    }
+    requests = []
+
+    class FakeAgent(socketserver.StreamRequestHandler):
+        def handle(self):
+            requests.append(json.loads(self.rfile.readline()))
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    with socketserver.UnixStreamServer(str(tmp_path / "agent.sock"), FakeAgent) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            imports = _imports(tmp_path, "simulate", "once", "-d", "sensor")
+        finally:
+            server.shutdown()
+
+    assert [r["op"] for r in requests] == ["send"]
+    assert "httpx" not in imports
+    assert "asyncio" not in imports
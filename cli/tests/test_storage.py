@@ -0,0 +1,71 @@
+import json
+import sqlite3
+
+import pytest
+
+from hw_cli.core.storage import DB_FILENAME, SCHEMA_VERSION, Database
+
+
+def test_migrates_legacy_devices_to_indexed_columns(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    legacy = sqlite3.connect(tmp_path / DB_FILENAME)
+    legacy.execute("CREATE TABLE devices (device_id TEXT PRIMARY KEY, data TEXT)")
+    legacy.executemany(
+        "INSERT INTO devices VALUES (?, ?)",
+        [
+            ("a", json.dumps({"device_id": "a", "name": "sensor"})),
+            ("b", json.dumps({"device_id": "b", "name": "sensor", "hmac_secret": "s"})),
+        ],
+    )
+    legacy.commit()
+    legacy.close()
+
+    db = Database()
+
+    assert db._conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert db.get_device_names() == {"a": "sensor", "b": "sensor-1"}
+    assert db.get_device_by_name("sensor-1")["hmac_secret"] == "s"
+    assert [d["device_id"] for d in db.get_all_devices(registered=True)] == ["b"]
+    plan = db._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM devices WHERE name = ?", ("x",)
+    ).fetchall()
+    assert "idx_devices_name" in plan[0][-1]
+
+    # Reopening does not run the migration again.
+    assert Database().get_device_names() == {"a": "sensor", "b": "sensor-1"}
+
+
+def test_save_device_rejects_a_name_taken_by_another_device(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database()
+    db.save_device("a", {"device_id": "a", "name": "sensor"})
+    db.save_device("a", {"device_id": "a", "name": "sensor", "hmac_secret": "s"})
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db.save_device("b", {"device_id": "b", "name": "sensor"})
+    assert db.get_device("a")["hmac_secret"] == "s"
+    assert not db.device_exists("b")
+
+
+def test_batch_commits_nested_writes_once_and_rolls_back_on_error(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database(busy_timeout=1)
+    assert db._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    with pytest.raises(RuntimeError):
+        with db.batch():
+            db.save_token("a", "tok", 2, 1, 1)
+            db.set_setting("key", "value")
+            raise RuntimeError
+    assert db.get_token_entry("a") is None
+    assert db.get_setting("key") is None
+
+    with db.batch():
+        db.save_token("a", "tok", 2, 1, 1)
+        with db.batch():
+            db.set_setting("key", "value")
+        # Still uncommitted: another connection cannot see it yet.
+        assert Database().get_setting("key") is None
+    assert Database().get_setting("key") == "value"
@@ -0,0 +1,55 @@
+from hw_cli.core import token_cache
+from hw_cli.core.storage import Database
+from hw_cli.core.token_cache import TokenCache
+
+
+def test_memory_tier_writes_behind_and_counts_both_tiers(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    db = Database()
+    cache = TokenCache(db=db)
+
+    cache.set_token("dev-1", "tok", 3600)
+    assert db.get_token_entry("dev-1") is None
+    assert cache.get_token("dev-1") == "tok"
+    cache.flush()
+    assert db.get_token_entry("dev-1")["token"] == "tok"
+
+    # A fresh process starts cold: SQLite serves the first lookup only.
+    other = TokenCache(db=db)
+    assert other.get_token("dev-1") == "tok"
+    assert other.get_token("dev-1") == "tok"
+    assert other.get_token("dev-2") is None
+
+    stats = other.get_stats()
+    assert stats["memory"] == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+    assert stats["db"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_memory_tier_sees_token_changes_from_other_processes(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    cache = TokenCache(db=Database())
+    cache.set_tokens({"dev-1": ("old", 3600), "dev-2": ("kept", 3600)})
+    cache.set_token("dev-3", "pending", 3600)
+
+    # Unrelated writes from another process leave the memory tier alone.
+    other_db = Database()
+    other_db.set_setting("unrelated", "x")
+    cache.sync()
+    assert cache.get_token("dev-1") == "old"
+
+    # Another process re-registers dev-1 and invalidates dev-2; lookups see
+    # it once the sync interval has passed.
+    other = TokenCache(db=other_db)
+    other.set_tokens({"dev-1": ("new", 3600)})
+    other.invalidate("dev-2")
+    assert cache.get_token("dev-1") == "old"
+
+    monkeypatch.setattr(token_cache, "SYNC_INTERVAL_SEC", 0)
+    assert cache.get_token("dev-1") == "new"
+    assert cache.get_token("dev-2") is None
+    assert cache.get_token("dev-3") == "pending"
+
+    # Our own writes do not drop the memory tier.
+    cache.flush()
+    assert cache.get_token("dev-1") == "new"
+    assert cache.get_stats()["memory"] == {"hits": 4, "misses": 2, "hit_rate": 0.6667}
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from hw_cli.core.api.token_manager import TokenManager
+
+
+class FakeCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get_entry(self, device_id):
+        return self.entries.get(device_id)
+
+    def set_token(self, device_id, token, expires_in):
+        now = int(time.time())
+        self.entries[device_id] = {
+            "token": token,
+            "expires_at": now + expires_in,
+            "cached_at": now,
+            "expires_in": expires_in,
+        }
+
+
+class FakeGateway:
+    def __init__(self):
+        self.requests = 0
+
+    async def request_token(self, provisioning_token, device_id, timestamp, signature):
+        self.requests += 1
+        await asyncio.sleep(0.05)
+        return {"token": f"tok-{self.requests}", "expires_in": 3600}
+
+
+def _manager(gateway, cache, device_id="dev-1"):
+    return TokenManager(device_id, "jwt", "secret", gateway, cache=cache)
+
+
+def test_concurrent_misses_share_one_request():
+    gateway, cache = FakeGateway(), FakeCache()
+
+    async def run():
+        managers = [_manager(gateway, cache) for _ in range(2)]
+        return await asyncio.gather(*(m.get_token() for m in managers * 5))
+
+    assert asyncio.run(run()) == ["tok-1"] * 10
+    assert gateway.requests == 1
+
+
+def test_stale_token_is_served_while_refreshing():
+    gateway, cache = FakeGateway(), FakeCache()
+    manager = _manager(gateway, cache)
+    cache.entries["dev-1"] = {
+        "token": "old",
+        "expires_at": time.time() + 100,
+        "cached_at": time.time() - 3500,
+        "expires_in": 3600,
+    }
+
+    async def run():
+        started = time.monotonic()
+        assert await manager.get_token() == "old"
+        assert await manager.get_token() == "old"
+        assert time.monotonic() - started < 0.05
+        await asyncio.sleep(0.1)
+        return await manager.get_token()
+
+    assert asyncio.run(run()) == "tok-1"
+    assert gateway.requests == 1
+
+
+def test_refresh_point_is_jittered_per_device():
+    fractions = {
+        _manager(None, FakeCache(), f"dev-{i}").refresh_fraction for i in range(50)
+    }
+    assert len(fractions) > 40
+    assert all(0.7 <= f <= 0.9 for f in fractions)
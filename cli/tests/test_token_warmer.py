@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+
+from hw_cli.core import token_warmer
+from hw_cli.core.models import DeviceConfig
+from hw_cli.core.storage import Database
+from hw_cli.core.token_cache import TokenCache
+
+
+def test_warm_tokens_caches_fetched_and_reports_failures(monkeypatch, tmp_path):
+    monkeypatch.setenv("HW_CLI_DATA_DIR", str(tmp_path))
+    cache = TokenCache(db=Database())
+    cache.set_token("warm", "cached", 3600)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        device_id = request.url.path.split("/")[2]
+        if device_id == "broken":
+            return httpx.Response(500)
+        return httpx.Response(
+            200, json={"data": {"token": f"tok-{device_id}", "expires_in": 600}}
+        )
+
+    monkeypatch.setattr(
+        token_warmer,
+        "create_http_client",
+        lambda api, max_connections: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        ),
+    )
+    devices = [
+        DeviceConfig(
+            device_id=device_id,
+            name=device_id,
+            api_base_url="http://gateway",
+            provisioning_token="jwt",
+            hmac_secret="secret",
+        )
+        for device_id in ("a", "b", "warm", "broken")
+    ]
+
+    stats = asyncio.run(token_warmer.warm_tokens(devices, concurrency=2, cache=cache))
+
+    assert (stats.fetched, stats.skipped) == (2, 1)
+    assert stats.failed == {"broken": "HTTP 500"}
+    # Checking which devices need a token is not a cache lookup.
+    assert cache.get_stats()["memory"] == {"hits": 0, "misses": 0, "hit_rate": 0.0}
+    assert cache.get_token("a") == "tok-a"
+    assert cache.get_token("warm") == "cached"
+    assert cache.get_token("broken") is None
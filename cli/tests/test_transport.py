@@ -0,0 +1,21 @@
+from hw_cli.core.api.transport import create_http_client
+from hw_cli.core.config import AppConfig
+
+
+def test_transport_section_round_trips():
+    """api.transport is read from and written back to the nested config dict."""
+    config = AppConfig.from_dict(
+        {"api": {"timeout_seconds": 12, "transport": {"max_connections": 4}}}
+    )
+    assert config.api.transport.max_connections == 4
+    assert AppConfig.from_dict(config.to_dict()) == config
+
+
+def test_unset_timeouts_fall_back_to_api_timeout():
+    config = AppConfig.from_dict(
+        {"api": {"timeout_seconds": 12, "transport": {"connect_timeout": 2}}}
+    )
+    client = create_http_client(config.api)
+
+    assert client.timeout.connect == 2
+    assert client.timeout.read == client.timeout.write == client.timeout.pool == 12